@@ -14,27 +14,38 @@ __python_version__ = "3.11+"
 __google_api_python_client_version__ = "2.154.0"
 __google_auth_oauthlib_version__     = "1.2.1"
 __created__ = "2021-05-14"
-__updated__ = "2025-08-11"
+__updated__ = "2026-10-17"
 
 import logging
 from sys import argv, path
+from itertools import islice
 import os
 import glob
 import shutil
 import threading
+from contextlib import nullcontext
 from argparse import ArgumentParser
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
 path.append("/home/marksa/git/Python/utils")
 from mhsLogging import get_simple_logger, MhsLogger, DEFAULT_LOG_FOLDER, DEFAULT_LOG_LEVEL
 from mhsUtils import *
 SECRETS_DIR:str = osp.join(BASE_PYTHON_FOLDER, f"google{osp.sep}drive{osp.sep}secrets")
 path.append(SECRETS_DIR)
 from folder_ids import *
+from drivePaging import MAX_PAGE_SIZE, prefetch_page_items
+from driveQuery import compile_query
+from driveScheduler import SCHEDULER, add_rate_args
+from driveSession import SERVICE_POOL
+from driveTrace import SESSION_CAT, TRACER, WAIT_CAT
+from driveUpload import DEFAULT_WORKERS, MAX_WORKERS, ParallelUploader, build_thread_service, upload_file
+from driveSync import HASH_CACHE_FILENAME, SYNC_FIELDS, files_to_sync, sync_query
+from driveJournal import JOURNAL_FILENAME, UploadJournal, job_key, settle_interrupted
+from driveMetrics import METRICS
+from driveProfile import RunProfiler
+from driveLogging import NO_PARENT, ItemLog, start_queue_logging
 
 # see https://github.com/googleapis/google-api-python-client/issues/299
 lg.getLogger("googleapiclient.discovery_cache").setLevel(lg.ERROR)
@@ -42,6 +53,8 @@ lg.getLogger("googleapiclient.discovery_cache").setLevel(lg.ERROR)
 JSON_TOKEN = f"token{osp.extsep}json"
 CREDENTIALS_FILE:str    = osp.join(SECRETS_DIR, f"credentials{osp.extsep}json")
 DRIVE_TOKEN_PATH:str    = osp.join(SECRETS_DIR, JSON_TOKEN)
+HASH_CACHE_PATH:str     = osp.join(SECRETS_DIR, HASH_CACHE_FILENAME)
+UPLOAD_JOURNAL_PATH:str = osp.join(SECRETS_DIR, JOURNAL_FILENAME)
 DRIVE_ACCESS_SCOPE:list = ["https://www.googleapis.com/auth/drive"]
 
 DEFAULT_FILETYPE  = "txt"
@@ -51,6 +64,7 @@ FOLDERS_LABEL   = "folders"
 GET_FILES_LABEL = "getfiles"
 METADATA_LABEL  = "metadata"
 REFERENCE_FILE  = "ref-file"
+ITEM_FIELDS     = "name, id, parents, mimeType"
 
 def get_credentials():
     """Get the proper credentials needed to access my Google drive."""
@@ -79,44 +93,91 @@ def get_credentials():
 
 class MhsDriveAccess:
     """Start a locked session, read/write to my google drive, end the session."""
-    def __init__(self, p_logger:logging.Logger = None):
+    def __init__(self, p_logger:logging.Logger = None, p_summary:bool = False):
         self._lgr = p_logger if p_logger else get_simple_logger(self.__class__.__name__)
+        # log ONLY the counts instead of a line for each item
+        self.summary = p_summary
         # prevent different instances/threads from writing at the same time
         self._lock = threading.Lock()
         self._lgr.info(f"Launch '{self.__class__.__name__}' instance at: {get_current_time()}")
         self.service = None
+        self.drive = None
+        self.creds = None
 
     def begin_session(self):
-        """Activate a UNIQUE session to the drive."""
-        self._lock.acquire()
-        self._lgr.info(f"acquired Drive lock at: {get_current_time()}")
-        service = build("drive", "v3", credentials = get_credentials())
-        self.service = service.files()
+        """Activate a UNIQUE session to the drive, reusing the Drive service already built in this process."""
+        with TRACER.span("session.begin", SESSION_CAT):
+            # time spent queued behind another session
+            with TRACER.span("session.lock", WAIT_CAT):
+                self._lock.acquire()
+            self._lgr.info(f"acquired Drive lock at: {get_current_time()}")
+            self.drive, self.creds = SERVICE_POOL.acquire(get_credentials, self._lgr, DRIVE_TOKEN_PATH)
+            self.service = self.drive.files()
 
     def end_session(self):
         """RELEASE this drive session."""
         self.service = None
+        self.drive = None
         if self._lock and self._lock.locked():
             self._lock.release()
             self._lgr.info(f"released Drive lock at: {get_current_time()}")
 
-    def send_folder(self, p_fpath:str, p_wildcard:str = '*'):
-        """SEND the files in a folder to my Google drive."""
+    def iter_items(self, p_query:str, p_fields:str = ITEM_FIELDS, p_page_size:int = MAX_PAGE_SIZE, p_limit:int = 0):
+        """Yield the items matching a Drive query as each page arrives; paging stops when the caller stops iterating."""
+        self._lgr.debug(f"query = '{p_query}'; page size = '{p_page_size}'")
+        # the next page is requested while the caller is still working on the current one
+        return prefetch_page_items(lambda: SERVICE_POOL.lease(self.creds), p_query, p_fields, p_page_size,
+                                   p_limit = p_limit)
+
+    def send_folder(self, p_fpath:str, p_wildcard:str = '*', p_workers:int = DEFAULT_WORKERS, p_sync:bool = False,
+                    p_recursive:bool = False, p_resume:bool = False):
+        """SEND the files in a folder to my Google drive, p_workers files at a time;
+           with p_sync, ONLY the new or changed files are sent and the changed files are updated in place;
+           with p_recursive, ALL the files and subfolders are sent, creating the same folder tree on the drive;
+           with p_resume, an interrupted upload of the same files continues from the upload journal."""
         if not self.service:
             self._lgr.warning("No Session!")
             return
         num_sent = 0
         try:
-            fgw = glob.glob(p_fpath+osp.sep+p_wildcard)
-            for item in fgw:
-                if osp.isfile(item) and get_base_filename(item) != REFERENCE_FILE:
-                    self.send_file(item)
-                    num_sent += 1
+            if p_recursive:
+                uploader = ParallelUploader(lambda: build_thread_service(self.creds), p_workers, self._lgr)
+                num_sent = len( uploader.send_tree(p_fpath, pid, self.get_mime_type, p_cache_path = HASH_CACHE_PATH if p_sync else "") )
+                self._lgr.info(f"Sent {num_sent} files to folder tree '{parent}' @ {get_current_time()}.")
+                return
+            journal = UploadJournal(UPLOAD_JOURNAL_PATH, job_key(p_fpath + osp.sep + p_wildcard, pid), self._lgr)
+            try:
+                if p_resume and journal.counts():
+                    self._lgr.info(f"Resume the upload with files in each state: {journal.counts()}")
+                    settle_interrupted(journal, self.iter_items(sync_query(pid), SYNC_FIELDS))
+                    to_send = journal.remaining()
+                else:
+                    fgw = [item for item in glob.glob(p_fpath+osp.sep+p_wildcard)
+                           if osp.isfile(item) and get_base_filename(item) != REFERENCE_FILE]
+                    to_send = [(item, self.get_mime_type(item)) for item in fgw]
+                    if p_sync:
+                        to_send = files_to_sync(to_send, self.iter_items(sync_query(pid), SYNC_FIELDS), HASH_CACHE_PATH, self._lgr)
+                    journal.start(to_send)
+                uploader = ParallelUploader(lambda: build_thread_service(self.creds), p_workers, self._lgr)
+                num_sent = len( [fid for fid in uploader.send_files(to_send, pid, parent, p_journal = journal) if fid] )
+                # ALL the files were sent so there is nothing to resume
+                journal.clear()
+            finally:
+                journal.close()
         except Exception as sfdex:
             self._lgr.exception(f"send_folder(): {sfdex}")
             raise sfdex
         self._lgr.info(f"Sent {num_sent} files to folder '{parent}' @ {get_current_time()}.")
 
+    @staticmethod
+    def get_mime_type(p_filepath:str) -> str:
+        """Find the mimeType to send a local file with, according to the filename extension."""
+        mime_type = FILE_EXTENSIONS["txt"]
+        f_type = get_filetype(p_filepath)
+        if f_type and f_type in FILE_EXTENSIONS.keys():
+            mime_type = FILE_EXTENSIONS[f_type]
+        return mime_type
+
     def send_file(self, p_filepath:str) -> str:
         """SEND a file to my Google drive
         :return server response """
@@ -124,15 +185,9 @@ class MhsDriveAccess:
             self._lgr.warning("No Session!")
             return ""
         try:
-            mime_type = FILE_EXTENSIONS["txt"]
-            f_type = get_filetype(p_filepath)
-            if f_type and f_type in FILE_EXTENSIONS.keys():
-                mime_type = FILE_EXTENSIONS[f_type]
-            file_metadata = {"name":get_filename(p_filepath), "parents":[pid]}
-            media = MediaFileUpload(p_filepath, mimetype = mime_type, resumable = True)
             self._lgr.info(f"Sending file '{p_filepath}' to Drive://*/{parent}/")
-            file = self.service.create(body = file_metadata, media_body = media, fields = "id").execute()
-            response = file.get("id")
+            # the upload strategy is chosen by the size of the file
+            response = upload_file(self.service, p_filepath, self.get_mime_type(p_filepath), pid, p_lgr = self._lgr, p_level = logging.INFO)
             self._lgr.info(f"Success: Google Id = {response}")
         except Exception as sfex:
             self._lgr.exception(f"send_file(): {sfex}")
@@ -145,7 +200,7 @@ class MhsDriveAccess:
             self._lgr.warning("No Session!")
             return
         try:
-            file_metadata = self.service.get(fileId = p_file_id).execute()
+            file_metadata = SCHEDULER.execute( self.service.get(fileId = p_file_id) )
             self._lgr.info(f"file '{p_filename}' metadata:")
             for item in file_metadata:
                 self._lgr.info(f"\t{item}: {file_metadata[item]}")
@@ -159,30 +214,24 @@ class MhsDriveAccess:
             self._lgr.warning("No Session!")
             return
         try:
-            mtype = FILE_EXTENSIONS[p_ftype] if p_mime else FILE_EXTENSIONS[DEFAULT_FILETYPE]
-            results = self.service.list(q = f"mimeType='{mtype}'", spaces = "drive",
-                                        pageSize = p_numitems, fields = "files(name, id, parents, mimeType)").execute()
-            items = results.get("files", [])
+            # ask for the mimeType OR the filename extension, which then needs an exact match check on each candidate
+            query = compile_query(p_mimetype = FILE_EXTENSIONS[p_ftype]) if p_mime else compile_query(p_extension = p_ftype)
+            # only look through the number of items requested
+            items = islice(self.iter_items(query, p_page_size = p_numitems, p_limit = p_numitems), p_numitems)
             found_items = []
-            if not items:
+            item_log = ItemLog(self._lgr, logging.INFO, self.summary)
+            item_log.header("Files retrieved: \n\t\t\t\tName \t\t  <type> \t(Id) \t\t\t\t   [parent id]")
+            for item in items:
+                # all the files are of the queried mimeType, otherwise find the file type by using the filename extension
+                if p_mime or get_filetype(item['name'])[1:] == p_ftype:
+                    found_items.append(item)
+                    # items 'shared with me' are in my Drive but without a parent
+                    item_log.item("%s <%s> (%s) %s", item['name'], item['mimeType'], item['id'], item.get('parents', NO_PARENT),
+                                  p_kind = item['mimeType'])
+            item_log.summary("files retrieved")
+            if not found_items:
                 self._lgr.warning("No files found?!")
             else:
-                self._lgr.info(f"{len(items)} files retrieved. \n\t\t\t\tName \t\t  <type> \t(Id) \t\t\t\t   [parent id]")
-                for item in items:
-                    if p_mime:
-                        # all the files are of the queried mimeType
-                        found_items.append(item)
-                        # items 'shared with me' are in my Drive but without a parent
-                        self._lgr.info(f"{item['name']} <{item['mimeType']}> ({item['id']}) "
-                                       f"{item['parents'] if 'parents' in item.keys() else '[*** NONE ***]'}")
-                    else:
-                        fname = f"{item['name']}"
-                        # find the file type by using the filename extension
-                        ftype = get_filetype(fname)[1:]
-                        if ftype == p_ftype:
-                            found_items.append(item)
-                            self._lgr.info(f"{item['name']} <{item['mimeType']}> ({item['id']}) "
-                                           f"{item['parents'] if 'parents' in item.keys() else '[*** NONE ***]'}")
                 self._lgr.info(f">> {len(found_items)} '{p_ftype}' files found.\n")
             if save_option and found_items:
                 jfile = save_to_json(get_base_filename(argv[0]), found_items)
@@ -197,24 +246,13 @@ class MhsDriveAccess:
             self._lgr.warning("No Session!")
             return
         try:
-            page_token = None
             mime_type = FILE_EXTENSIONS["gfldr"]
             all_items = []
-            self._lgr.info("Folders:")
-            while True:
-                results = self.service.list( q = f"mimeType='{mime_type}'", spaces = "drive",
-                                             fields = "nextPageToken, files(id, name, parents)",
-                                             pageToken = page_token ).execute()
-                self._lgr.debug(f"type(results) = {type(results)}")
-                items = results.get("files", [])
-                all_items = all_items + items if all_items else items
-                self._lgr.debug(f"type(items) = {type(items)} \n page_token = {page_token}")
-                self._lgr.info("\n\t Name\t\t\t\t(Id)\t\t\t\t\t\t[parent id]")
-                for it in items:
-                    self._lgr.info(f" {it.get('name')} ({it.get('id')}) {it.get('parents')}")
-                page_token = results.get("nextPageToken", None)
-                if page_token is None:
-                    break
+            item_log = ItemLog(self._lgr, logging.INFO, self.summary)
+            item_log.header("Folders:\n\t Name\t\t\t\t(Id)\t\t\t\t\t\t[parent id]")
+            for it in self.iter_items(compile_query(p_mimetype = mime_type), p_fields = "id, name, parents"):
+                all_items.append(it)
+                item_log.item(" %s (%s) %s", it.get('name'), it.get('id'), it.get('parents'))
             self._lgr.info(f">> Found {len(all_items)} folders.\n")
             if save_option and all_items:
                 jfile = save_to_json(get_base_filename(argv[0]), all_items)
@@ -245,7 +283,7 @@ def main_drive():
     # send all files in a folder
     elif osp.isdir(choice):
         lgr.info(f"upload all files in folder '{choice}' to Drive folder: {parent}")
-        mhsda.send_folder(choice)
+        mhsda.send_folder(choice, p_workers = workers, p_sync = sync, p_recursive = recursive, p_resume = resume)
     # send a file
     else:
         lgr.info(f"upload file '{choice}' to Drive folder: {parent}")
@@ -259,6 +297,13 @@ def prepare_args():
                             help = "Write the results to a JSON file")
     arg_parser.add_argument("-l", "--log_location", metavar = "PATHNAME",
                             help = f"path to a local folder where logs will be saved")
+    arg_parser.add_argument('--summary', action="store_true", default=False,
+                            help = "log ONLY the counts instead of a line for each item, e.g. to list OR delete thousands of items")
+    arg_parser.add_argument('--profile', action="store_true", default=False,
+                            help = "profile the function with cProfile and tracemalloc, and write the reports to the log folder")
+    arg_parser.add_argument('--trace', action="store_true", default=False,
+                            help = "save a timeline of every Drive request and local stage to a Chrome trace-event JSON file")
+    add_rate_args(arg_parser)
     # one argument required
     req_group = arg_parser.add_argument_group("ONE argument REQUIRED")
     mex_group = req_group.add_mutually_exclusive_group(required=True)
@@ -278,6 +323,14 @@ def prepare_args():
     send_group = arg_parser.add_argument_group("Send options")
     send_group.add_argument('-p', '--parent', default = "root",
                             help = "name of the Drive parent folder to send to; DEFAULT = 'root'")
+    send_group.add_argument('-w', '--workers', type = int, default = DEFAULT_WORKERS, metavar = "NUM",
+                            help = f"number of files to send concurrently (DEFAULT = {DEFAULT_WORKERS}, MAX = {MAX_WORKERS})")
+    send_group.add_argument('-R', '--recursive', action="store_true", default=False,
+                            help="ALSO send ALL the subfolders of a folder, creating the same folder tree on my Google drive")
+    send_group.add_argument('--resume', action="store_true", default=False,
+                            help="continue an interrupted upload of the same folder from the upload journal; DEFAULT = False")
+    send_group.add_argument('--sync', action="store_true", default=False,
+                            help="ONLY send the files in a folder that are new or changed on my Google drive; DEFAULT = False")
     # get files options
     gather_group = arg_parser.add_argument_group("Get files options")
     gather_group.add_argument('-t', '--type', type=str, default=f"{DEFAULT_FILETYPE}",
@@ -290,6 +343,7 @@ def prepare_args():
 
 def process_input_parameters(argx:list):
     args = prepare_args().parse_args(argx)
+    SCHEDULER.configure(args.rate, args.burst)
 
     parent_id = FOLDER_IDS["Test"]
     if args.send:
@@ -298,6 +352,9 @@ def process_input_parameters(argx:list):
         if args.parent not in FOLDER_IDS.keys():
             raise Exception(f"Parent folder '{args.parent}' NOT recognized! Exiting...")
         parent_id = FOLDER_IDS[args.parent]
+    # the upload journal ONLY records the files of ONE folder
+    if args.resume and args.recursive:
+        raise Exception("--resume can NOT be used with -R/--recursive! Exiting...")
 
     num_files = 0
     if args.getfiles:
@@ -306,15 +363,21 @@ def process_input_parameters(argx:list):
     fxn_choice = FOLDERS_LABEL if args.folders else GET_FILES_LABEL if args.getfiles else METADATA_LABEL if args.metadata else args.send
 
     return ( args.jsonsave, fxn_choice, args.parent, parent_id, args.type, args.mimetype, num_files, args.id_of_file,
-             args.log_location if args.log_location else DEFAULT_LOG_FOLDER )
+             args.log_location if args.log_location else DEFAULT_LOG_FOLDER, args.workers, args.sync, args.recursive, args.resume,
+             args.trace, args.profile, args.summary )
 
 
 if __name__ == "__main__":
     start_time = dt.now()
     try:
-        save_option, choice, parent, pid, filetype, mime_option, numfiles, meta_id, loglocn = process_input_parameters(argv[1:])
+        save_option, choice, parent, pid, filetype, mime_option, numfiles, meta_id, loglocn, workers, sync, recursive, resume, trace, \
+            profile, summary = process_input_parameters(argv[1:])
+        if trace:
+            TRACER.start()
         log_control = MhsLogger(get_base_filename(__file__), con_level = DEFAULT_LOG_LEVEL, folder = loglocn)
         lgr = log_control.get_logger()
+        # the console and log file are written by a background thread
+        start_queue_logging(lgr)
         lgr.info(f"save option = {save_option}, function choice = '{choice}', log location = {loglocn}")
     except Exception as lex:
         print(f">> Problem: {repr(lex)}")
@@ -323,8 +386,10 @@ if __name__ == "__main__":
     code = 0
     try:
         lgr.info(f"Start time = {start_time.strftime(RUN_DATETIME_FORMAT)}")
-        mhsda = MhsDriveAccess(lgr)
-        main_drive()
+        mhsda = MhsDriveAccess(lgr, summary)
+        profiler = RunProfiler(loglocn, get_base_filename(__file__), lgr) if profile else nullcontext()
+        with TRACER.span("run", choice = str(choice)), profiler:
+            main_drive()
     except KeyboardInterrupt as mki:
         lgr.exception(mki)
         code = 13
@@ -341,6 +406,15 @@ if __name__ == "__main__":
         if mhsda:
             mhsda.end_session()
 
+    lgr.info(METRICS.summary())
+    if mhsda and save_option:
+        jfile = save_to_json(get_base_filename(argv[0]) + "_metrics", METRICS.as_dict())
+        lgr.info(f"Saved API metrics to '{jfile}'.")
+    if TRACER.enabled:
+        TRACER.stop()
+        jfile = save_to_json(get_base_filename(argv[0]) + "_trace", TRACER.as_dict())
+        lgr.info(f"Saved a trace of {len(TRACER)} spans to '{jfile}': open it in chrome://tracing OR ui.perfetto.dev")
+
     run_time = (dt.now() - start_time).total_seconds()
     lgr.info(f"\nRunning time = {(run_time // 60)} minutes, {(run_time % 60):2.4} seconds\n")
     exit(code)
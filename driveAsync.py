@@ -0,0 +1,270 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveAsync.py
+#   -- asyncio client for my Google Drive: thousands of requests in flight from ONE thread over a pooled HTTP connector
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import asyncio
+import glob
+import json
+import logging
+import mimetypes
+import os.path as osp
+import time
+from typing import AsyncIterator
+import httplib2
+from google.auth.transport.requests import Request
+from googleapiclient.errors import HttpError
+from drivePaging import MAX_PAGE_SIZE
+from driveQuery import compile_query
+from driveScheduler import MAX_RETRIES, backoff_delay, is_retriable
+from driveUpload import DEFAULT_CHUNK_SIZE, MULTIPART_THRESHOLD
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DRIVE_API_URL = "https://www.googleapis.com"
+FILES_PATH  = "/drive/v3/files"
+UPLOAD_PATH = "/upload/drive/v3/files"
+DEFAULT_CONCURRENCY = 64
+MAX_CONCURRENCY = 1000
+ITEM_FIELDS = "id, name, mimeType, modifiedTime, parents"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+# HTTP status of a resumable upload chunk that was received, when there are more to send
+RESUME_INCOMPLETE = 308
+
+def guess_mime_type(p_path:str) -> str:
+    return mimetypes.guess_type(p_path)[0] or "application/octet-stream"
+
+def read_file(p_path:str) -> bytes:
+    with open(p_path, "rb") as fp:
+        return fp.read()
+
+
+class AsyncDriveAccess:
+    """Find, get, send and delete items on my Google drive from asyncio code, with at most 'concurrency' requests in flight
+       over ONE pooled HTTP connector. Errors are raised as the same HttpError as the googleapiclient service, and the
+       quota and server errors are retried with the same backoff as the DriveScheduler. Use as an async context manager:
+           async with AsyncDriveAccess(creds, 200) as drive:
+               items = await drive.get_many(ids)
+    """
+    def __init__(self, p_creds, p_concurrency:int = DEFAULT_CONCURRENCY, p_lgr:logging.Logger = None, p_level:int = logging.INFO,
+                 p_base_url:str = DRIVE_API_URL, p_retries:int = MAX_RETRIES, p_threshold:int = MULTIPART_THRESHOLD,
+                 p_chunk_size:int = DEFAULT_CHUNK_SIZE):
+        """
+        :param p_creds:       Google credentials, refreshed when they expire
+        :param p_concurrency: max number of requests in flight, AND of pooled connections
+        :param p_lgr:         logger
+        :param p_level:       level to log the progress messages at
+        :param p_base_url:    scheme and host of the Drive REST API, e.g. the URL of a FakeDriveServer
+        :param p_retries:     max number of times to retry a quota or server error
+        :param p_threshold:   files smaller than this many bytes are sent in ONE multipart request
+        :param p_chunk_size:  size in bytes of each chunk of a resumable upload
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncDriveAccess needs aiohttp: 'pip install aiohttp'.")
+        self.creds = p_creds
+        self.concurrency = max(1, min(p_concurrency, MAX_CONCURRENCY))
+        self.lgr = p_lgr or logging.getLogger(__name__)
+        self.lev = p_level
+        self.base_url = p_base_url.rstrip('/')
+        self.retries = p_retries
+        self.threshold = p_threshold
+        self.chunk_size = p_chunk_size
+        self.session = None
+        self._semaphore = None
+        self._refresh_lock = None
+        self.num_requests = 0
+        self.num_retries = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit = self.concurrency, ttl_dns_cache = 300)
+        self.session = aiohttp.ClientSession(connector = connector)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._refresh_lock = asyncio.Lock()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.session.close()
+        self.session = None
+
+    async def _auth_header(self) -> dict:
+        if not self.creds.valid:
+            async with self._refresh_lock:
+                if not self.creds.valid:
+                    # the refresh is a blocking request, so it must NOT run in the event loop
+                    await asyncio.to_thread(self.creds.refresh, Request())
+        return {"Authorization": f"Bearer {self.creds.token}"}
+
+    async def _request(self, p_method:str, p_url:str, p_params:dict = None, p_json:dict = None, p_data = None,
+                       p_headers:dict = None) -> tuple:
+        """Send a request, retrying the quota and server errors.
+        :param p_url:  path on the Drive API OR an absolute URL, e.g. of a resumable upload session
+        :param p_data: body, OR callable making a NEW body for each attempt
+        :return the status, headers AND body of the response
+        """
+        url = p_url if p_url.startswith("http") else self.base_url + p_url
+        params = {key:str(value) for key, value in (p_params or {}).items() if value is not None}
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                headers = {**await self._auth_header(), **(p_headers or {})}
+                data = p_data() if callable(p_data) else p_data
+                async with self.session.request(p_method, url, params = params, json = p_json, data = data, headers = headers) as resp:
+                    body = await resp.read()
+                    status, reason, rheaders = resp.status, resp.reason, resp.headers
+            self.num_requests += 1
+            if status < 400:
+                return status, rheaders, body
+            response = httplib2.Response({"status": status})
+            response.reason = reason
+            error = HttpError(response, body, uri = url)
+            if attempt >= self.retries or not is_retriable(error):
+                raise error
+            self.num_retries += 1
+            self.lgr.debug(f"Drive error {status}: retry #{attempt + 1}.")
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    async def _json(self, p_method:str, p_url:str, **kwargs) -> dict:
+        _, _, body = await self._request(p_method, p_url, **kwargs)
+        return json.loads(body) if body else {}
+
+    def _log_rate(self, p_label:str, p_count:int, p_start:float):
+        elapsed = max(time.perf_counter() - p_start, 1e-6)
+        self.lgr.log(self.lev, f"{p_label} {p_count} items in {elapsed:.2f} seconds: {p_count / elapsed:.1f} items/s "
+                               f"with up to {self.concurrency} in flight; {self.num_requests} requests, {self.num_retries} retries.")
+
+    async def iter_items(self, p_query:str, p_fields:str = ITEM_FIELDS, p_page_size:int = MAX_PAGE_SIZE) -> AsyncIterator[dict]:
+        """Yield the items matching a Drive query as each page arrives; paging stops when the caller stops iterating."""
+        page_token = None
+        while True:
+            results = await self._json("GET", FILES_PATH, p_params = {"q":p_query, "spaces":"drive", "pageToken":page_token,
+                                       "pageSize":max(1, min(p_page_size, MAX_PAGE_SIZE)), "fields":f"nextPageToken, files({p_fields})"})
+            for item in results.get("files", []):
+                yield item
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+
+    async def find_items(self, p_mimetype:str = "", p_date:str = "", p_pid:str = "", p_limit:int = 0) -> list:
+        """Find the specified items on my Google drive.
+        :param p_mimetype: mimeType of items to find
+        :param p_date:     find items OLDER than this date
+        :param p_pid:      id of the parent Drive folder to search in
+        :param p_limit:    max number of items to find; 0 for ALL
+        """
+        query = compile_query(p_mimetype, p_date, p_pid)
+        if not query:
+            self.lgr.warning("No Query parameters!")
+            return []
+        items = []
+        async for item in self.iter_items(query, p_page_size = p_limit or MAX_PAGE_SIZE):
+            items.append(item)
+            if p_limit and len(items) >= p_limit:
+                break
+        self.lgr.log(self.lev, f">> Found {len(items)} items.")
+        return items
+
+    async def find_all_folders(self) -> list:
+        return await self.find_items(p_mimetype = FOLDER_MIME_TYPE)
+
+    async def get_metadata(self, p_file_id:str, p_fields:str = "") -> dict:
+        return await self._json("GET", f"{FILES_PATH}/{p_file_id}", p_params = {"fields":p_fields or None})
+
+    async def get_many(self, p_ids:list, p_fields:str = "") -> list:
+        """Get the metadata of MANY items at the same time.
+        :return list of (id, metadata, error) in the same order as p_ids; error is None if the get succeeded
+        """
+        start = time.perf_counter()
+
+        async def get_one(p_id:str) -> tuple:
+            try:
+                return p_id, await self.get_metadata(p_id, p_fields), None
+            except HttpError as gme:
+                return p_id, None, gme
+        results = await asyncio.gather(*(get_one(fid) for fid in p_ids))
+        self._log_rate("Got", len(results), start)
+        return results
+
+    async def delete(self, p_file_id:str) -> str:
+        _, _, body = await self._request("DELETE", f"{FILES_PATH}/{p_file_id}")
+        # Drive returns an empty body for a successful delete
+        return body.decode("utf-8")
+
+    async def delete_many(self, p_items:list) -> list:
+        """DELETE MANY items at the same time.
+        :param p_items: Drive items, each with at least an 'id'
+        :return list of (item, response, error) in the same order as p_items, like driveBatch.batch_delete()
+        """
+        start = time.perf_counter()
+
+        async def delete_one(p_item:dict) -> tuple:
+            try:
+                return p_item, await self.delete(p_item["id"]), None
+            except HttpError as dme:
+                return p_item, None, dme
+        results = await asyncio.gather(*(delete_one(item) for item in p_items))
+        self._log_rate("Deleted", len(results), start)
+        return results
+
+    async def send_file(self, p_path:str, p_mime_type:str = "", p_pid:str = "") -> str:
+        """SEND a local file to my Google drive: in ONE multipart request if small, otherwise in resumable chunks.
+        :return the Drive id of the new file
+        """
+        mime_type = p_mime_type or guess_mime_type(p_path)
+        metadata = {"name": osp.basename(p_path)}
+        if p_pid:
+            metadata["parents"] = [p_pid]
+        size = osp.getsize(p_path)
+        if size < self.threshold:
+            data = await asyncio.to_thread(read_file, p_path)
+
+            def multipart():
+                writer = aiohttp.MultipartWriter("related")
+                writer.append_json(metadata)
+                writer.append(data, {"Content-Type": mime_type})
+                return writer
+            response = await self._json("POST", UPLOAD_PATH, p_params = {"uploadType":"multipart", "fields":"id"}, p_data = multipart)
+            return response["id"]
+        _, headers, _ = await self._request("POST", UPLOAD_PATH, p_params = {"uploadType":"resumable", "fields":"id"}, p_json = metadata,
+                                            p_headers = {"X-Upload-Content-Type":mime_type, "X-Upload-Content-Length":str(size)})
+        session_url = headers["Location"]
+        with open(p_path, "rb") as fp:
+            for offset in range(0, size, self.chunk_size):
+                chunk = await asyncio.to_thread(fp.read, self.chunk_size)
+                status, _, body = await self._request("PUT", session_url, p_data = chunk, p_headers =
+                                                      {"Content-Range":f"bytes {offset}-{offset + len(chunk) - 1}/{size}"})
+                if status != RESUME_INCOMPLETE:
+                    return json.loads(body)["id"]
+        raise HttpError(httplib2.Response({"status": RESUME_INCOMPLETE}), b"Upload incomplete.", uri = session_url)
+
+    async def send_folder(self, p_path:str, p_pid:str = "", p_wildcard:str = '*', p_mime_fxn = guess_mime_type) -> list:
+        """SEND ALL the files in a local folder to a Drive folder at the same time.
+        :param p_path:     path to the local folder
+        :param p_pid:      id of the Drive folder to send the files to
+        :param p_wildcard: pattern of the names of the files to send
+        :param p_mime_fxn: callable giving the mimeType to send a local file with
+        :return list of (path, Drive id, error) for each file; error is None if the send succeeded
+        """
+        paths = sorted(path for path in glob.glob(osp.join(p_path, p_wildcard)) if osp.isfile(path))
+        start = time.perf_counter()
+
+        async def send_one(p_file:str) -> tuple:
+            try:
+                return p_file, await self.send_file(p_file, p_mime_fxn(p_file), p_pid), None
+            except HttpError as sfe:
+                return p_file, None, sfe
+        results = await asyncio.gather(*(send_one(path) for path in paths))
+        self._log_rate("Sent", len(results), start)
+        return results
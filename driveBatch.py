@@ -0,0 +1,86 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveBatch.py
+#   -- group many Google Drive requests into batch HTTP requests
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import threading
+import time
+from googleapiclient.errors import HttpError
+from driveScheduler import SCHEDULER, backoff_delay, is_retriable
+from driveTrace import STAGE_CAT, TRACER
+
+# Drive accepts at most 100 sub-requests in one batch request
+MAX_BATCH_SIZE = 100
+BATCH_RETRIES  = 4
+
+def batch_delete(p_drive, p_items:list, p_batch_size:int = MAX_BATCH_SIZE, p_retries:int = BATCH_RETRIES, p_lgr = None,
+                 p_progress = None, p_cancel:threading.Event = None) -> list:
+    """DELETE the items using batch requests, sending again ONLY the sub-requests that failed with a retriable error.
+    :param p_drive:      the Drive service, i.e. NOT the 'files' resource
+    :param p_items:      Drive items to delete, each with at least an 'id'
+    :param p_batch_size: max number of sub-requests in each batch
+    :param p_retries:    max number of times to retry a failed sub-request
+    :param p_lgr:        optional logger
+    :param p_progress:   optional callable(number of deletes done), called after each batch
+    :param p_cancel:     optional event to set to stop sending batches
+    :return list of (item, response, error) in the same order as p_items, for each item that was sent before any cancel;
+            error is None if the delete succeeded
+    """
+    batch_size = max(1, min(p_batch_size, MAX_BATCH_SIZE))
+    outcomes = [None] * len(p_items)
+    pending = list(range(len(p_items)))
+    attempt = 0
+    while pending:
+        with TRACER.span("batch_delete", STAGE_CAT, attempt = attempt, items = len(pending)):
+            retry = set()
+
+            def callback(request_id, response, exception):
+                idx = int(request_id)
+                if exception is not None and attempt < p_retries and is_retriable(exception):
+                    retry.add(idx)
+                else:
+                    outcomes[idx] = (p_items[idx], response, exception)
+
+            for start in range(0, len(pending), batch_size):
+                if p_cancel and p_cancel.is_set():
+                    break
+                chunk = pending[start:start + batch_size]
+                batch = p_drive.new_batch_http_request(callback = callback)
+                for idx in chunk:
+                    batch.add(p_drive.files().delete(fileId = p_items[idx]["id"]), request_id = str(idx))
+                try:
+                    # the sub-requests are retried below, NOT by the scheduler
+                    SCHEDULER.execute(batch, p_cost = len(chunk), p_retries = 0)
+                except HttpError as bhe:
+                    # the whole batch failed, e.g. a server error on the batch endpoint itself
+                    unsent = [idx for idx in chunk if outcomes[idx] is None]
+                    if attempt < p_retries and is_retriable(bhe):
+                        retry.update(unsent)
+                    else:
+                        # keep the outcomes of the other batches and report the error for each item of this one
+                        if p_lgr:
+                            p_lgr.error(f"Batch of {len(chunk)} deletes failed: {repr(bhe)}")
+                        for idx in unsent:
+                            retry.discard(idx)
+                            outcomes[idx] = (p_items[idx], None, bhe)
+                if p_progress:
+                    p_progress( sum(1 for outcome in outcomes if outcome is not None) )
+            pending = [] if p_cancel and p_cancel.is_set() else sorted(retry)
+            if pending:
+                SCHEDULER.on_throttle()
+                attempt += 1
+                delay = backoff_delay(attempt)
+                if p_lgr:
+                    p_lgr.warning(f"Retry #{attempt} for {len(pending)} failed deletes after {delay:.2f} seconds.")
+                time.sleep(delay)
+    return [outcome for outcome in outcomes if outcome is not None]
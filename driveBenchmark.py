@@ -0,0 +1,135 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveBenchmark.py
+#   -- measure the listing, upload and delete code against a fake Drive with many synthetic files
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import math
+import os
+import os.path as osp
+import tempfile
+import time
+from argparse import ArgumentParser
+from sys import argv
+from driveBatch import batch_delete
+from drivePaging import iter_page_items
+from driveQuery import compile_query
+from driveScheduler import SCHEDULER
+from driveUpload import ParallelUploader
+from fakeDrive import FakeDrive, LIST_OP, CREATE_OP, BATCH_OP
+
+DEFAULT_SIZES   = [1000, 10000, 100000]
+DEFAULT_LATENCY = 0.002
+DEFAULT_WORKERS = 8
+# the uploads cycle through this many small local files
+NUM_LOCAL_FILES = 16
+ITEM_FIELDS = "id, name, mimeType, parents, modifiedTime"
+# measure the code, NOT the rate limit of the shared scheduler
+UNLIMITED_RATE  = 1e9
+UNLIMITED_BURST = 10 ** 9
+
+def percentile(p_values:list, p_pct:float) -> float:
+    """The value below which p_pct percent of the values fall, by the nearest-rank method."""
+    if not p_values:
+        return 0.0
+    ordered = sorted(p_values)
+    rank = max(1, math.ceil(p_pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def make_local_files(p_folder:str, p_size:int) -> list:
+    paths = []
+    for num in range(NUM_LOCAL_FILES):
+        path = osp.join(p_folder, f"bench{num:02d}.txt")
+        with open(path, "wb") as fp:
+            fp.write(os.urandom(p_size))
+        paths.append(path)
+    return paths
+
+def run_size(p_num:int, p_latency:float, p_workers:int, p_file_size:int, p_lgr:logging.Logger) -> list:
+    """Run each benchmark with p_num synthetic files on a NEW fake Drive.
+    :return a row for each operation: (files, operation, items per second, p50 ms, p99 ms, requests, errors)
+            n.b. the latencies for the deletes are those of the batch requests
+    """
+    rows = []
+    fake = FakeDrive(p_latency = p_latency)
+    folder = fake.create_item({"name":"bench", "mimeType":"application/vnd.google-apps.folder"}, None)["id"]
+    fake.populate(p_num, folder)
+    service = fake.service()
+
+    def add_row(p_op:str, p_label:str, p_count:int, p_elapsed:float):
+        latencies = fake.latencies[p_op]
+        rows.append( (p_num, p_label, p_count / max(p_elapsed, 1e-9), percentile(latencies, 50) * 1000,
+                      percentile(latencies, 99) * 1000, len(latencies), sum(fake.errors.values())) )
+        fake.reset_stats()
+
+    # listing
+    start = time.perf_counter()
+    listed = [item for item in iter_page_items(service.files(), compile_query(p_pid = folder), ITEM_FIELDS)]
+    add_row(LIST_OP, "list", len(listed), time.perf_counter() - start)
+    p_lgr.info(f"{p_num}: listed {len(listed)} items.")
+
+    # uploads
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = make_local_files(tmpdir, p_file_size)
+        uploads = [(paths[num % NUM_LOCAL_FILES], "text/plain") for num in range(p_num)]
+        uploader = ParallelUploader(fake.service, p_workers, p_lgr, logging.DEBUG)
+        start = time.perf_counter()
+        ids = uploader.send_files(uploads, folder, "bench")
+        add_row(CREATE_OP, "upload", len([fid for fid in ids if fid]), time.perf_counter() - start)
+
+    # batched deletes of the ORIGINAL files
+    start = time.perf_counter()
+    outcomes = batch_delete(service, listed, p_lgr = p_lgr)
+    elapsed = time.perf_counter() - start
+    deleted = len([1 for _, _, error in outcomes if error is None])
+    p_lgr.info(f"{p_num}: deleted {deleted} items in {len(fake.latencies[BATCH_OP])} batches.")
+    add_row(BATCH_OP, "delete", deleted, elapsed)
+    return rows
+
+def format_table(p_rows:list) -> str:
+    lines = [f"{'files':>8} {'operation':<10} {'items/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'requests':>9} {'errors':>7}"]
+    for num, label, rate, p50, p99, requests, errors in p_rows:
+        lines.append(f"{num:>8} {label:<10} {rate:>12.1f} {p50:>9.3f} {p99:>9.3f} {requests:>9} {errors:>7}")
+    return '\n'.join(lines)
+
+def prepare_args():
+    arg_parser = ArgumentParser( description = "Benchmark the Drive listing, upload and delete code against a fake Drive.",
+                                 prog = f"python3 {osp.basename(argv[0])}" )
+    arg_parser.add_argument('-n', '--numfiles', type = int, nargs = '+', default = DEFAULT_SIZES, metavar = "NUM",
+                            help = f"numbers of synthetic files to run with; DEFAULT = {DEFAULT_SIZES}")
+    arg_parser.add_argument('-t', '--latency', type = float, default = DEFAULT_LATENCY, metavar = "SECONDS",
+                            help = f"latency of each fake request; DEFAULT = {DEFAULT_LATENCY}")
+    arg_parser.add_argument('-w', '--workers', type = int, default = DEFAULT_WORKERS, metavar = "NUM",
+                            help = f"number of files to upload concurrently; DEFAULT = {DEFAULT_WORKERS}")
+    arg_parser.add_argument('-s', '--size', type = int, default = 1024, metavar = "BYTES",
+                            help = "size of each uploaded file; DEFAULT = 1024")
+    arg_parser.add_argument('--rate', type = float, default = 0.0, metavar = "NUM",
+                            help = "Drive requests per second allowed by the scheduler; DEFAULT = 0 = NO limit")
+    arg_parser.add_argument('--burst', type = int, default = 0, metavar = "NUM",
+                            help = "largest burst of Drive requests allowed by the scheduler; DEFAULT = 0 = NO limit")
+    return arg_parser
+
+def main_benchmark(args:list):
+    opts = prepare_args().parse_args(args)
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(message)s")
+    lgr = logging.getLogger(__name__)
+    SCHEDULER.configure(opts.rate or UNLIMITED_RATE, opts.burst or UNLIMITED_BURST)
+    rows = []
+    for num in opts.numfiles:
+        rows.extend( run_size(num, opts.latency, opts.workers, opts.size, lgr) )
+    print(format_table(rows))
+    return rows
+
+
+if __name__ == "__main__":
+    main_benchmark(argv[1:])
@@ -12,65 +12,131 @@ __python_version__ = "3.11+"
 __google_api_python_client_version__ = "2.149.0"
 __google_auth_oauthlib_version__     = "1.2.1"
 __created__ = "2024-09-08"
-__updated__ = "2024-10-11"
+__updated__ = "2026-10-17"
 
+import json
+from contextlib import nullcontext
 from driveAccess import *
+from driveBatch import batch_delete
+from driveQuery import compile_query
+from driveShard import MAX_SHARDS, ShardedLister
+from drivePolicy import POLICY_FIELDS, load_policy, plan_deletions
+from driveExpiry import CLEANUP_STATE_FILENAME, DEFAULT_INTERVAL, CleanupDaemon
+from driveScheduler import SCHEDULER, add_rate_args
+from driveMetrics import METRICS
+from driveTrace import TRACER
+from driveProfile import RunProfiler
+from driveLogging import NO_PARENT, ItemLog, start_queue_logging
 
 DEFAULT_DATE = "2027-11-13"
 DEFAULT_FILETYPE = "gcm"
 DEFAULT_PARENT_FOLDER = "Test"
 MAX_FILES_DELETE = 500
+CLEANUP_STATE_PATH:str = osp.join(SECRETS_DIR, CLEANUP_STATE_FILENAME)
 
 # see https://github.com/googleapis/google-api-python-client/issues/299
 lg.getLogger("googleapiclient.discovery_cache").setLevel(lg.ERROR)
 
-def delete_file(p_name:str, p_file_id:str, p_filedate:str) -> str:
-    """Delete a file.
-    :arg    p_name: name of the file
-    :arg    p_file_id: ID of the file to delete
-    :arg    p_filedate: modified time of the file
+def delete_files(p_items:list) -> list:
+    """Delete files, in batches.
+    :arg    p_items: the files to delete, each with a name, id and modified time
+    :return list of results for each file
     """
-    if testing_mode:
-        result = f"Testing: Would have deleted file '{p_name}' with date: {p_filedate}"
-    else:
-        response = mhsda.service.delete(fileId = p_file_id).execute()
-        result = f"delete response[{p_name} @ {p_filedate}] = '{response}'."
+    if not testing_mode:
+        return [delete_result(item, response, error) for item, response, error in delete_items(p_items)]
+
+    results = []
+    item_log = ItemLog(lgr, lg.INFO, summary_option)
+    for item in p_items:
+        results.append(f"Testing: Would have deleted file '{item['name']}' with date: {item['modifiedTime']}")
+        item_log.item("%s", results[-1], p_kind = "testing")
+    item_log.summary("delete results")
+    return results
+
+def delete_items(p_items:list) -> list:
+    """Delete files, in batches, even in testing mode, logging the result for each.
+    :arg    p_items: the files to delete, each with a name, id and modified time
+    :return list of (item, response, error) for each file, like batch_delete()
+    """
+    outcomes = batch_delete(mhsda.drive, p_items, p_lgr = lgr)
+    item_log = ItemLog(lgr, lg.INFO, summary_option)
+    for item, response, error in outcomes:
+        item_log.item("%s", delete_result(item, response, error), p_kind = "error" if error else "deleted")
+    item_log.summary("delete results")
+    return outcomes
 
-    lgr.info(result)
-    return result
+def delete_result(p_item:dict, p_response, p_error) -> str:
+    return f"delete response[{p_item['name']} @ {p_item['modifiedTime']}] = '{repr(p_error) if p_error else p_response}'."
 
 def get_files():
     """retrieve files in the specified parent folder that are older than the specified date"""
-    # could include 'mimeType=x' in the query but some file types in Google Drive RARELY have the proper mimetype assigned
-    query = f"modifiedTime < '{fdate}' and '{parent_id}' in parents"
+    # could include 'mimeType=x' in the query but some file types in Google Drive RARELY have the proper mimetype assigned,
+    # so ask for the filename extension and check the candidates for an exact match in run()
+    query = compile_query(p_date = fdate, p_pid = parent_id, p_extension = filetype)
     lgr.info(f"query: [{query}]")
-    results = mhsda.service.list(q = query, spaces = "drive", pageSize = MAX_FILES_DELETE,
-                                 fields = "files(name, id, parents, mimeType, modifiedTime)").execute()
-    items = results.get("files", [])
+    fields = "name, id, parents, mimeType, modifiedTime"
+    if num_shards > 1:
+        # the query is bounded by 'modifiedTime < date', so it can be listed in concurrent modifiedTime windows
+        lister = ShardedLister(lambda: build_thread_service(mhsda.creds), num_shards, lgr)
+        items = lister.list_items(query, fields)
+    else:
+        items = list( mhsda.iter_items(query, fields) )
     if items:
-        lgr.debug(f"Files retrieved: \n\t\t\t\t\t\t\t\t Name \t\t\t\t <type> \t\t\t\t %Timestamp% \t\t\t\t (Id) \t\t\t\t\t [parent id]")
+        item_log = ItemLog(lgr, lg.DEBUG, summary_option)
+        item_log.header("Files retrieved: \n\t\t\t\t\t\t\t\t Name \t\t\t\t <type> \t\t\t\t %Timestamp% \t\t\t\t (Id) \t\t\t\t\t [parent id]")
         for item in items:
             # n.b. items 'shared with me' are in my Drive but WITHOUT a parent
-            lgr.debug(f"{item['name']} <{item['mimeType']}> %{item['modifiedTime']}% ({item['id']}) "
-                      f"{item['parents'] if 'parents' in item.keys() else '[*** NONE ***]'}")
+            item_log.item("%s <%s> %%%s%% (%s) %s", item['name'], item['mimeType'], item['modifiedTime'], item['id'],
+                          item.get('parents', NO_PARENT), p_kind = item['mimeType'])
+        item_log.summary("files retrieved")
         lgr.info(f">> found {len(items)} files older than '{fdate}' in folder '{parent_folder}'.\n")
     else:
         lgr.warning("No files found?!")
 
     return items
 
+def policy_folder_id(p_name:str) -> str:
+    if p_name not in FOLDER_IDS.keys():
+        raise ValueError(f"Policy folder '{p_name}' does NOT exist! Exiting...")
+    return FOLDER_IDS[p_name]
+
+def list_policy_folder(p_fid:str):
+    return mhsda.iter_items(f"{compile_query(p_pid = p_fid)} and trashed = false", POLICY_FIELDS)
+
+def get_policy_files():
+    """retrieve the files to delete according to ALL the rules in the policy file, listing each folder once"""
+    rules = load_policy(policy_file)
+    lgr.info(f"policy '{policy_file}': {len(rules)} rules.")
+    return plan_deletions(rules, policy_folder_id, list_policy_folder, lgr)
+
+def run_daemon():
+    """delete files as they age out of the policy, following the changes feed, until stopped by Ctrl-C OR SIGTERM"""
+    try:
+        # ONE session, so every cycle reuses the same warm Drive service
+        mhsda.begin_session()
+        rules = load_policy(policy_file)
+        policy_key = json.dumps([osp.abspath(policy_file)] + [rule.spec for rule in rules], sort_keys = True)
+        # in testing mode the daemon does NOT delete, so the state it would save does NOT match the Drive
+        daemon = CleanupDaemon(mhsda.drive, rules, policy_folder_id, list_policy_folder, delete_items, CLEANUP_STATE_PATH,
+                               policy_key, lgr, daemon_interval, testing_mode)
+        deletes = [delete_result(item, response, error) for item, response, error in daemon.run()]
+        if save_option and deletes:
+            jfile = save_to_json(get_base_filename(argv[0]), deletes)
+            lgr.info(f"Saved results to '{jfile}'.")
+    finally:
+        if mhsda:
+            mhsda.end_session()
+
 def run():
     deletes = []
     try:
         mhsda.begin_session()
-        files_to_delete = get_files()
-        for item in files_to_delete:
-            fname = item["name"]
-            # find the file type by using the filename extension
-            ftype = get_filetype(fname)[1:]
-            if ftype == filetype:
-                result = delete_file(fname, item["id"], item["modifiedTime"])
-                deletes.append(result)
+        if policy_file:
+            files_to_delete = get_policy_files()
+        else:
+            # find the file type by using the filename extension; the OLDEST files are deleted first
+            files_to_delete = [item for item in get_files() if get_filetype(item["name"])[1:] == filetype][:MAX_FILES_DELETE]
+        deletes = delete_files(files_to_delete)
         if save_option and deletes:
             jfile = save_to_json(get_base_filename(argv[0]), deletes)
             lgr.info(f"Saved results to '{jfile}'.")
@@ -93,12 +159,36 @@ def set_args():
                             help = f"delete ALL files BEFORE this date [YYYY-MM-DD]; DEFAULT = '{DEFAULT_DATE}'")
     arg_parser.add_argument('-p', '--parent', type=str, default=f"{DEFAULT_PARENT_FOLDER}",
                             help = f"Drive folder containing the files to delete; DEFAULT = '{DEFAULT_PARENT_FOLDER}'")
+    arg_parser.add_argument('-c', '--config', type=str, metavar = "POLICY_FILE", default = "",
+                            help = "JSON, TOML OR YAML file of retention rules for ANY number of folders; replaces -f, -d and -p")
+    arg_parser.add_argument('--daemon', action="store_true", default=False,
+                            help = "with -c, keep running and delete files as they age out, following the Drive changes feed")
+    arg_parser.add_argument('--interval', type = float, default = DEFAULT_INTERVAL, metavar = "SECONDS",
+                            help = f"with --daemon, seconds between polls of the changes feed; DEFAULT = {DEFAULT_INTERVAL}")
+    arg_parser.add_argument('-n', '--shards', type = int, default = 1,
+                            help = f"list in this many concurrent modifiedTime windows, 1-{MAX_SHARDS}; "
+                                   "DEFAULT = 1, i.e. page through the files in sequence")
+    arg_parser.add_argument('--summary', action="store_true", default=False,
+                            help = "log ONLY the counts instead of a line for each file, e.g. to delete thousands of files")
+    arg_parser.add_argument('--profile', action="store_true", default=False,
+                            help = "profile the function with cProfile and tracemalloc, and write the reports to the log folder")
+    arg_parser.add_argument('--trace', action="store_true", default=False,
+                            help = "save a timeline of every Drive request and local stage to a Chrome trace-event JSON file")
+    add_rate_args(arg_parser)
     return arg_parser
 
 def get_args(argl:list):
     args = set_args().parse_args(argl)
+    SCHEDULER.configure(args.rate, args.burst)
 
     lgr.info(f"Save option = {args.save}")
+    if args.config:
+        if not osp.isfile(args.config):
+            raise Exception(f"Policy file '{args.config}' does NOT exist! Exiting...")
+        lgr.info(f"DELETING files according to the policy in '{args.config}'")
+        return args.save, args.test, "", "", "", "", args.shards, args.config, args.daemon, args.interval, args.trace, args.profile, args.summary
+    if args.daemon:
+        raise Exception("Daemon mode needs a policy file: use -c POLICY_FILE! Exiting...")
     lgr.info(f"DELETING files with file suffix = '{args.filetype}'")
 
     if args.parent not in FOLDER_IDS.keys():
@@ -111,19 +201,30 @@ def get_args(argl:list):
     ts = f"{args.date}T01:02:03"
     lgr.info(f"DELETING files OLDER than: {ts}\n")
 
-    return args.save, args.test, ts, args.filetype, args.parent, parid
+    return args.save, args.test, ts, args.filetype, args.parent, parid, args.shards, "", False, args.interval, args.trace, args.profile, args.summary
 
 
 if __name__ == "__main__":
     start_time = dt.now()
     log_control = MhsLogger(get_base_filename(argv[0]), con_level = DEFAULT_LOG_LEVEL)
     lgr = log_control.get_logger()
+    # the console and log file are written by a background thread
+    start_queue_logging(lgr)
     lgr.info(f"Start time = {start_time.strftime(RUN_DATETIME_FORMAT)}")
     code = 0
+    save_option = False
     try:
-        save_option, testing_mode, fdate, filetype, parent_folder, parent_id = get_args(argv[1:])
+        save_option, testing_mode, fdate, filetype, parent_folder, parent_id, num_shards, policy_file, daemon_mode, daemon_interval, \
+            trace_option, profile_option, summary_option = get_args(argv[1:])
+        if trace_option:
+            TRACER.start()
         mhsda = MhsDriveAccess(lgr)
-        run()
+        profiler = RunProfiler(DEFAULT_LOG_FOLDER, get_base_filename(argv[0]), lgr) if profile_option else nullcontext()
+        with TRACER.span("run", daemon = daemon_mode), profiler:
+            if daemon_mode:
+                run_daemon()
+            else:
+                run()
     except KeyboardInterrupt as mki:
         lgr.exception(mki)
         code = 13
@@ -137,6 +238,16 @@ if __name__ == "__main__":
         lgr.exception(mex)
         code = 66
 
+    # e.g. whether a slow cleanup is spending its time listing, deleting OR on auth
+    lgr.info(METRICS.summary())
+    if save_option:
+        jfile = save_to_json(get_base_filename(argv[0]) + "_metrics", METRICS.as_dict())
+        lgr.info(f"Saved API metrics to '{jfile}'.")
+    if TRACER.enabled:
+        TRACER.stop()
+        jfile = save_to_json(get_base_filename(argv[0]) + "_trace", TRACER.as_dict())
+        lgr.info(f"Saved a trace of {len(TRACER)} spans to '{jfile}': open it in chrome://tracing OR ui.perfetto.dev")
+
     run_time = (dt.now() - start_time).total_seconds()
     lgr.info(f"Running time = {(run_time // 60)} minutes, {(run_time % 60):2.4} seconds\n")
 
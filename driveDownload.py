@@ -0,0 +1,134 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveDownload.py
+#   -- download engine for fetching many files, and large files in parallel ranges, from my Google Drive
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import mmap
+import os
+import os.path as osp
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from driveScheduler import SCHEDULER
+from driveTrace import STAGE_CAT, TRACER
+from driveSync import file_md5
+from driveUpload import BYTES_PER_MB, MAX_WORKERS
+
+DOWNLOAD_FIELDS = "id, name, mimeType, size, md5Checksum"
+# files at least this size are fetched in ranges of RANGE_SIZE bytes at the same time
+RANGE_THRESHOLD = 16 * BYTES_PER_MB
+RANGE_SIZE      = 8 * BYTES_PER_MB
+GOOGLE_APPS_PREFIX = "application/vnd.google-apps."
+
+
+class DownloadError(Exception):
+    """A downloaded file does NOT match its Drive metadata."""
+
+
+class ParallelDownloader:
+    """Fetch files from my Google drive using bounded pools of worker threads, each with its own Drive service:
+       small files are fetched in parallel, and large files in parallel byte ranges written to a memory-mapped file."""
+    def __init__(self, p_service_factory, p_workers:int, p_lgr:logging.Logger, p_level:int = logging.INFO,
+                 p_range_threshold:int = RANGE_THRESHOLD, p_range_size:int = RANGE_SIZE):
+        """
+        :param p_service_factory: callable returning a NEW Drive service; called once in each worker thread
+        :param p_workers: number of files, AND number of ranges of each large file, to fetch at the same time
+        :param p_lgr:     logger
+        :param p_level:   level to log the progress messages at
+        :param p_range_threshold: size in bytes at which to fetch a file in ranges
+        :param p_range_size:      size in bytes of each range
+        """
+        self._factory = p_service_factory
+        self.workers = max(1, min(p_workers, MAX_WORKERS))
+        self.lgr = p_lgr
+        self.lev = p_level
+        self.range_threshold = p_range_threshold
+        self.range_size = max(1, p_range_size)
+        self._local = threading.local()
+        self._trace_parent = 0
+        self._range_pool = None
+
+    def _files(self):
+        """The 'files' resource for the current worker thread."""
+        files = getattr(self._local, "files", None)
+        if files is None:
+            files = self._factory().files()
+            self._local.files = files
+        return files
+
+    def _fetch(self, p_id:str, p_start:int = -1, p_end:int = -1) -> bytes:
+        """The content of a file OR, with p_start, of the byte range [p_start, p_end] INCLUSIVE."""
+        request = self._files().get_media(fileId = p_id)
+        if p_start >= 0:
+            request.headers["Range"] = f"bytes={p_start}-{p_end}"
+        return SCHEDULER.execute(request)
+
+    def _fetch_ranges(self, p_item:dict, p_path:str, p_size:int):
+        """Fetch a large file in ranges at the same time, writing each range into a preallocated, memory-mapped file."""
+        with open(p_path, "w+b") as fp:
+            fp.truncate(p_size)
+            with mmap.mmap(fp.fileno(), p_size) as mapped:
+                def fetch_range(p_start:int):
+                    end = min(p_start + self.range_size, p_size) - 1
+                    data = self._fetch(p_item["id"], p_start, end)
+                    if len(data) != end - p_start + 1:
+                        raise DownloadError(f"Range {p_start}-{end} of '{p_item['name']}' returned {len(data)} bytes.")
+                    mapped[p_start:end + 1] = data
+                # list() to raise any error from the ranges
+                list( self._range_pool.map(fetch_range, range(0, p_size, self.range_size)) )
+                mapped.flush()
+
+    def _download(self, p_item:dict, p_folder:str) -> str:
+        path = osp.join(p_folder, p_item["name"])
+        size = int(p_item.get("size", 0))
+        with TRACER.span("download", STAGE_CAT, self._trace_parent, name = p_item["name"], size = size):
+            start = time.perf_counter()
+            if size >= self.range_threshold:
+                self._fetch_ranges(p_item, path, size)
+            else:
+                data = self._fetch(p_item["id"]) if size else b""
+                with open(path, "wb") as fp:
+                    fp.write(data)
+            if osp.getsize(path) != size:
+                raise DownloadError(f"'{path}' has {osp.getsize(path)} bytes instead of {size}.")
+            if "md5Checksum" in p_item and file_md5(path) != p_item["md5Checksum"]:
+                os.remove(path)
+                raise DownloadError(f"md5 of '{path}' does NOT match the Drive file '{p_item['id']}'!")
+            self.lgr.log(self.lev, f"Fetched '{p_item['name']}' ({size} bytes) in {(time.perf_counter() - start) * 1000:.1f} ms.")
+            return path
+
+    def download_items(self, p_items:list, p_folder:str) -> list:
+        """Fetch the content of Drive files into a local folder.
+        :param p_items:  Drive items with the DOWNLOAD_FIELDS
+        :param p_folder: path of the local folder to write the files to
+        :return list of the local path of each file, in the same order as p_items
+        """
+        os.makedirs(p_folder, exist_ok = True)
+        binary = [item for item in p_items if not item.get("mimeType", "").startswith(GOOGLE_APPS_PREFIX)]
+        for item in p_items:
+            if item not in binary:
+                self.lgr.warning(f"Skip '{item['name']}': a Google '{item['mimeType']}' has NO binary content to fetch.")
+        self.lgr.log(self.lev, f"Fetching {len(binary)} files to '{p_folder}' with {self.workers} workers.")
+        start = time.perf_counter()
+        # the downloads in the worker threads are nested in the span of the caller
+        self._trace_parent = TRACER.current()
+        with ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = "drive-range") as range_pool, \
+             ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = "drive-download") as pool:
+            self._range_pool = range_pool
+            paths = list( pool.map(lambda item: self._download(item, p_folder), binary) )
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        megabytes = sum(int(item.get("size", 0)) for item in binary) / BYTES_PER_MB
+        self.lgr.log(self.lev, f"Fetched {len(paths)} files ({megabytes:.2f} MB) in {elapsed:.2f} seconds: "
+                               f"{len(paths) / elapsed:.2f} files/s, {megabytes / elapsed:.2f} MB/s")
+        return paths
@@ -0,0 +1,249 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveExpiry.py
+#   -- cleanup daemon: follow the Drive changes feed and delete the files of a retention policy as they age out
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.11+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import heapq
+import json
+import logging
+import os
+import os.path as osp
+import signal
+import threading
+import time
+from datetime import datetime as dt, timedelta, timezone
+from drivePaging import MAX_PAGE_SIZE
+from drivePolicy import POLICY_FIELDS
+from driveScheduler import SCHEDULER
+from driveShard import format_drive_time
+
+CLEANUP_STATE_FILENAME = "cleanup_state.json"
+DEFAULT_INTERVAL = 300
+# seconds to wait before trying a failed delete again
+RETRY_DELAY = 60
+EXPIRY_CHANGE_FIELDS = f"nextPageToken, newStartPageToken, changes(fileId, removed, file({POLICY_FIELDS}, parents, trashed))"
+
+
+class ExpiryQueue:
+    """The files tracked by each retention rule, with a heap of the times they become old enough to delete.
+       A file that changes is pushed again; its out-of-date heap entries are skipped when they come to the top."""
+    def __init__(self, p_num_rules:int):
+        self.tracked = [{} for _ in range(p_num_rules)]
+        self._heap = []
+        # rules with files added OR removed since the last cycle
+        self.changed = set()
+
+    def __len__(self):
+        return sum(len(items) for items in self.tracked)
+
+    def track(self, p_rule:int, p_item:dict, p_expires:str):
+        self.tracked[p_rule][p_item["id"]] = p_item
+        self.changed.add(p_rule)
+        if p_expires:
+            heapq.heappush(self._heap, (p_expires, p_rule, p_item["id"], p_item["modifiedTime"]))
+
+    def untrack(self, p_id:str) -> bool:
+        """Stop tracking a file for ALL the rules.
+        :return True if any rule was tracking it
+        """
+        found = False
+        for num, items in enumerate(self.tracked):
+            if items.pop(p_id, None) is not None:
+                self.changed.add(num)
+                found = True
+        return found
+
+    def retry(self, p_id:str, p_when:str):
+        """Check the rules tracking a file again at p_when, e.g. after its delete failed:
+           its heap entry was popped when it became due, so otherwise ONLY a change to another file of the rule would."""
+        for num, items in enumerate(self.tracked):
+            item = items.get(p_id)
+            if item:
+                heapq.heappush(self._heap, (p_when, num, p_id, item["modifiedTime"]))
+
+    def next_expiry(self) -> str:
+        return self._heap[0][0] if self._heap else ""
+
+    def due(self, p_now:str) -> set:
+        """The rules with at least one file that is now old enough to delete."""
+        rules = set()
+        while self._heap and self._heap[0][0] <= p_now:
+            _, rule, fid, modified = heapq.heappop(self._heap)
+            item = self.tracked[rule].get(fid)
+            if item and item["modifiedTime"] == modified:
+                rules.add(rule)
+        return rules
+
+    def dump(self) -> list:
+        return [list(items.values()) for items in self.tracked]
+
+
+class CleanupDaemon:
+    """Keep Drive folders within their retention rules from the changes feed, instead of listing the folders every run:
+       after one listing of each folder, the cost of each cycle depends on the number of changes, NOT the size of the folders."""
+    def __init__(self, p_drive, p_rules:list, p_folder_id, p_list_folder, p_delete, p_state_path:str, p_policy_key:str,
+                 p_lgr:logging.Logger, p_interval:float = DEFAULT_INTERVAL, p_test:bool = False, p_retry_delay:float = RETRY_DELAY):
+        """
+        :param p_drive:       the warm Drive service of the session, i.e. NOT the 'files' resource
+        :param p_rules:       retention rules
+        :param p_folder_id:   callable giving the Drive id of a rule folder
+        :param p_list_folder: callable giving the items, with the POLICY_FIELDS, in a Drive folder
+        :param p_delete:      callable to delete a list of items, returning (item, response, error) for each, like batch_delete()
+        :param p_state_path:  JSON file to keep the changes page token and the tracked files in between runs
+        :param p_policy_key:  identifies the policy; the tracked files are ONLY reused for the same policy
+        :param p_lgr:         logger
+        :param p_interval:    seconds between polls of the changes feed
+        :param p_test:        testing mode: NO files are deleted, and the saved state is NOT changed
+        :param p_retry_delay: seconds to wait before trying a failed delete again
+        """
+        self.drive = p_drive
+        self.rules = p_rules
+        self.folder_ids = [p_folder_id(rule.folder) for rule in p_rules]
+        self._list_folder = p_list_folder
+        self._delete = p_delete
+        self.state_path = p_state_path
+        self.policy_key = p_policy_key
+        self.lgr = p_lgr
+        self.interval = p_interval
+        self.test = p_test
+        self.retry_delay = p_retry_delay
+        self.queue = ExpiryQueue(len(p_rules))
+        self.page_token = ""
+        self.num_cycles = 0
+        self.stop_event = threading.Event()
+
+    def stop(self, *_):
+        """Finish the current cycle, save the state and exit: used as the SIGINT and SIGTERM handler."""
+        self.lgr.info("Cleanup daemon stopping after the current cycle.")
+        self.stop_event.set()
+
+    def _track(self, p_item:dict):
+        """Track a new OR changed file for each rule of a folder it is in, OR stop tracking it."""
+        self.queue.untrack(p_item["id"])
+        if p_item.get("trashed"):
+            return
+        parents = p_item.get("parents", [])
+        for num, rule in enumerate(self.rules):
+            if self.folder_ids[num] in parents and rule.matches(p_item):
+                self.queue.track(num, p_item, rule.expires(p_item))
+
+    def _load_state(self) -> bool:
+        if not osp.isfile(self.state_path):
+            return False
+        with open(self.state_path) as fp:
+            state = json.load(fp)
+        if state.get("policy") != self.policy_key or len(state.get("tracked", [])) != len(self.rules):
+            self.lgr.warning(f"The policy has changed since the saved state in '{self.state_path}': starting again.")
+            return False
+        self.page_token = state["page_token"]
+        for num, items in enumerate(state["tracked"]):
+            for item in items:
+                self.queue.track(num, item, self.rules[num].expires(item))
+        self.lgr.info(f"Resumed {len(self.queue)} tracked files from '{self.state_path}'.")
+        return True
+
+    def save_state(self):
+        # a test run must NOT stop a later real run from deleting the files it only reported
+        if self.test:
+            return
+        part = self.state_path + ".part"
+        with open(part, 'w') as fp:
+            json.dump({"policy":self.policy_key, "page_token":self.page_token, "tracked":self.queue.dump()}, fp)
+        os.replace(part, self.state_path)
+
+    def bootstrap(self):
+        """Track the files of each folder with ONE listing, starting the changes feed BEFORE listing so nothing is missed."""
+        self.page_token = SCHEDULER.execute( self.drive.changes().getStartPageToken() )["startPageToken"]
+        for fid in dict.fromkeys(self.folder_ids):
+            for item in self._list_folder(fid):
+                item.setdefault("parents", [fid])
+                self._track(item)
+        self.lgr.info(f"Tracking {len(self.queue)} files in {len(set(self.folder_ids))} folders.")
+
+    def poll_changes(self) -> int:
+        """Apply the changes since the last poll to the tracked files.
+        :return number of changes
+        """
+        count = 0
+        page_token = self.page_token
+        while page_token:
+            results = SCHEDULER.execute( self.drive.changes().list(pageToken = page_token, spaces = "drive", pageSize = MAX_PAGE_SIZE,
+                                                                   includeRemoved = True, fields = EXPIRY_CHANGE_FIELDS) )
+            for change in results.get("changes", []):
+                item = change.get("file")
+                if change.get("removed") or not item:
+                    self.queue.untrack(change["fileId"])
+                else:
+                    self._track(item)
+                count += 1
+            if "newStartPageToken" in results:
+                self.page_token = results["newStartPageToken"]
+            page_token = results.get("nextPageToken")
+        return count
+
+    def cycle(self) -> list:
+        """Poll the changes feed, then delete the files that have aged out OR exceed a size limit.
+        :return list of (item, response, error) for each delete; EMPTY in testing mode
+        """
+        start = time.perf_counter()
+        requests_before = SCHEDULER.stats()["requests"]
+        changes = self.poll_changes()
+        now = dt.now(timezone.utc)
+        # a size limit OR keep_newest depends on the other files, so those rules are checked whenever their files change
+        rules = self.queue.due(format_drive_time(now)) | {num for num in self.queue.changed
+                                                          if self.rules[num].max_total_size is not None or self.rules[num].keep_newest}
+        self.queue.changed.clear()
+        expired = {}
+        for num in sorted(rules):
+            for item in self.rules[num].expired(list(self.queue.tracked[num].values()), now):
+                expired.setdefault(item["id"], item)
+        to_delete = sorted(expired.values(), key = lambda item: item["modifiedTime"])
+        results = []
+        if self.test:
+            for item in to_delete:
+                self.lgr.info(f"Testing: Would have deleted file '{item['name']}' with date: {item['modifiedTime']}")
+        elif to_delete:
+            results = self._delete(to_delete)
+            # a failed delete stays tracked, and is due again after the retry delay
+            retry_at = format_drive_time(now + timedelta(seconds = self.retry_delay))
+            for item, _, error in results:
+                if error is None:
+                    self.queue.untrack(item["id"])
+                else:
+                    self.queue.retry(item["id"], retry_at)
+        self.save_state()
+        self.num_cycles += 1
+        deleted = sum(1 for _, _, error in results if error is None)
+        self.lgr.info(f"cycle #{self.num_cycles}: {changes} changes, {deleted} of {len(expired)} files deleted, {len(self.queue)} tracked; "
+                      f"{SCHEDULER.stats()['requests'] - requests_before} API calls in {time.perf_counter() - start:.2f} seconds; "
+                      f"next expiry = {self.queue.next_expiry() or 'NONE'}")
+        return results
+
+    def run(self, p_max_cycles:int = 0) -> list:
+        """Poll and delete every interval until stopped by SIGINT, SIGTERM OR after p_max_cycles cycles.
+        :return list of ALL the delete results
+        """
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+        if not self._load_state():
+            self.bootstrap()
+        results = []
+        while not self.stop_event.is_set():
+            results.extend( self.cycle() )
+            if p_max_cycles and self.num_cycles >= p_max_cycles:
+                break
+            self.stop_event.wait(self.interval)
+        self.save_state()
+        self.lgr.info(f"Cleanup daemon stopped after {self.num_cycles} cycles.")
+        return results
@@ -0,0 +1,118 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveExport.py
+#   -- export Google Sheets, Docs, etc from my Google Drive to local files, streamed to disk and cached by version
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import glob
+import logging
+import os
+import os.path as osp
+import re
+import shutil
+import time
+from googleapiclient.http import MediaIoBaseDownload
+from driveScheduler import SCHEDULER
+
+EXPORT_CACHE_FOLDER = "export_cache"
+EXPORT_FIELDS = "id, name, mimeType, modifiedTime"
+# size of each ranged GET: files.export does NOT honour Range, so Drive sends the WHOLE export in the first response,
+# which httplib2 holds in memory; the chunks ONLY matter if a partial response is ever returned
+EXPORT_CHUNK_SIZE = 1024 * 1024
+
+EXPORT_FORMATS = {
+    "xlsx" : "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "ods"  : "application/x-vnd.oasis.opendocument.spreadsheet",
+    "csv"  : "text/csv",
+    "docx" : "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "odt"  : "application/vnd.oasis.opendocument.text",
+    "txt"  : "text/plain",
+    "pdf"  : "application/pdf"
+}
+# format to use for each type of Google file when none is requested
+DEFAULT_EXPORT_FORMATS = {
+    "application/vnd.google-apps.spreadsheet"  : "xlsx",
+    "application/vnd.google-apps.document"     : "docx",
+    "application/vnd.google-apps.presentation" : "pdf",
+    "application/vnd.google-apps.drawing"      : "pdf"
+}
+
+def export_format(p_item:dict, p_format:str = "") -> str:
+    """The format to export a Google file in: p_format if given, else the default for the type of the file."""
+    fmt = p_format or DEFAULT_EXPORT_FORMATS.get(p_item["mimeType"], "pdf")
+    if fmt not in EXPORT_FORMATS.keys():
+        raise ValueError(f"Export format '{fmt}' NOT available! Use one of {list(EXPORT_FORMATS.keys())}.")
+    return fmt
+
+
+class ExportCache:
+    """Local copies of exported Google files, one per file id, modifiedTime AND format:
+       an unchanged file is NEVER exported again, and the copies of older versions are removed."""
+    def __init__(self, p_folder:str):
+        self.folder = p_folder
+        os.makedirs(p_folder, exist_ok = True)
+
+    def path(self, p_id:str, p_modified:str, p_format:str) -> str:
+        # modifiedTime, e.g. '2026-10-17T06:09:19.123Z', is reduced to its digits to make a safe filename
+        return osp.join(self.folder, f"{p_id}.{re.sub(r'[^0-9]', '', p_modified)}.{p_format}")
+
+    def prune(self, p_id:str, p_format:str, p_keep:str):
+        """Remove the copies of the other versions of a file in a format."""
+        for old in glob.glob(osp.join(self.folder, f"{glob.escape(p_id)}.*.{p_format}")):
+            if old != p_keep:
+                os.remove(old)
+
+def stream_export(p_files, p_id:str, p_format:str, p_path:str, p_chunk_size:int = EXPORT_CHUNK_SIZE) -> int:
+    """Write the export of a Google file to a local file as each response arrives.
+       NOT streamed from the network: Drive ignores the Range of an export, so the whole export is in memory ONCE,
+       but only one export at a time, and it goes to disk right away instead of being kept in a buffer.
+    :return number of bytes written
+    """
+    part = p_path + ".part"
+    try:
+        with open(part, "wb") as fp:
+            downloader = MediaIoBaseDownload(fp, p_files.export_media(fileId = p_id, mimeType = EXPORT_FORMATS[p_format]),
+                                             chunksize = p_chunk_size)
+            done = False
+            while not done:
+                # a response is only written once it has been received, so a retry just asks for the same range again
+                status, done = SCHEDULER.call(downloader.next_chunk)
+        # the cache NEVER holds a partial export
+        os.replace(part, p_path)
+    finally:
+        if osp.exists(part):
+            os.remove(part)
+    return osp.getsize(p_path)
+
+def export_file(p_files, p_item:dict, p_format:str, p_dest:str, p_cache:ExportCache, p_lgr:logging.Logger,
+                p_level:int = logging.INFO, p_chunk_size:int = EXPORT_CHUNK_SIZE) -> str:
+    """Export a Google file to a local folder, from the cache if this version was exported before.
+    :param p_files:  Drive 'files' resource
+    :param p_item:   Drive item with the EXPORT_FIELDS
+    :param p_format: key of EXPORT_FORMATS, OR empty for the default format of the type of file
+    :param p_dest:   path to the local folder to write the file to
+    :param p_cache:  local cache of exports
+    :return path of the local file
+    """
+    fmt = export_format(p_item, p_format)
+    cached = p_cache.path(p_item["id"], p_item["modifiedTime"], fmt)
+    if osp.isfile(cached):
+        p_lgr.log(p_level, f"'{p_item['name']}' is unchanged since {p_item['modifiedTime']}: using the cached '{fmt}' export.")
+    else:
+        start = time.perf_counter()
+        size = stream_export(p_files, p_item["id"], fmt, cached, p_chunk_size)
+        p_cache.prune(p_item["id"], fmt, cached)
+        p_lgr.log(p_level, f"Exported '{p_item['name']}' as '{fmt}' ({size} bytes) in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    os.makedirs(p_dest, exist_ok = True)
+    path = osp.join(p_dest, f"{p_item['name']}.{fmt}")
+    shutil.copyfile(cached, path)
+    return path
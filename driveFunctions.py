@@ -14,20 +14,20 @@ __python_version__ = "3.9+"
 __google_api_python_client_version__ = "2.149.0"
 __google_auth_oauthlib_version__     = "1.2.1"
 __created__ = "2021-05-14"
-__updated__ = "2024-11-03"
+__updated__ = "2026-10-17"
 
 from sys import argv, path
+from itertools import islice
 import os
 import glob
 import shutil
 import threading
+from contextlib import nullcontext
 from argparse import ArgumentParser
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
 import logging
 path.append("/home/marksa/git/Python/utils")
 from mhsLogging import MhsLogger, DEFAULT_LOG_FOLDER, DEFAULT_LOG_LEVEL
@@ -35,6 +35,23 @@ from mhsUtils import *
 SECRETS_DIR:str = osp.join(BASE_PYTHON_FOLDER, f"google{osp.sep}drive{osp.sep}secrets")
 path.append(SECRETS_DIR)
 from folder_ids import *
+from drivePaging import MAX_PAGE_SIZE, prefetch_page_items
+from driveBatch import batch_delete
+from driveSession import SERVICE_POOL
+from driveTrace import SESSION_CAT, TRACER, WAIT_CAT
+from driveUpload import DEFAULT_WORKERS, MAX_WORKERS, ParallelUploader, build_thread_service, upload_file
+from driveIndex import DriveIndex, INDEX_FILENAME
+from driveQuery import compile_query
+from driveScheduler import SCHEDULER, add_rate_args
+from driveTree import TREE_FILENAME, load_or_crawl
+from driveSync import HASH_CACHE_FILENAME, SYNC_FIELDS, files_to_sync, sync_query
+from driveJournal import JOURNAL_FILENAME, UploadJournal, job_key, settle_interrupted
+from driveDownload import DOWNLOAD_FIELDS, ParallelDownloader
+from driveShard import MAX_SHARDS, ShardedLister
+from driveExport import EXPORT_CACHE_FOLDER, EXPORT_FIELDS, EXPORT_FORMATS, ExportCache, export_file
+from driveMetrics import METRICS
+from driveProfile import RunProfiler
+from driveLogging import NO_PARENT, ItemLog, start_queue_logging
 
 # see https://github.com/googleapis/google-api-python-client/issues/299
 lg.getLogger("googleapiclient.discovery_cache").setLevel(lg.ERROR)
@@ -43,6 +60,11 @@ JSON_TOKEN = f"token.json"
 CREDENTIALS_FILE:str    = osp.join(SECRETS_DIR, f"credentials.json")
 DRIVE_TOKEN_PATH:str    = osp.join(SECRETS_DIR, JSON_TOKEN)
 DRIVE_ACCESS_SCOPE:list = ["https://www.googleapis.com/auth/drive"]
+DRIVE_INDEX_PATH:str    = osp.join(SECRETS_DIR, INDEX_FILENAME)
+DRIVE_TREE_PATH:str     = osp.join(SECRETS_DIR, TREE_FILENAME)
+HASH_CACHE_PATH:str     = osp.join(SECRETS_DIR, HASH_CACHE_FILENAME)
+UPLOAD_JOURNAL_PATH:str = osp.join(SECRETS_DIR, JOURNAL_FILENAME)
+EXPORT_CACHE_PATH:str   = osp.join(SECRETS_DIR, EXPORT_CACHE_FOLDER)
 
 DEFAULT_FILETYPE      = "txt"
 DEFAULT_DATE          = "2027-11-13"
@@ -53,10 +75,13 @@ FOLDERS_LABEL      = "folders"
 GET_FILES_LABEL    = "getfiles"
 DELETE_FILES_LABEL = "deletefiles"
 METADATA_LABEL     = "metadata"
+DOWNLOAD_LABEL     = "download"
+EXPORT_LABEL       = "export"
 NO_SESSION_MSG     = "No Session!"
 MAX_FILES_DELETE   = 500
 DEFAULT_NUM_FILES  = 100
 MAX_NUM_ITEMS      = 800
+ITEM_FIELDS        = "id, name, mimeType, modifiedTime, parents"
 
 def get_credentials(p_lgr:logging.Logger):
     """Get the proper credentials needed to access my Google drive."""
@@ -86,32 +111,116 @@ def get_credentials(p_lgr:logging.Logger):
 
 class MhsDriveAccess:
     """Start a locked session, read/write to my google drive, end the session."""
-    def __init__(self, p_save:bool, p_mime:bool, p_test:bool, p_lgctrl:MhsLogger, p_level:int = DEFAULT_LOG_LEVEL):
+    def __init__(self, p_save:bool, p_mime:bool, p_test:bool, p_lgctrl:MhsLogger, p_level:int = DEFAULT_LOG_LEVEL,
+                 p_fresh:bool = False, p_shards:int = 1, p_summary:bool = False):
         self.save = p_save
         self.mime = p_mime
         self.test = p_test
         self.lgr = p_lgctrl.get_logger()
         self.lev = p_level
+        self.fresh = p_fresh
+        # log ONLY the counts instead of a line for each item
+        self.summary = p_summary
+        # number of modifiedTime windows to list fresh results in, at the same time
+        self.shards = p_shards
         # prevent different instances/threads from writing at the same time
         self._lock = threading.Lock()
         self.lgr.info(f"Launch '{self.__class__.__name__}' instance at: {get_current_time()}")
         self.service = None
+        self.drive = None
+        self.creds = None
+        # answer queries from the local index unless FRESH results are requested
+        self.index = None if p_fresh else DriveIndex(DRIVE_INDEX_PATH, self.lgr)
+        self._index_synced = False
+        self.tree = None
+        self._tree_crawled = False
 
     def begin_session(self):
-        """Activate a UNIQUE session to the drive."""
-        self._lock.acquire()
-        self.lgr.info(f"acquired Drive lock at: {get_current_time()}")
-        creds = get_credentials(self.lgr)
-        service = build("drive", "v3", credentials = creds)
-        self.service = service.files()
+        """Activate a UNIQUE session to the drive, reusing the Drive service already built in this process."""
+        with TRACER.span("session.begin", SESSION_CAT):
+            # time spent queued behind another session
+            with TRACER.span("session.lock", WAIT_CAT):
+                self._lock.acquire()
+            self.lgr.info(f"acquired Drive lock at: {get_current_time()}")
+            self.drive, self.creds = SERVICE_POOL.acquire(lambda: get_credentials(self.lgr), self.lgr, DRIVE_TOKEN_PATH)
+            self.service = self.drive.files()
+
+    def _synced_index(self):
+        """The local index, brought up to date once per session, OR None if fresh results were requested."""
+        if self.index and not self._index_synced:
+            self.index.refresh(self.drive)
+            self._index_synced = True
+        return self.index
+
+    def folder_id(self, p_name:str) -> str:
+        """Find the id of a Drive folder from its name in FOLDER_IDS OR its path from my root folder, e.g. 'Finance/2025/Q3'."""
+        if p_name in FOLDER_IDS.keys():
+            return FOLDER_IDS[p_name]
+        if not self.tree:
+            self.tree = load_or_crawl(DRIVE_TREE_PATH, lambda: build_thread_service(self.creds), self.lgr, self.fresh)
+            self._tree_crawled = self.fresh
+        fid = self.tree.resolve(p_name)
+        # the saved folder tree may be out of date, so crawl again before giving up
+        if not fid and not self._tree_crawled:
+            self.tree = load_or_crawl(DRIVE_TREE_PATH, lambda: build_thread_service(self.creds), self.lgr, True)
+            self._tree_crawled = True
+            fid = self.tree.resolve(p_name)
+        if fid:
+            return fid
+        raise Exception(f"Drive folder '{p_name}' NOT found! Exiting...")
 
     def end_session(self):
         """RELEASE this drive session."""
+        self._index_synced = False
         self.service = None
+        self.drive = None
         if self._lock and self._lock.locked():
             self._lock.release()
             self.lgr.info(f"released Drive lock at: {get_current_time()}")
 
+    def make_query(self, p_mimetype:str = "", p_date:str = "", p_pid:str = "", p_extension:str = "") -> str:
+        """Build a Drive query string from the specified item properties.
+        :param p_mimetype: mimeType of files to retrieve
+        :param p_date: find files OLDER than this date
+        :param p_pid:  id of the parent Drive folder to search in
+        :param p_extension: filename extension of files to retrieve
+        :return: the query OR an empty string if NO properties were specified
+        """
+        iquery = compile_query(p_mimetype, p_date, p_pid, p_extension = p_extension)
+        if not iquery:
+            self.lgr.warning("No Query parameters!")
+        return iquery
+
+    def iter_items(self, p_query:str, p_fields:str = ITEM_FIELDS, p_page_size:int = MAX_PAGE_SIZE, p_limit:int = 0):
+        """Yield the items matching a Drive query as each page arrives; paging stops when the caller stops iterating.
+        :param p_query: Drive query string
+        :param p_fields: fields to obtain for each item
+        :param p_page_size: number of items to request per page
+        :param p_limit: stop requesting pages once this many items are fetched; 0 for NO limit
+        """
+        self.lgr.log(self.lev, f"query = '{p_query}'; page size = '{p_page_size}'")
+        # the next page is requested while the caller is still working on the current one
+        return prefetch_page_items(lambda: SERVICE_POOL.lease(self.creds), p_query, p_fields, p_page_size,
+                                   p_limit = p_limit)
+
+    def select_items(self, p_mimetype:str = "", p_date:str = "", p_pid:str = "", p_page_size:int = MAX_PAGE_SIZE,
+                     p_extension:str = "", p_limit:int = 0):
+        """Yield the specified items from the local index OR, if fresh results were requested, directly from my Google drive.
+        :param p_mimetype: mimeType of files to retrieve
+        :param p_date: find files OLDER than this date
+        :param p_pid:  id of the parent Drive folder to search in
+        :param p_page_size: number of items to request per page from the drive
+        :param p_extension: filename extension of files to retrieve; results from the drive are only CANDIDATES
+        :param p_limit: number of items needed from the drive; 0 for ALL
+        """
+        if self._synced_index():
+            return self.index.find(p_mimetype, p_date, p_pid, p_extension = p_extension)
+        if self.shards > 1:
+            # the matching items are listed in concurrent shards, instead of paging in sequence, up to the limit
+            lister = ShardedLister(lambda: build_thread_service(self.creds), self.shards, self.lgr, self.lev)
+            return iter( lister.list_items(self.make_query(p_mimetype, p_date, p_pid, p_extension), ITEM_FIELDS, p_page_size, p_limit) )
+        return self.iter_items(self.make_query(p_mimetype, p_date, p_pid, p_extension), p_page_size = p_page_size, p_limit = p_limit)
+
     def find_items(self, p_mimetype:str= "", p_date:str= "", p_pid:str= "", p_limit:int=0) -> list:
         """Find the specified items on my Google drive.
         :param p_mimetype: mimeType of files to retrieve
@@ -122,35 +231,13 @@ class MhsDriveAccess:
         if not self.service:
             self.lgr.warning(NO_SESSION_MSG)
             return [NO_SESSION_MSG]
-        iquery = None
-        if p_mimetype:
-            iquery = f"mimeType='{p_mimetype}'"
-        if p_date:
-            iquery = f"{iquery} and modifiedTime < '{p_date}'" if iquery else f"modifiedTime < '{p_date}'"
-        if p_pid:
-            iquery = f"{iquery} and '{p_pid}' in parents" if iquery else f"'{p_pid}' in parents"
-        if not iquery:
+        if not (p_mimetype or p_date or p_pid):
             self.lgr.warning("No Query parameters!")
             return []
-
         limit = p_limit if p_limit else MAX_NUM_ITEMS
-        self.lgr.log(self.lev, f"query = '{iquery}'; limit = '{limit}'")
-        try:
-            page_token = None
-            all_items = []
-            while True:
-                results = self.service.list( q = iquery, spaces = "drive",
-                                             fields = "nextPageToken, files(id, name, mimeType, modifiedTime, parents)",
-                                             pageToken = page_token ).execute()
-                items = results.get("files", [])
-                all_items = all_items + items if all_items else items
-                self.lgr.log(self.lev, f"type(items) = {type(items)} \n page_token = {page_token}")
-                page_token = results.get("nextPageToken", None)
-                if page_token is None or len(all_items) >= limit:
-                    break
-            self.lgr.log(self.lev, f">> Found {len(all_items)} items.\n")
-        except Exception as ffex:
-            raise ffex
+        self.lgr.log(self.lev, f"limit = '{limit}'")
+        all_items = list( islice(self.select_items(p_mimetype, p_date, p_pid, limit, p_limit = limit), limit) )
+        self.lgr.log(self.lev, f">> Found {len(all_items)} items.\n")
         return all_items
 
     def delete_files(self, p_pid:str, p_filetype:str, p_filedate:str):
@@ -164,23 +251,30 @@ class MhsDriveAccess:
             self.lgr.warning(NO_SESSION_MSG)
             return [NO_SESSION_MSG]
         mimetype = FILE_MIME_TYPES[p_filetype] if self.mime else ""
-        items = self.find_items(p_date = p_filedate, p_pid = p_pid, p_mimetype = mimetype)
+        extension = "" if self.mime else p_filetype
+        iquery = self.make_query(p_date = p_filedate, p_pid = p_pid, p_mimetype = mimetype, p_extension = extension)
+        if not iquery:
+            return []
+        # stop paging as soon as enough matching files are found
+        candidates = []
+        for item in self.iter_items(iquery):
+            if self.mime or get_filetype(item['name'])[1:] == p_filetype:
+                candidates.append(item)
+                if len(candidates) >= MAX_FILES_DELETE:
+                    break
         results = []
-        for item in items:
-            fname = item['name']
-            fid = item['id']
-            fdate = item['modifiedTime']
-            ftype = get_filetype(fname)[1:]
-            if self.mime or ftype == p_filetype:
-                if self.test:
-                    result = f"Testing: Would have deleted file '{fname}' with date: {fdate}"
-                else:
-                    response = self.service.delete(fileId = fid).execute()
-                    result = f"delete response[{fname} @ {fdate}] = '{response}'."
-                self.lgr.log(self.lev, result)
+        item_log = ItemLog(self.lgr, self.lev, self.summary)
+        if self.test:
+            for item in candidates:
+                result = f"Testing: Would have deleted file '{item['name']}' with date: {item['modifiedTime']}"
+                item_log.item("%s", result, p_kind = "testing")
                 results.append(result)
-                if len(results) >= MAX_FILES_DELETE:
-                    break
+        else:
+            for item, response, error in batch_delete(self.drive, candidates, p_lgr = self.lgr):
+                result = f"delete response[{item['name']} @ {item['modifiedTime']}] = '{repr(error) if error else response}'."
+                item_log.item("%s", result, p_kind = "error" if error else "deleted")
+                results.append(result)
+        item_log.summary("delete results")
         ftf = p_filetype if self.mime else f".{p_filetype}"
         num_results = len(results)
         results_msg = f">> {num_results} '{ftf}' files found.\n"
@@ -189,11 +283,16 @@ class MhsDriveAccess:
         self.lgr.log(self.lev, results_msg)
         return results
 
-    def send_folder(self, p_path:str, p_pid:str, p_parent:str):
+    def send_folder(self, p_path:str, p_pid:str, p_parent:str, p_workers:int = DEFAULT_WORKERS, p_sync:bool = False,
+                    p_recursive:bool = False, p_resume:bool = False):
         """SEND all the files in a local folder to my Google drive.
         :param p_path: path to the local folder to send files from
         :param p_pid:  id of the parent folder on the drive to send the files to
         :param p_parent: name of the parent folder on the drive
+        :param p_workers: number of files to send concurrently
+        :param p_sync: ONLY send the files that are new or changed, and update the changed files in place
+        :param p_recursive: ALSO send the subfolders, creating the same folder tree on the drive
+        :param p_resume: continue an interrupted upload of the same folder, from the upload journal
         """
         if not self.service:
             self.lgr.warning(NO_SESSION_MSG)
@@ -201,16 +300,42 @@ class MhsDriveAccess:
         responses = []
         try:
             self.lgr.log(self.lev, f"Sending folder '{p_path}' to Drive://{p_parent}/")
-            fgw = glob.glob(p_path + osp.sep + '*')
-            for item in fgw:
-                if osp.isfile(item):
-                    reply = self.send_file(item, p_pid, p_parent)
-                    if reply:
-                        responses.append(reply)
+            if p_recursive:
+                uploader = ParallelUploader(lambda: build_thread_service(self.creds), p_workers, self.lgr, self.lev)
+                sent = uploader.send_tree(p_path, p_pid, self.get_mime_type, p_cache_path = HASH_CACHE_PATH if p_sync else "")
+                return [[fid] for fid in sent.values()]
+            journal = UploadJournal(UPLOAD_JOURNAL_PATH, job_key(p_path, p_pid), self.lgr)
+            try:
+                if p_resume and journal.counts():
+                    self.lgr.log(self.lev, f"Resume the upload with files in each state: {journal.counts()}")
+                    settle_interrupted(journal, self.iter_items(sync_query(p_pid), SYNC_FIELDS))
+                    to_send = journal.remaining()
+                else:
+                    fgw = [item for item in glob.glob(p_path + osp.sep + '*') if osp.isfile(item)]
+                    to_send = [(item, self.get_mime_type(item)) for item in fgw]
+                    if p_sync:
+                        to_send = files_to_sync(to_send, self.iter_items(sync_query(p_pid), SYNC_FIELDS), HASH_CACHE_PATH,
+                                                self.lgr, self.lev)
+                    journal.start(to_send)
+                uploader = ParallelUploader(lambda: build_thread_service(self.creds), p_workers, self.lgr, self.lev)
+                responses = [[fid] for fid in uploader.send_files(to_send, p_pid, p_parent, p_journal = journal)]
+                # ALL the files were sent so there is nothing to resume
+                journal.clear()
+            finally:
+                journal.close()
         except Exception as sdex:
             raise sdex
         return responses
 
+    @staticmethod
+    def get_mime_type(p_path:str) -> str:
+        """Find the mimeType to send a local file with, according to the filename extension."""
+        mime_type = FILE_MIME_TYPES["txt"]
+        f_type = get_filetype(p_path)
+        if f_type and f_type in FILE_MIME_TYPES.keys():
+            mime_type = FILE_MIME_TYPES[f_type]
+        return mime_type
+
     def send_file(self, p_path:str, p_pid:str, p_parent:str):
         """SEND a local file to my Google drive.
         :param p_path: path to the local folder to send files from
@@ -221,21 +346,60 @@ class MhsDriveAccess:
             self.lgr.warning(NO_SESSION_MSG)
             return [NO_SESSION_MSG]
         try:
-            mime_type = FILE_MIME_TYPES["txt"]
-            f_type = get_filetype(p_path)
-            if f_type and f_type in FILE_MIME_TYPES.keys():
-                mime_type = FILE_MIME_TYPES[f_type]
-
-            file_metadata = {"name":get_filename(p_path), "parents":[p_pid]}
-            media = MediaFileUpload(p_path, mimetype = mime_type, resumable = True)
             self.lgr.log(self.lev, f"Sending file '{p_path}' to Drive://{p_parent}/")
-            file = self.service.create(body = file_metadata, media_body = media, fields = "id").execute()
-            response = file.get("id")
+            # the upload strategy is chosen by the size of the file
+            response = upload_file(self.service, p_path, self.get_mime_type(p_path), p_pid, p_lgr = self.lgr, p_level = self.lev)
             self.lgr.log(self.lev, f"Success: Google Id = {response}")
         except Exception as sfex:
             raise sfex
         return [response]
 
+    def download(self, p_targets:list, p_dest:str, p_workers:int = DEFAULT_WORKERS):
+        """FETCH files from my Google drive to a local folder.
+        :param p_targets: names in FOLDER_IDS or FILE_IDS, Drive folder paths, OR ids, of the folders|files to fetch
+        :param p_dest:    path to the local folder to write the files to
+        :param p_workers: number of files, and ranges of each large file, to fetch concurrently
+        """
+        if not self.service:
+            self.lgr.warning(NO_SESSION_MSG)
+            return [NO_SESSION_MSG]
+        items = []
+        for target in p_targets:
+            if target in FILE_IDS.keys():
+                fid = FILE_IDS[target]
+            elif target in FOLDER_IDS.keys() or osp.sep in target or '/' in target:
+                fid = self.folder_id(target)
+            else:
+                fid = target
+            item = SCHEDULER.execute( self.service.get(fileId = fid, fields = DOWNLOAD_FIELDS) )
+            if item["mimeType"] == FILE_MIME_TYPES["gfldr"]:
+                self.lgr.log(self.lev, f"Fetching the files in Drive folder '{target}'")
+                items.extend( child for child in self.iter_items(sync_query(fid), DOWNLOAD_FIELDS)
+                              if child["mimeType"] != FILE_MIME_TYPES["gfldr"] )
+            else:
+                items.append(item)
+        downloader = ParallelDownloader(lambda: build_thread_service(self.creds), p_workers, self.lgr, self.lev)
+        paths = downloader.download_items(items, p_dest)
+        return [[path] for path in paths]
+
+    def export(self, p_targets:list, p_format:str, p_dest:str):
+        """EXPORT Google Sheets, Docs, etc from my Google drive to a local folder, reusing the cached export of an unchanged file.
+        :param p_targets: names in FILE_IDS OR ids of the Google files to export
+        :param p_format:  key of EXPORT_FORMATS, OR empty for the default format of each type of file
+        :param p_dest:    path to the local folder to write the files to
+        """
+        if not self.service:
+            self.lgr.warning(NO_SESSION_MSG)
+            return [NO_SESSION_MSG]
+        cache = ExportCache(EXPORT_CACHE_PATH)
+        paths = []
+        for target in p_targets:
+            fid = FILE_IDS[target] if target in FILE_IDS.keys() else target
+            # the metadata check is ALL it costs to export an unchanged file again
+            item = SCHEDULER.execute( self.service.get(fileId = fid, fields = EXPORT_FIELDS) )
+            paths.append([export_file(self.service, item, p_format, p_dest, cache, self.lgr, self.lev)])
+        return paths
+
     def get_file_metadata(self, p_filename:str, p_file_id:str):
         """
         :param p_filename: name of the Drive file to get info from
@@ -245,7 +409,7 @@ class MhsDriveAccess:
         if not self.service:
             self.lgr.warning(NO_SESSION_MSG)
             return [NO_SESSION_MSG]
-        file_metadata = self.service.get(fileId = p_file_id).execute()
+        file_metadata = SCHEDULER.execute( self.service.get(fileId = p_file_id) )
         self.lgr.log(self.lev, f"file '{p_filename}' metadata:\n{file_metadata}")
         return [file_metadata]
 
@@ -258,31 +422,26 @@ class MhsDriveAccess:
             self.lgr.warning(NO_SESSION_MSG)
             return [NO_SESSION_MSG]
         mime = FILE_MIME_TYPES[p_ftype] if self.mime else ""
-        fdate = "" if self.mime else DEFAULT_DATE
-        limit = p_numitems if self.mime else MAX_NUM_ITEMS
-        items = self.find_items(p_mimetype = mime, p_date = fdate, p_limit = limit)
-        if not items:
-            self.lgr.warning("No files found?!")
-            return ["No files found?!"]
-        self.lgr.log(self.lev, f"{len(items)} files retrieved. \n\t\t\t\tName \t\t  <type> \t(Id) \t\t\t\t   [parent id]")
+        extension = "" if self.mime else p_ftype
+        # all the items are of the queried mimeType, otherwise check up to MAX_NUM_ITEMS candidates for the filename extension
+        items = self.select_items(mime, p_page_size = p_numitems) if self.mime \
+                else islice(self.select_items(p_extension = extension), MAX_NUM_ITEMS)
+        item_log = ItemLog(self.lgr, self.lev, self.summary)
+        item_log.header("Files retrieved: \n\t\t\t\tName \t\t  <type> \t(Id) \t\t\t\t   [parent id]")
         found_items = []
         for item in items:
-            if self.mime:
-                # all the files are of the queried mimeType
+            # find the file type by using the filename extension
+            if self.mime or get_filetype(item['name'])[1:] == p_ftype:
                 found_items.append(item)
                 # items 'shared with me' are in my Drive but without a parent
-                self.lgr.log(self.lev, f"{item['name']} <{item['mimeType']}> ({item['id']}) "
-                                f"{item['parents'] if 'parents' in item.keys() else '[*** NONE ***]'}")
-            else:
-                fname = f"{item['name']}"
-                # find the file type by using the filename extension
-                ftype = get_filetype(fname)[1:]
-                if ftype == p_ftype:
-                    found_items.append(item)
-                    self.lgr.log(self.lev, f"{item['name']} <{item['mimeType']}> ({item['id']}) "
-                                    f"{item['parents'] if 'parents' in item.keys() else '[*** NONE ***]'}")
-            if len(found_items) >= p_numitems:
-                break
+                item_log.item("%s <%s> (%s) %s", item['name'], item['mimeType'], item['id'], item.get('parents', NO_PARENT),
+                              p_kind = item['mimeType'])
+                if len(found_items) >= p_numitems:
+                    break
+        item_log.summary("files retrieved")
+        if not found_items:
+            self.lgr.warning("No files found?!")
+            return ["No files found?!"]
         self.lgr.log(self.lev, f">> {len(found_items)} '{p_ftype}' files found.\n")
         return found_items
 
@@ -313,6 +472,10 @@ def prepare_args():
                            help = "Get the metadata for a Google Drive file")
     mex_group.add_argument('-s', '--send', metavar = "PATHNAME",
                            help = "path to a local file|folder to SEND to Google drive")
+    mex_group.add_argument('-x', f"--{DOWNLOAD_LABEL}", nargs = '+', metavar = "TARGET",
+                           help = "names, paths OR ids of the Google drive files|folders to DOWNLOAD")
+    mex_group.add_argument('-e', f"--{EXPORT_LABEL}", nargs = '+', metavar = "TARGET",
+                           help = "names OR ids of the Google Sheets, Docs, etc to EXPORT")
     # optional arguments
     common_group = arg_parser.add_argument_group("Common options")
     common_group.add_argument('-j', '--jsonsave', action="store_true", default=False,
@@ -320,12 +483,39 @@ def prepare_args():
     common_group.add_argument("-l", "--log_location", metavar = "PATHNAME", default = DEFAULT_LOG_FOLDER,
                               help = f"path to a local folder where logs will be saved; DEFAULT = '{DEFAULT_LOG_FOLDER}'")
     common_group.add_argument('-p', '--parent', type = str, default = f"{ROOT_LABEL}",
-                              help = f"name of the Drive parent folder to use; DEFAULT = '{ROOT_LABEL}'")
+                              help = f"name OR path, e.g. 'Finance/2025/Q3', of the Drive parent folder to use; DEFAULT = '{ROOT_LABEL}'")
     common_group.add_argument('-t', '--type', type=str, default=f"{DEFAULT_FILETYPE}",
                               help = f"type of file to gather info on; DEFAULT = '{DEFAULT_FILETYPE}'")
     common_group.add_argument('-y', '--mimetype', action="store_true", default=False,
                               help="search for files using mimeType instead of filename extension; DEFAULT = False")
+    common_group.add_argument('--fresh', action="store_true", default=False,
+                              help="query my Google drive directly instead of the local index; DEFAULT = False")
+    common_group.add_argument('--shards', type = int, default = 1, metavar = "NUM",
+                              help = f"with --fresh, list in this many concurrent modifiedTime windows (MAX = {MAX_SHARDS}); DEFAULT = 1")
+    common_group.add_argument('--summary', action="store_true", default=False,
+                              help = "log ONLY the counts instead of a line for each item, e.g. to list OR delete thousands of items")
+    common_group.add_argument('--profile', action="store_true", default=False,
+                              help = "profile the function with cProfile and tracemalloc, and write the reports to the log folder")
+    common_group.add_argument('--trace', action="store_true", default=False,
+                              help = "save a timeline of every Drive request and local stage to a Chrome trace-event JSON file")
+    add_rate_args(common_group)
+    # send options
+    send_group = arg_parser.add_argument_group("Send options")
+    send_group.add_argument('-w', '--workers', type = int, default = DEFAULT_WORKERS, metavar = "NUM",
+                            help = f"number of files to send OR download concurrently (DEFAULT = {DEFAULT_WORKERS}, MAX = {MAX_WORKERS})")
+    send_group.add_argument('-R', '--recursive', action="store_true", default=False,
+                            help="ALSO send ALL the subfolders of a folder, creating the same folder tree on my Google drive")
+    send_group.add_argument('--resume', action="store_true", default=False,
+                            help="continue an interrupted upload of the same folder from the upload journal; DEFAULT = False")
+    send_group.add_argument('--sync', action="store_true", default=False,
+                            help="ONLY send the files in a folder that are new or changed on my Google drive; DEFAULT = False")
     # metadata options
+    download_group = arg_parser.add_argument_group("Download and export options")
+    download_group.add_argument('-o', '--output', metavar = "PATHNAME", default = os.getcwd(),
+                                help = "path to the local folder to download|export files to; DEFAULT = current folder")
+    download_group.add_argument('--format', type = str, default = "", choices = list(EXPORT_FORMATS.keys()),
+                                help = "format to export to; DEFAULT = xlsx for Sheets, docx for Docs, pdf for others")
+
     meta_group = arg_parser.add_argument_group("Metadata options")
     meta_group.add_argument('-i', '--name_of_file', type = str, default = DEFAULT_METADATA_FILE ,
                             metavar = "NAME", help = f"Name of the Drive file to query; DEFAULT = '{DEFAULT_METADATA_FILE}'")
@@ -336,7 +526,7 @@ def prepare_args():
     delete_group.add_argument('-z', '--delete_date', type=str, metavar = "DATE", default=DEFAULT_DATE,
                               help = f"delete ALL files BEFORE this date [YYYY-MM-DD]; DEFAULT = '{DEFAULT_DATE}'")
     delete_group.add_argument('-r', '--contain_folder', type=str, metavar = "FOLDER-NAME", default=f"{TEST_FOLDER}",
-                              help = f"Name of the Drive folder containing the files to delete; DEFAULT = '{TEST_FOLDER}'")
+                              help = f"Name OR path of the Drive folder containing the files to delete; DEFAULT = '{TEST_FOLDER}'")
     # get files options
     gather_group = arg_parser.add_argument_group("Get files options")
     gather_group.add_argument('-n', '--numfiles', type = int, default = DEFAULT_NUM_FILES, metavar = "NUM",
@@ -345,64 +535,89 @@ def prepare_args():
 
 def process_args(argx:list):
     args = prepare_args().parse_args(argx)
-    parent_id = FOLDER_IDS["Test"]
+    SCHEDULER.configure(args.rate, args.burst)
     if args.send:
         if not osp.isdir(args.send) and not osp.isfile(args.send):
             raise Exception(f"File path '{args.send}' NOT valid! Exiting...")
-        if args.parent not in FOLDER_IDS.keys():
-            raise Exception(f"Parent folder '{args.parent}' NOT recognized! Exiting...")
-        parent_id = FOLDER_IDS[args.parent]
+    # the shards list directly from the drive, NOT from the local index
+    if args.shards > 1 and not args.fresh:
+        raise Exception("--shards can ONLY be used with --fresh! Exiting...")
+    # the upload journal ONLY records the files of ONE folder
+    if args.resume and args.recursive:
+        raise Exception("--resume can NOT be used with -R/--recursive! Exiting...")
+    # the folder id is found once the Drive session has started, as it may be a path, e.g. 'Finance/2025/Q3'
+    folder = args.contain_folder if args.deletefiles else args.parent
 
     num_files = 0
     if args.getfiles:
         num_files = DEFAULT_NUM_FILES if args.numfiles <= 0 or args.numfiles > MAX_NUM_ITEMS else args.numfiles
 
-    choic = FOLDERS_LABEL if args.folders else GET_FILES_LABEL if args.getfiles else METADATA_LABEL if args.metadata else args.send
+    choic = FOLDERS_LABEL if args.folders else GET_FILES_LABEL if args.getfiles else DELETE_FILES_LABEL if args.deletefiles \
+            else METADATA_LABEL if args.metadata else DOWNLOAD_LABEL if args.download \
+            else EXPORT_LABEL if args.export else args.send
     logloc = args.log_location if osp.isdir(args.log_location) else DEFAULT_LOG_FOLDER
     meta_id = FILE_IDS[DEFAULT_METADATA_FILE] if args.name_of_file not in FILE_IDS.keys() else FILE_IDS[args.name_of_file]
 
-    return ( args.jsonsave, choic, args.parent, parent_id, args.type, args.mimetype, num_files,
-             meta_id, logloc, args.delete_date, args.testing )
+    return ( args.jsonsave, choic, folder, args.type, args.mimetype, num_files,
+             meta_id, logloc, args.delete_date, args.testing, args.workers, args.fresh, args.sync, args.recursive, args.resume,
+             args.download or args.export, args.output, args.format, args.shards, args.trace,
+             args.profile, args.summary )
 
 def main_drive_functions(args:list):
     """ENTRY POINT to utilize the drive access functions."""
     start_time = dt.now()
-    save_option, choice, parent, pid, filetype, mime_option, numfiles, meta_id, logloc, fdate, test_option = process_args(args)
+    save_option, choice, parent, filetype, mime_option, numfiles, meta_id, logloc, fdate, test_option, workers, fresh, sync, recursive, resume, \
+        targets, output, export_fmt, shards, trace, profile, summary = process_args(args)
     log_control = MhsLogger( get_base_filename(__file__), folder = logloc, con_level = DEFAULT_LOG_LEVEL )
+    # the console and log file are written by a background thread
+    start_queue_logging( log_control.get_logger() )
     log_control.info(f"save option = {save_option}; choice = '{choice}'; log location = {logloc}; mime option = {mime_option}; "
-                     f"test option = {test_option}\n\t\tStart time = {start_time.strftime(RUN_DATETIME_FORMAT)}")
+                     f"test option = {test_option}; fresh = {fresh}; sync = {sync}; recursive = {recursive}; resume = {resume}\n\t\tStart time = {start_time.strftime(RUN_DATETIME_FORMAT)}")
     mhsda = None
     result = []
     code = 0
+    if trace:
+        TRACER.start()
     try:
-        mhsda = MhsDriveAccess(save_option, mime_option, test_option, log_control)
-        # list all folders
-        if choice == FOLDERS_LABEL:
-            log_control.info(f"find all my {FOLDERS_LABEL}:")
-            result = mhsda.find_all_folders()
-        # get files
-        elif choice == GET_FILES_LABEL:
-            if mime_option:
-                log_control.info(f"retrieve info from up to {numfiles} 'mimeType = {FILE_MIME_TYPES[filetype]}' files.")
+        mhsda = MhsDriveAccess(save_option, mime_option, test_option, log_control, p_fresh = fresh, p_shards = shards, p_summary = summary)
+        profiler = RunProfiler(logloc, get_base_filename(__file__), log_control.get_logger()) if profile else nullcontext()
+        with TRACER.span("run", choice = str(choice)), profiler:
+            mhsda.begin_session()
+            # list all folders
+            if choice == FOLDERS_LABEL:
+                log_control.info(f"find all my {FOLDERS_LABEL}:")
+                result = mhsda.find_all_folders()
+            # get files
+            elif choice == GET_FILES_LABEL:
+                if mime_option:
+                    log_control.info(f"retrieve info from up to {numfiles} 'mimeType = {FILE_MIME_TYPES[filetype]}' files.")
+                else:
+                    log_control.info(f"retrieve info from {numfiles} files and search for filename extension '{filetype}'.")
+                result = mhsda.read_file_info(filetype, numfiles)
+            # delete files
+            elif choice == DELETE_FILES_LABEL:
+                log_control.info(f"Delete files in Drive folder: {parent}")
+                result = mhsda.delete_files(mhsda.folder_id(parent), filetype, fdate)
+            # get file metadata
+            elif choice == METADATA_LABEL:
+                log_control.info("get metadata for a file.")
+                result = mhsda.get_file_metadata("Budget-qtrly.gsht", meta_id)
+            # download files
+            elif choice == DOWNLOAD_LABEL:
+                log_control.info(f"download {targets} to local folder: {output}")
+                result = mhsda.download(targets, output, workers)
+            # export Google files
+            elif choice == EXPORT_LABEL:
+                log_control.info(f"export {targets} to local folder: {output}")
+                result = mhsda.export(targets, export_fmt, output)
+            # send all files in a folder
+            elif osp.isdir(choice):
+                log_control.info(f"upload all files in folder '{choice}' to Drive folder: {parent}")
+                result = mhsda.send_folder(choice, mhsda.folder_id(parent), parent, workers, sync, recursive, resume)
+            # send a file
             else:
-                log_control.info(f"retrieve info from {numfiles} files and search for filename extension '{filetype}'.")
-            result = mhsda.read_file_info(filetype, numfiles)
-        # delete files
-        elif choice == DELETE_FILES_LABEL:
-            log_control.info("Delete files.")
-            result = mhsda.delete_files(pid, filetype, fdate)
-        # get file metadata
-        elif choice == METADATA_LABEL:
-            log_control.info("get metadata for a file.")
-            result = mhsda.get_file_metadata("Budget-qtrly.gsht", meta_id)
-        # send all files in a folder
-        elif osp.isdir(choice):
-            log_control.info(f"upload all files in folder '{choice}' to Drive folder: {parent}")
-            result = mhsda.send_folder(choice, pid, parent)
-        # send a file
-        else:
-            log_control.info(f"upload file '{choice}' to Drive folder: {parent}")
-            result = mhsda.send_file(choice, pid, parent)
+                log_control.info(f"upload file '{choice}' to Drive folder: {parent}")
+                result = mhsda.send_file(choice, mhsda.folder_id(parent), parent)
     except KeyboardInterrupt as mki:
         log_control.exception(mki)
         code = 13
@@ -419,10 +634,19 @@ def main_drive_functions(args:list):
         if mhsda:
             mhsda.end_session()
 
-    if mhsda.save and result:
+    if mhsda and mhsda.save and result:
         jfile = save_to_json(get_base_filename(argv[0]), result)
         log_control.info(f"Saved results to '{jfile}'.")
 
+    log_control.info(METRICS.summary())
+    if save_option:
+        jfile = save_to_json(get_base_filename(argv[0]) + "_metrics", METRICS.as_dict())
+        log_control.info(f"Saved API metrics to '{jfile}'.")
+    if trace:
+        TRACER.stop()
+        jfile = save_to_json(get_base_filename(argv[0]) + "_trace", TRACER.as_dict())
+        log_control.info(f"Saved a trace of {len(TRACER)} spans to '{jfile}': open it in chrome://tracing OR ui.perfetto.dev")
+
     run_time = (dt.now() - start_time).total_seconds()
     log_control.info(f"\nRunning time = {(run_time // 60)} minutes, {(run_time % 60):2.4} seconds\n")
 
@@ -0,0 +1,190 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveIndex.py
+#   -- local SQLite index of the metadata of my Google Drive items, kept current with the Drive changes feed
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Iterator
+from drivePaging import MAX_PAGE_SIZE, iter_page_items
+from driveScheduler import SCHEDULER
+
+INDEX_FILENAME = "drive_index.sqlite"
+INDEX_FIELDS   = "id, name, mimeType, parents, size, modifiedTime, md5Checksum"
+CHANGE_FIELDS  = f"nextPageToken, newStartPageToken, changes(fileId, removed, file({INDEX_FIELDS}, trashed))"
+TOKEN_KEY   = "start_page_token"
+ROOT_KEY    = "root_id"
+ROOT_LABEL  = "root"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id           TEXT PRIMARY KEY,
+    name         TEXT NOT NULL,
+    mimeType     TEXT,
+    size         INTEGER,
+    modifiedTime TEXT,
+    md5Checksum  TEXT
+);
+CREATE TABLE IF NOT EXISTS parents (
+    item_id   TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    PRIMARY KEY (item_id, parent_id)
+);
+CREATE INDEX IF NOT EXISTS parents_by_parent ON parents (parent_id);
+CREATE INDEX IF NOT EXISTS items_by_mimetype ON items (mimeType, modifiedTime);
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class DriveIndex:
+    """Local copy of the metadata of my Drive items: one full crawl, then incremental updates from 'changes.list'."""
+    def __init__(self, p_dbpath:str, p_lgr:logging.Logger):
+        self.dbpath = p_dbpath
+        self.lgr = p_lgr
+        # the index may be used from a worker thread, but only one thread at a time
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(p_dbpath, check_same_thread = False)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _get_state(self, p_key:str) -> str:
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (p_key,)).fetchone()
+        return row[0] if row else ""
+
+    def _set_state(self, p_key:str, p_value:str):
+        self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (p_key, p_value))
+
+    def is_built(self) -> bool:
+        """Has the full crawl been done?"""
+        with self._lock:
+            return bool( self._get_state(TOKEN_KEY) )
+
+    def _store(self, p_item:dict):
+        self._conn.execute( "INSERT OR REPLACE INTO items (id, name, mimeType, size, modifiedTime, md5Checksum) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (p_item["id"], p_item.get("name", ""), p_item.get("mimeType"),
+                             int(p_item["size"]) if "size" in p_item else None,
+                             p_item.get("modifiedTime"), p_item.get("md5Checksum")) )
+        self._conn.execute("DELETE FROM parents WHERE item_id = ?", (p_item["id"],))
+        self._conn.executemany( "INSERT INTO parents (item_id, parent_id) VALUES (?, ?)",
+                                [(p_item["id"], pid) for pid in p_item.get("parents", [])] )
+
+    def _remove(self, p_item_id:str):
+        self._conn.execute("DELETE FROM items WHERE id = ?", (p_item_id,))
+        self._conn.execute("DELETE FROM parents WHERE item_id = ?", (p_item_id,))
+
+    def full_crawl(self, p_drive) -> int:
+        """Replace the index with the metadata of EVERY item on my Drive.
+        :param p_drive: the Drive service, i.e. NOT the 'files' resource
+        :return number of items indexed
+        """
+        start = time.perf_counter()
+        # get the token BEFORE crawling so that any changes made during the crawl are picked up by the next sync
+        token = SCHEDULER.execute( p_drive.changes().getStartPageToken() )["startPageToken"]
+        root_id = SCHEDULER.execute( p_drive.files().get(fileId = ROOT_LABEL, fields = "id") )["id"]
+        count = 0
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items")
+            self._conn.execute("DELETE FROM parents")
+            for item in iter_page_items(p_drive.files(), "trashed = false", INDEX_FIELDS):
+                self._store(item)
+                count += 1
+            self._set_state(ROOT_KEY, root_id)
+            self._set_state(TOKEN_KEY, token)
+        self.lgr.info(f"Indexed {count} Drive items in {time.perf_counter() - start:.2f} seconds.")
+        return count
+
+    def sync(self, p_drive) -> int:
+        """Apply all the changes made on my Drive since the last crawl or sync.
+        :param p_drive: the Drive service, i.e. NOT the 'files' resource
+        :return number of changes applied
+        """
+        count = 0
+        with self._lock, self._conn:
+            page_token = self._get_state(TOKEN_KEY)
+            while page_token:
+                results = SCHEDULER.execute( p_drive.changes().list(pageToken = page_token, spaces = "drive", pageSize = MAX_PAGE_SIZE,
+                                                                    includeRemoved = True, fields = CHANGE_FIELDS) )
+                for change in results.get("changes", []):
+                    item = change.get("file")
+                    if change.get("removed") or not item or item.get("trashed"):
+                        self._remove(change["fileId"])
+                    else:
+                        self._store(item)
+                    count += 1
+                if "newStartPageToken" in results:
+                    self._set_state(TOKEN_KEY, results["newStartPageToken"])
+                page_token = results.get("nextPageToken")
+        self.lgr.debug(f"Applied {count} Drive changes to the index.")
+        return count
+
+    def refresh(self, p_drive) -> int:
+        """Bring the index up to date: a full crawl the first time, otherwise just the latest changes."""
+        if self.is_built():
+            return self.sync(p_drive)
+        # the index is used by default, so a run that just asked for a listing may be held up by the crawl
+        self.lgr.warning(f"Building the local index '{self.dbpath}' with a crawl of ALL the items on my Drive: this may take "
+                         "several minutes, ONLY the first time. Use a fresh listing to query the drive directly instead.")
+        return self.full_crawl(p_drive)
+
+    def find(self, p_mimetype:str = "", p_date:str = "", p_pid:str = "", p_name_contains:str = "",
+             p_extension:str = "") -> Iterator[dict]:
+        """Find items in the index, in the same form as returned by Drive 'files.list'.
+        :param p_mimetype:      mimeType of items to find
+        :param p_date:          find items OLDER than this date
+        :param p_pid:           id of the parent Drive folder to search in
+        :param p_name_contains: string that must be in the item name (case-sensitive)
+        :param p_extension:     filename extension of items to find, without the '.'
+        """
+        terms = []
+        params = []
+        if p_mimetype:
+            terms.append("mimeType = ?")
+            params.append(p_mimetype)
+        if p_date:
+            terms.append("modifiedTime < ?")
+            params.append(p_date)
+        if p_pid:
+            terms.append("id IN (SELECT item_id FROM parents WHERE parent_id = ?)")
+            params.append(self._get_state(ROOT_KEY) if p_pid == ROOT_LABEL else p_pid)
+        if p_name_contains:
+            terms.append("instr(name, ?) > 0")
+            params.append(p_name_contains)
+        if p_extension:
+            suffix = f".{p_extension.lstrip('.')}"
+            terms.append("substr(name, -length(?)) = ?")
+            params.extend([suffix, suffix])
+        where = f" WHERE {' AND '.join(terms)}" if terms else ""
+        with self._lock:
+            rows = self._conn.execute( "SELECT id, name, mimeType, size, modifiedTime, md5Checksum, "
+                                       "(SELECT json_group_array(parent_id) FROM parents WHERE item_id = items.id) "
+                                       f"FROM items{where}", params ).fetchall()
+        for fid, name, mtype, size, modtime, md5, parents in rows:
+            item = {"id":fid, "name":name, "mimeType":mtype, "modifiedTime":modtime}
+            if size is not None:
+                item["size"] = str(size)
+            if md5:
+                item["md5Checksum"] = md5
+            plist = json.loads(parents)
+            # items 'shared with me' are in my Drive but WITHOUT a parent
+            if plist:
+                item["parents"] = plist
+            yield item
@@ -0,0 +1,144 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveJournal.py
+#   -- crash-safe record of the state of each file in a folder upload, so an interrupted upload can be resumed
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import os.path as osp
+import sqlite3
+import threading
+import time
+from typing import Iterable
+from driveSync import file_md5
+
+JOURNAL_FILENAME = "upload_journal.sqlite"
+PENDING     = "pending"
+IN_PROGRESS = "in-progress"
+DONE        = "done"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    job         TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    mimeType    TEXT,
+    update_id   TEXT,
+    state       TEXT NOT NULL,
+    session_uri TEXT,
+    offset      INTEGER DEFAULT 0,
+    drive_id    TEXT,
+    updated     REAL,
+    PRIMARY KEY (job, path)
+);
+"""
+
+def job_key(p_path:str, p_pid:str) -> str:
+    """The same local folder sent to the same Drive folder is the same job."""
+    return f"{osp.abspath(p_path)} >> {p_pid}"
+
+
+class UploadJournal:
+    """The state of each file of ONE upload job: pending, in progress (with the resumable session and offset) or done.
+       Every change is committed at once, so the journal is up to date whenever the upload is interrupted."""
+    def __init__(self, p_dbpath:str, p_job:str, p_lgr:logging.Logger):
+        self.job = p_job
+        self.lgr = p_lgr
+        # the journal is written by ALL the upload worker threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(p_dbpath, check_same_thread = False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, p_sql:str, p_params:tuple):
+        with self._lock, self._conn:
+            self._conn.execute(p_sql, p_params)
+
+    def counts(self) -> dict:
+        """Number of files in each state."""
+        with self._lock:
+            return dict( self._conn.execute("SELECT state, COUNT(*) FROM uploads WHERE job = ? GROUP BY state", (self.job,)) )
+
+    def start(self, p_files:Iterable):
+        """Begin a NEW run of the job, with ALL the files pending.
+        :param p_files: (local path, mimeType) OR (local path, mimeType, Drive id to update) for each file
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM uploads WHERE job = ?", (self.job,))
+            self._conn.executemany( "INSERT INTO uploads (job, path, mimeType, update_id, state, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                                    [(self.job, pf[0], pf[1], pf[2] if len(pf) > 2 else "", PENDING, now) for pf in p_files] )
+
+    def remaining(self) -> list:
+        """The files that are NOT done, in the same form as given to start()."""
+        with self._lock:
+            rows = self._conn.execute( "SELECT path, mimeType, update_id FROM uploads WHERE job = ? AND state != ? ORDER BY path",
+                                       (self.job, DONE) ).fetchall()
+        return [(path, mime, update_id) if update_id else (path, mime) for path, mime, update_id in rows]
+
+    def interrupted(self) -> list:
+        """The paths of the NEW files that were in progress WITHOUT a resumable session, i.e. may or may NOT have been created.
+           n.b. an update of an existing Drive file is NOT included: it is simply sent again."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute( "SELECT path FROM uploads WHERE job = ? AND state = ? AND "
+                                                          "(session_uri IS NULL OR session_uri = '') AND "
+                                                          "(update_id IS NULL OR update_id = '')", (self.job, IN_PROGRESS) )]
+
+    def started(self, p_path:str) -> tuple:
+        """Mark a file as in progress.
+        :return the resumable session URI and offset from an earlier run, OR an empty URI
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT session_uri, offset FROM uploads WHERE job = ? AND path = ?", (self.job, p_path)).fetchone()
+            self._conn.execute("UPDATE uploads SET state = ?, updated = ? WHERE job = ? AND path = ?",
+                               (IN_PROGRESS, time.time(), self.job, p_path))
+        return (row[0] or "", row[1] or 0) if row else ("", 0)
+
+    def progress(self, p_path:str, p_session_uri:str, p_offset:int):
+        """Record the session of a resumable upload and the number of bytes Drive has received."""
+        self._update("UPDATE uploads SET session_uri = ?, offset = ?, updated = ? WHERE job = ? AND path = ?",
+                     (p_session_uri, p_offset, time.time(), self.job, p_path))
+
+    def done(self, p_path:str, p_drive_id:str):
+        self._update("UPDATE uploads SET state = ?, drive_id = ?, session_uri = NULL, updated = ? WHERE job = ? AND path = ?",
+                     (DONE, p_drive_id, time.time(), self.job, p_path))
+
+    def clear(self):
+        """Forget the job, once ALL the files are done."""
+        self._update("DELETE FROM uploads WHERE job = ?", (self.job,))
+
+def settle_interrupted(p_journal:UploadJournal, p_remote:Iterable[dict]):
+    """Mark as done the interrupted files that Drive DID create, so resuming does NOT create duplicates:
+       ONLY a Drive file with the same name AND the same content, by md5, as the local file.
+    :param p_journal: journal of the job to resume
+    :param p_remote:  the items in the Drive folder, with at least the 'id', 'name' and 'md5Checksum', e.g. the SYNC_FIELDS
+    """
+    interrupted = p_journal.interrupted()
+    if not interrupted:
+        return
+    remote = {}
+    for item in p_remote:
+        if "md5Checksum" in item:
+            remote.setdefault(item["name"], []).append(item)
+    for path in interrupted:
+        candidates = remote.get(osp.basename(path))
+        if not candidates or not osp.isfile(path):
+            continue
+        md5 = file_md5(path)
+        for item in candidates:
+            if item["md5Checksum"] == md5:
+                p_journal.done(path, item["id"])
+                break
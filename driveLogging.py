@@ -0,0 +1,116 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveLogging.py
+#   -- keep per-item logging out of the hot loops: lazy formatting, a background log writer and a summary-only mode
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import atexit
+import logging
+import queue
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+NO_PARENT = "[*** NONE ***]"
+
+def handler_logger(p_lgr:logging.Logger) -> logging.Logger:
+    """The logger whose handlers write the records of p_lgr, i.e. p_lgr OR the first ancestor with handlers."""
+    lgr = p_lgr
+    while lgr and not lgr.handlers and lgr.propagate and lgr.parent:
+        lgr = lgr.parent
+    return lgr
+
+def will_log(p_lgr:logging.Logger, p_level:int) -> bool:
+    """Will ANY handler write a record at this level?
+       The loggers from MhsLogger pass every level and leave the filtering to their console and file handlers,
+       so isEnabledFor() alone does NOT tell whether formatting a message is wasted."""
+    if not p_lgr.isEnabledFor(p_level):
+        return False
+    handlers = handler_logger(p_lgr).handlers
+    return not handlers or any(p_level >= hdlr.level for hdlr in handlers)
+
+
+class LazyQueueHandler(QueueHandler):
+    """Put the records on the queue WITHOUT formatting them, so the %-style message is built in the listener thread.
+       n.b. the arguments of a message must NOT be changed after it is logged."""
+    def prepare(self, p_record:logging.LogRecord) -> logging.LogRecord:
+        return p_record
+
+def start_queue_logging(p_lgr:logging.Logger):
+    """Move the handlers of a logger to a background thread: each record is queued by the caller, and formatted and written
+       to the console and the log file by a QueueListener. The listener is stopped, writing ALL the queued records, at exit.
+    :return the QueueListener, OR None if the handlers are already queued OR there are none
+    """
+    lgr = handler_logger(p_lgr)
+    handlers = list(lgr.handlers)
+    if not handlers or any(isinstance(hdlr, QueueHandler) for hdlr in handlers):
+        return None
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level = True)
+    queue_handler = LazyQueueHandler(log_queue)
+    # do NOT queue records that NONE of the handlers would write
+    queue_handler.setLevel( min(hdlr.level for hdlr in handlers) )
+    for hdlr in handlers:
+        lgr.removeHandler(hdlr)
+    lgr.addHandler(queue_handler)
+    listener.start()
+    atexit.register(stop_queue_logging, lgr, listener)
+    return listener
+
+def stop_queue_logging(p_lgr:logging.Logger, p_listener:QueueListener):
+    """Write ALL the queued records and give the handlers back to the logger."""
+    queued = [hdlr for hdlr in p_lgr.handlers if isinstance(hdlr, LazyQueueHandler)]
+    # already stopped
+    if p_listener is None or not queued:
+        return
+    p_listener.stop()
+    for hdlr in queued:
+        p_lgr.removeHandler(hdlr)
+    for hdlr in p_listener.handlers:
+        p_lgr.addHandler(hdlr)
+
+
+class ItemLog:
+    """Log ONE line per item of a hot loop with a %-style message that is ONLY formatted if a handler will write it,
+       OR in summary-only mode, count the items by kind and log the counts at the end instead of a line per item."""
+    def __init__(self, p_lgr:logging.Logger, p_level:int, p_summary:bool = False):
+        """
+        :param p_lgr:     logger
+        :param p_level:   level to log the item lines at
+        :param p_summary: True to log ONLY the counts
+        """
+        self.lgr = p_lgr
+        self.level = p_level
+        self.summary_only = p_summary
+        # decided ONCE per loop instead of for each item
+        self.enabled = not p_summary and will_log(p_lgr, p_level)
+        self.count = 0
+        self.kinds = Counter()
+
+    def header(self, p_msg:str, *p_args):
+        if self.enabled:
+            self.lgr.log(self.level, p_msg, *p_args)
+
+    def item(self, p_msg:str, *p_args, p_kind:str = ""):
+        """Log an item line, e.g. item("%s <%s> (%s)", name, mimetype, fid, p_kind = mimetype).
+        :param p_kind: what to count the item as in the summary
+        """
+        self.count += 1
+        if p_kind:
+            self.kinds[p_kind] += 1
+        if self.enabled:
+            self.lgr.log(self.level, p_msg, *p_args)
+
+    def summary(self, p_label:str = "items"):
+        """In summary-only mode, log the counts in place of the item lines, at INFO at least so they are seen."""
+        if self.summary_only:
+            kinds = ", ".join(f"{kind} = {num}" for kind, num in self.kinds.most_common())
+            self.lgr.log(max(self.level, logging.INFO), "%d %s%s", self.count, p_label, f": {kinds}" if kinds else "")
@@ -0,0 +1,167 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveMetrics.py
+#   -- per-run instrumentation of the Drive API calls: counts, latency histograms, status, retries, bytes, items, quota units
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import json
+import threading
+import time
+from collections import defaultdict
+
+# upper bounds, in ms, of the latency histogram buckets; the last bucket has NO upper bound
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+AUTH_OP = "auth"
+BATCH_LABEL = "batch"
+
+def request_label(p_fxn) -> str:
+    """The operation of a Drive request from the callable that sends it, e.g. 'files.list', 'files.create.chunk' OR 'batch'."""
+    owner = getattr(p_fxn, "__self__", None)
+    name = getattr(p_fxn, "__name__", "call")
+    method_id = getattr(owner, "methodId", None)
+    if method_id:
+        # e.g. 'drive.files.list'
+        label = method_id.split('.', 1)[-1]
+    elif hasattr(owner, "op"):
+        # a fake Drive request
+        label = f"files.{owner.op}" if owner.op != BATCH_LABEL else BATCH_LABEL
+    elif type(owner).__name__ in ("BatchHttpRequest", "FakeBatch"):
+        label = BATCH_LABEL
+    else:
+        label = name
+    return f"{label}.chunk" if name == "next_chunk" else label
+
+def request_size(p_fxn) -> int:
+    """Bytes in the body of a request, NOT counting the chunks of a resumable upload."""
+    body = getattr(getattr(p_fxn, "__self__", None), "body", None)
+    return len(body) if isinstance(body, (bytes, str)) else 0
+
+def upload_progress(p_fxn) -> int:
+    """Bytes of a resumable upload that Drive has received so far."""
+    return getattr(getattr(p_fxn, "__self__", None), "resumable_progress", 0) or 0
+
+def response_size(p_response) -> int:
+    """Bytes in a response: exact for media, and the size of the JSON for a parsed response."""
+    if isinstance(p_response, (bytes, str)):
+        return len(p_response)
+    if isinstance(p_response, (dict, list)):
+        return len(json.dumps(p_response))
+    return 0
+
+def response_items(p_response) -> int:
+    """Number of items in a list OR changes response."""
+    if isinstance(p_response, dict):
+        for key in ("files", "changes"):
+            if key in p_response:
+                return len(p_response[key])
+    return 0
+
+
+class OpMetrics:
+    """The totals for ONE type of operation."""
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.items = 0
+        self.quota_units = 0
+        self.statuses = defaultdict(int)
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def percentile(self, p_pct:float) -> float:
+        """Upper bound in ms of the histogram bucket holding the p_pct percentile, OR inf for the last bucket."""
+        rank = p_pct / 100.0 * self.calls
+        count = 0
+        for num, bucket in enumerate(self.histogram):
+            count += bucket
+            if count >= rank and count:
+                return LATENCY_BUCKETS_MS[num] if num < len(LATENCY_BUCKETS_MS) else float("inf")
+        return 0.0
+
+    def as_dict(self) -> dict:
+        return {"calls":self.calls, "retries":self.retries, "seconds":round(self.seconds, 4), "wait_seconds":round(self.wait_seconds, 4),
+                "mean_ms":round(self.seconds * 1000 / self.calls, 2) if self.calls else 0.0, "max_ms":round(self.max_seconds * 1000, 2),
+                "bytes_sent":self.bytes_sent, "bytes_received":self.bytes_received, "items":self.items,
+                "quota_units":self.quota_units, "statuses":{str(code):num for code, num in sorted(self.statuses.items())},
+                "histogram_ms":{f"<={bound}" if num < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}":count
+                                for num, (bound, count) in enumerate(zip(LATENCY_BUCKETS_MS + (None,), self.histogram))}}
+
+
+class ApiMetrics:
+    """Every Drive request of the run, by operation; shared by ALL threads."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ops = defaultdict(OpMetrics)
+        self.started = time.time()
+
+    def reset(self):
+        with self._lock:
+            self.ops.clear()
+            self.started = time.time()
+
+    def record(self, p_op:str, p_seconds:float, p_status:int, p_retry:bool = False, p_wait:float = 0.0, p_sent:int = 0,
+               p_received:int = 0, p_items:int = 0, p_units:int = 1):
+        """Record ONE attempt of a request.
+        :param p_op:       operation, e.g. 'files.list'
+        :param p_seconds:  time the request took
+        :param p_status:   HTTP status of the response
+        :param p_retry:    True if the attempt failed and the request will be sent again
+        :param p_wait:     seconds waited for the rate and in-flight limits BEFORE sending
+        :param p_sent:     bytes sent
+        :param p_received: bytes received
+        :param p_items:    number of items returned
+        :param p_units:    quota units used, e.g. the number of requests in a batch
+        """
+        bucket = next((num for num, bound in enumerate(LATENCY_BUCKETS_MS) if p_seconds * 1000 <= bound), len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            op = self.ops[p_op]
+            op.calls += 1
+            op.retries += int(p_retry)
+            op.seconds += p_seconds
+            op.wait_seconds += p_wait
+            op.max_seconds = max(op.max_seconds, p_seconds)
+            op.bytes_sent += p_sent
+            op.bytes_received += p_received
+            op.items += p_items
+            op.quota_units += p_units
+            op.statuses[p_status] += 1
+            op.histogram[bucket] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            ops = {name:op.as_dict() for name, op in sorted(self.ops.items())}
+        return {"started":time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "elapsed_seconds":round(time.time() - self.started, 3), "operations":ops}
+
+    def summary(self) -> str:
+        """A table of the totals for each operation."""
+        header = f"{'operation':<20}{'calls':>7}{'retry':>7}{'total s':>9}{'wait s':>8}{'mean ms':>9}{'p50 ms':>8}{'p95 ms':>8}" \
+                 f"{'max ms':>9}{'sent KB':>9}{'recv KB':>9}{'items':>8}{'units':>7}  statuses"
+        lines = ["Drive API calls:", header, '-' * len(header)]
+        with self._lock:
+            ops = sorted(self.ops.items(), key = lambda kv: kv[1].seconds, reverse = True)
+            for name, op in ops:
+                mean = op.seconds * 1000 / op.calls if op.calls else 0.0
+                statuses = ", ".join(f"{code}:{num}" for code, num in sorted(op.statuses.items()))
+                lines.append(f"{name:<20}{op.calls:>7}{op.retries:>7}{op.seconds:>9.2f}{op.wait_seconds:>8.2f}{mean:>9.1f}"
+                             f"{op.percentile(50):>8g}{op.percentile(95):>8g}{op.max_seconds * 1000:>9.1f}{op.bytes_sent / 1024:>9.1f}"
+                             f"{op.bytes_received / 1024:>9.1f}{op.items:>8}{op.quota_units:>7}  {statuses}")
+        if len(lines) == 3:
+            lines.append("NO Drive API calls.")
+        return "\n".join(lines)
+
+# shared by ALL the Drive requests in this process
+METRICS = ApiMetrics()
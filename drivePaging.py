@@ -0,0 +1,108 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# drivePaging.py
+#   -- stream the results of Google Drive 'files.list' queries page by page
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import queue
+import threading
+from typing import Iterator
+from driveScheduler import SCHEDULER
+from driveTrace import STAGE_CAT, TRACER
+
+# largest pageSize accepted by the Drive v3 'files.list' method
+MAX_PAGE_SIZE = 1000
+# number of pages a prefetching pager may fetch ahead of the caller
+PREFETCH_DEPTH = 2
+# how often, in seconds, a pager blocked by a full read-ahead checks whether the caller has stopped
+STOP_POLL = 0.1
+
+def iter_pages(p_files, p_query:str, p_fields:str, p_page_size:int = MAX_PAGE_SIZE) -> Iterator[list]:
+    """Yield each page of items matching a Drive query as soon as it arrives.
+       The next page is ONLY requested when the caller asks for it, so stopping the iteration stops the paging.
+    :param p_files:     the Drive 'files' resource to query
+    :param p_query:     Drive query string
+    :param p_fields:    fields to obtain for each item, e.g. "id, name"
+    :param p_page_size: number of items to request per page
+    """
+    page_size = max(1, min(p_page_size, MAX_PAGE_SIZE))
+    page_token = None
+    while True:
+        results = SCHEDULER.execute( p_files.list(q = p_query, spaces = "drive", pageSize = page_size,
+                                                  fields = f"nextPageToken, files({p_fields})", pageToken = page_token) )
+        yield results.get("files", [])
+        page_token = results.get("nextPageToken", None)
+        if page_token is None:
+            break
+
+def iter_page_items(p_files, p_query:str, p_fields:str, p_page_size:int = MAX_PAGE_SIZE) -> Iterator[dict]:
+    """Yield the items matching a Drive query one at a time, fetching pages lazily."""
+    for page in iter_pages(p_files, p_query, p_fields, p_page_size):
+        yield from page
+
+def prefetch_pages(p_drive_lease, p_query:str, p_fields:str, p_page_size:int = MAX_PAGE_SIZE,
+                   p_depth:int = PREFETCH_DEPTH, p_limit:int = 0) -> Iterator[list]:
+    """Yield each page of items matching a Drive query, like iter_pages(), while a background thread requests the NEXT page
+       as soon as the nextPageToken is known, so the network time overlaps the time the caller spends on each page.
+       The thread stops after reading p_depth pages ahead, after p_limit items, OR when the caller stops iterating.
+    :param p_drive_lease:   callable returning a context manager that lends a Drive service, e.g. SERVICE_POOL.lease(creds),
+                            used ONLY by the background thread
+    :param p_query:     Drive query string
+    :param p_fields:    fields to obtain for each item, e.g. "id, name"
+    :param p_page_size: number of items to request per page
+    :param p_depth:     maximum number of pages fetched but NOT yet given to the caller
+    :param p_limit:     stop requesting pages once this many items are fetched; 0 for NO limit
+    """
+    pages = queue.Queue(maxsize = max(1, p_depth))
+    stop = threading.Event()
+    done = object()
+    # the pages fetched in the background thread are nested in the span of the caller
+    parent = TRACER.current()
+
+    def put(p_entry) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(p_entry, timeout = STOP_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch():
+        try:
+            fetched = 0
+            # httplib2 is NOT thread-safe, so this thread has a Drive service to itself
+            with TRACER.span("prefetch", STAGE_CAT, parent, query = p_query), p_drive_lease() as drive:
+                for page in iter_pages(drive.files(), p_query, p_fields, p_page_size):
+                    fetched += len(page)
+                    if not put(page) or (p_limit and fetched >= p_limit):
+                        break
+            put(done)
+        except Exception as fex:
+            put(fex)
+
+    threading.Thread(target = fetch, name = "drive-prefetch", daemon = True).start()
+    try:
+        while True:
+            entry = pages.get()
+            if entry is done:
+                break
+            if isinstance(entry, Exception):
+                raise entry
+            yield entry
+    finally:
+        stop.set()
+
+def prefetch_page_items(p_drive_lease, p_query:str, p_fields:str, p_page_size:int = MAX_PAGE_SIZE,
+                        p_depth:int = PREFETCH_DEPTH, p_limit:int = 0) -> Iterator[dict]:
+    """Yield the items matching a Drive query one at a time, with the next pages prefetched in the background."""
+    for page in prefetch_pages(p_drive_lease, p_query, p_fields, p_page_size, p_depth, p_limit):
+        yield from page
@@ -0,0 +1,132 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# drivePolicy.py
+#   -- retention rules for the files in my Google Drive folders, read from a JSON, TOML or YAML policy file
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.11+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import json
+import logging
+import os.path as osp
+import re
+import tomllib
+from datetime import datetime as dt, timedelta, timezone
+from driveShard import format_drive_time, parse_drive_time
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+POLICY_FIELDS = "id, name, mimeType, modifiedTime, size"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+RULE_KEYS = ("name", "folder", "extension", "mimetype", "max_age_days", "keep_newest", "max_total_size")
+SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+def parse_size(p_size) -> int:
+    """A size in bytes from a number OR a string such as '500MB'."""
+    if isinstance(p_size, (int, float)):
+        return int(p_size)
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", str(p_size).upper())
+    if not match:
+        raise ValueError(f"Size '{p_size}' NOT valid! Use a number of bytes OR e.g. '500MB'.")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+class RetentionRule:
+    """Which files of ONE Drive folder to keep: files matching the extension OR mimeType are deleted once they are older
+       than max_age_days OR beyond max_total_size, counting from the newest, but the newest keep_newest files are ALWAYS kept."""
+    def __init__(self, p_spec:dict):
+        unknown = set(p_spec.keys()) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown retention rule keys {sorted(unknown)}; use {list(RULE_KEYS)}.")
+        if "folder" not in p_spec:
+            raise ValueError(f"Retention rule {p_spec} has NO folder!")
+        self.spec = dict(p_spec)
+        self.folder = p_spec["folder"]
+        self.name = p_spec.get("name", self.folder)
+        self.extension = p_spec.get("extension", "").lstrip('.')
+        self.mimetype = p_spec.get("mimetype", "")
+        self.max_age_days = p_spec.get("max_age_days")
+        self.keep_newest = int(p_spec.get("keep_newest", 0))
+        self.max_total_size = parse_size(p_spec["max_total_size"]) if "max_total_size" in p_spec else None
+        if self.max_age_days is None and self.max_total_size is None:
+            raise ValueError(f"Retention rule '{self.name}' needs a max_age_days OR a max_total_size!")
+
+    def expires(self, p_item:dict) -> str:
+        """The time, in the Drive format, when an item becomes old enough to delete, OR empty if age does NOT matter."""
+        if self.max_age_days is None:
+            return ""
+        return format_drive_time(parse_drive_time(p_item["modifiedTime"]) + timedelta(days = self.max_age_days))
+
+    def matches(self, p_item:dict) -> bool:
+        if p_item.get("mimeType") == FOLDER_MIME_TYPE:
+            return False
+        if self.mimetype and p_item.get("mimeType") != self.mimetype:
+            return False
+        return not self.extension or osp.splitext(p_item["name"])[1][1:] == self.extension
+
+    def expired(self, p_items:list, p_now:dt) -> list:
+        """The items of the folder that this rule deletes, oldest first."""
+        # the Drive time format sorts in time order
+        newest_first = sorted((item for item in p_items if self.matches(item)), key = lambda item: item["modifiedTime"], reverse = True)
+        cutoff = format_drive_time(p_now - timedelta(days = self.max_age_days)) if self.max_age_days is not None else ""
+        expired = []
+        total = 0
+        for num, item in enumerate(newest_first):
+            total += int(item.get("size", 0))
+            if num < self.keep_newest:
+                continue
+            if (cutoff and item["modifiedTime"] < cutoff) or (self.max_total_size is not None and total > self.max_total_size):
+                expired.append(item)
+        return expired[::-1]
+
+def load_policy(p_path:str) -> list:
+    """The retention rules in a policy file, in the 'rules' list of a JSON, YAML OR TOML ([[rules]] tables) file."""
+    ext = osp.splitext(p_path)[1].lower()
+    if ext == ".toml":
+        with open(p_path, "rb") as fp:
+            spec = tomllib.load(fp)
+    elif ext in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError(f"Policy file '{p_path}' needs PyYAML: 'pip install pyyaml', OR use a JSON or TOML policy file.")
+        with open(p_path) as fp:
+            spec = yaml.safe_load(fp)
+    else:
+        with open(p_path) as fp:
+            spec = json.load(fp)
+    rules = [RetentionRule(rule) for rule in (spec or {}).get("rules", [])]
+    if not rules:
+        raise ValueError(f"Policy file '{p_path}' has NO rules!")
+    return rules
+
+def plan_deletions(p_rules:list, p_folder_id, p_list_folder, p_lgr:logging.Logger, p_now:dt = None) -> list:
+    """Apply ALL the rules, listing each folder ONCE however many rules use it.
+    :param p_rules:       retention rules
+    :param p_folder_id:   callable giving the Drive id of a rule folder
+    :param p_list_folder: callable giving the items, with the POLICY_FIELDS, in a Drive folder
+    :param p_lgr:         logger
+    :param p_now:         time to find the age of the files from; DEFAULT = now
+    :return the items to delete, each ONCE, oldest first
+    """
+    now = p_now or dt.now(timezone.utc)
+    by_folder = {}
+    for rule in p_rules:
+        by_folder.setdefault(p_folder_id(rule.folder), []).append(rule)
+    planned = {}
+    for fid, rules in by_folder.items():
+        items = list( p_list_folder(fid) )
+        for rule in rules:
+            expired = rule.expired(items, now)
+            p_lgr.info(f"rule '{rule.name}': {len(expired)} of {len(items)} items in folder '{rule.folder}' to delete.")
+            for item in expired:
+                planned.setdefault(item["id"], item)
+    p_lgr.info(f">> {len(planned)} files to delete from {len(by_folder)} folders by {len(p_rules)} rules.\n")
+    return sorted(planned.values(), key = lambda item: item["modifiedTime"])
@@ -0,0 +1,121 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveProfile.py
+#   -- profile ONE run of a Drive function with cProfile and tracemalloc, and write the reports to the log folder
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import cProfile
+import io
+import logging
+import os
+import os.path as osp
+import pstats
+import time
+import tracemalloc
+
+PROFILE_SORTS = ("cumulative", "tottime")
+PROFILE_LINES = 40
+ALLOCATION_LINES = 25
+# frames kept for each allocation: more frames attribute the memory better but slow the run more
+ALLOCATION_FRAMES = 8
+PROFILE_TIME_FORMAT = "%Y-%m-%dT%H-%M-%S"
+
+
+class RunProfiler:
+    """Context manager to profile the calls AND the memory allocations of the code in its body:
+           with RunProfiler(log_folder, "driveFunctions", lgr):
+               mhsda.read_file_info(...)
+       On exit, writes a report of the hotspot functions, sorted by cumulative AND by own time, a report of the top
+       allocations by line and by file, and the raw stats for e.g. snakeviz. n.b. cProfile ONLY sees the thread that
+       entered the profiler, so the time of worker threads, e.g. uploads OR prefetched pages, shows up as waiting."""
+    def __init__(self, p_folder:str, p_name:str, p_lgr:logging.Logger, p_lines:int = PROFILE_LINES,
+                 p_allocations:int = ALLOCATION_LINES, p_frames:int = ALLOCATION_FRAMES):
+        """
+        :param p_folder:      folder to write the reports to
+        :param p_name:        start of the report filenames, e.g. the name of the script
+        :param p_lgr:         logger
+        :param p_lines:       number of functions in each hotspot list
+        :param p_allocations: number of lines in each allocation list
+        :param p_frames:      number of stack frames to keep for each allocation
+        """
+        self.folder = p_folder
+        self.name = p_name
+        self.lgr = p_lgr
+        self.lines = p_lines
+        self.allocations = p_allocations
+        self.frames = p_frames
+        self.profile = None
+        self.reports = []
+        self._start = 0.0
+        self._tracing = False
+
+    def __enter__(self):
+        # do NOT stop a tracemalloc that someone else started
+        self._tracing = not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        self.profile = cProfile.Profile()
+        self._start = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *_):
+        self.profile.disable()
+        elapsed = time.perf_counter() - self._start
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._tracing:
+            tracemalloc.stop()
+        try:
+            self.reports = self.write_reports(snapshot, elapsed, current, peak)
+            self.lgr.info(f"Profile reports: {self.reports}")
+        except OSError as poe:
+            self.lgr.warning(f"Could NOT write the profile reports to '{self.folder}': {repr(poe)}")
+        # do NOT hide an exception from the body
+        return False
+
+    def _hotspots(self, p_elapsed:float) -> str:
+        out = io.StringIO()
+        out.write(f"{self.name}: {p_elapsed:.3f} seconds in the profiled thread\n")
+        stats = pstats.Stats(self.profile, stream = out)
+        for sort in PROFILE_SORTS:
+            out.write(f"\n{'=' * 40} top {self.lines} functions by {sort} time {'=' * 40}\n")
+            stats.sort_stats(sort).print_stats(self.lines)
+        return out.getvalue()
+
+    def _allocations(self, p_snapshot:tracemalloc.Snapshot, p_current:int, p_peak:int) -> str:
+        snapshot = p_snapshot.filter_traces( (tracemalloc.Filter(False, tracemalloc.__file__),
+                                              tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                                              tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")) )
+        lines = [f"{self.name}: {p_current / 1024:.1f} KB still allocated, peak = {p_peak / 1024:.1f} KB"]
+        for key in ("lineno", "filename"):
+            stats = snapshot.statistics(key)
+            lines.append(f"\n{'=' * 40} top {self.allocations} allocations by {key} {'=' * 40}")
+            for stat in stats[:self.allocations]:
+                lines.append(f"{stat.size / 1024:10.1f} KB {stat.count:9} blocks  {stat.traceback[0]}")
+            lines.append(f"{sum(stat.size for stat in stats) / 1024:10.1f} KB in ALL {len(stats)} {key}s")
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, p_snapshot:tracemalloc.Snapshot, p_elapsed:float, p_current:int, p_peak:int) -> list:
+        """:return paths of the hotspot report, the allocation report AND the raw cProfile stats"""
+        os.makedirs(self.folder, exist_ok = True)
+        base = osp.join(self.folder, f"{self.name}_{time.strftime(PROFILE_TIME_FORMAT)}")
+        hotspots = base + "_profile.txt"
+        with open(hotspots, 'w') as fp:
+            fp.write( self._hotspots(p_elapsed) )
+        allocations = base + "_allocations.txt"
+        with open(allocations, 'w') as fp:
+            fp.write( self._allocations(p_snapshot, p_current, p_peak) )
+        raw = base + ".prof"
+        self.profile.dump_stats(raw)
+        return [hotspots, allocations, raw]
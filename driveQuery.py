@@ -0,0 +1,41 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveQuery.py
+#   -- compile item properties into Google Drive query strings, so that the filtering is done by the server
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+def escape_query_value(p_value:str) -> str:
+    """Escape a value for a single-quoted Drive query string, e.g. quinn's paper\\essay >> quinn\\'s paper\\\\essay"""
+    return p_value.replace("\\", "\\\\").replace("'", "\\'")
+
+def compile_query(p_mimetype:str = "", p_date:str = "", p_pid:str = "", p_name_contains:str = "", p_extension:str = "") -> str:
+    """Build a Drive query from the specified item properties.
+       n.b. Drive matches 'name contains' against the START of each word in the name, and words are also separated by '.',
+       so the results for a name or extension are only CANDIDATES that the caller must check for an exact match.
+    :param p_mimetype:      mimeType of the items
+    :param p_date:          find items OLDER than this date
+    :param p_pid:           id of the parent Drive folder
+    :param p_name_contains: string to search for in the item names
+    :param p_extension:     filename extension of the items, without the '.'
+    :return the query OR an empty string if NO properties were specified
+    """
+    terms = []
+    if p_mimetype:
+        terms.append(f"mimeType = '{escape_query_value(p_mimetype)}'")
+    if p_date:
+        terms.append(f"modifiedTime < '{escape_query_value(p_date)}'")
+    if p_pid:
+        terms.append(f"'{escape_query_value(p_pid)}' in parents")
+    if p_name_contains:
+        terms.append(f"name contains '{escape_query_value(p_name_contains)}'")
+    if p_extension:
+        terms.append(f"name contains '{escape_query_value(p_extension.lstrip('.'))}'")
+    return " and ".join(terms)
@@ -0,0 +1,209 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveScheduler.py
+#   -- send ALL the Google Drive requests through a shared scheduler that keeps them under the Drive quota
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import random
+import threading
+import time
+from googleapiclient.errors import HttpError
+from driveMetrics import METRICS, request_label, request_size, response_items, response_size, upload_progress
+from driveTrace import REQUEST_CAT, TRACER, WAIT_CAT
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RATE_LIMIT_REASONS = ("userRateLimitExceeded", "rateLimitExceeded")
+MAX_RETRIES  = 6
+BASE_BACKOFF = 0.5
+MAX_BACKOFF  = 32.0
+# token bucket: requests per second, and the largest burst; the default Drive quota is 12,000 requests per minute
+DEFAULT_RATE  = 200.0
+DEFAULT_BURST = 200
+# AIMD limits on the number of requests in flight
+MIN_IN_FLIGHT     = 1
+INITIAL_IN_FLIGHT = 8
+MAX_IN_FLIGHT     = 64
+DECREASE_FACTOR   = 0.5
+# do NOT cut the limit again for the errors from requests that were already in flight
+DECREASE_INTERVAL = 1.0
+
+def is_retriable(p_err:Exception) -> bool:
+    """Is this error a quota or server problem that may succeed if the request is sent again?"""
+    if not isinstance(p_err, HttpError):
+        return False
+    status = p_err.resp.status
+    if status in RETRY_STATUSES:
+        return True
+    if status == 403:
+        content = p_err.content.decode("utf-8", "replace") if isinstance(p_err.content, bytes) else str(p_err.content)
+        return any(reason in content for reason in RATE_LIMIT_REASONS)
+    return False
+
+def backoff_delay(p_attempt:int, p_base:float = BASE_BACKOFF, p_max:float = MAX_BACKOFF) -> float:
+    """Exponential backoff with 'full jitter': a random delay up to base * 2^attempt seconds."""
+    return random.uniform(0, min(p_max, p_base * (2 ** p_attempt)))
+
+
+class TokenBucket:
+    """Allow an average of 'rate' requests per second, with bursts of up to 'capacity' requests."""
+    def __init__(self, p_rate:float, p_capacity:int):
+        self.rate = p_rate
+        self.capacity = max(1, p_capacity)
+        self._tokens = float(self.capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, p_cost:int = 1):
+        """Wait until p_cost tokens are available, then take them.
+           A cost larger than the capacity, e.g. a big batch, is taken a bucketful at a time, so it is charged in full."""
+        remaining = max(1, p_cost)
+        while remaining > 0:
+            chunk = min(remaining, self.capacity)
+            self._take(chunk)
+            remaining -= chunk
+
+    def _take(self, p_tokens:int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= p_tokens:
+                    self._tokens -= p_tokens
+                    return
+                wait = (p_tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class DriveScheduler:
+    """Send Drive requests at a steady rate with a limited number in flight, retrying the quota and server errors.
+       The in-flight limit grows by about one for each round of successful requests (additive increase),
+       and is halved when Drive reports it is overloaded (multiplicative decrease)."""
+    def __init__(self, p_rate:float = DEFAULT_RATE, p_burst:int = DEFAULT_BURST, p_max_in_flight:int = MAX_IN_FLIGHT,
+                 p_retries:int = MAX_RETRIES, p_lgr:logging.Logger = None):
+        self.bucket = TokenBucket(p_rate, p_burst)
+        self.max_in_flight = p_max_in_flight
+        self.retries = p_retries
+        self.lgr = p_lgr or logging.getLogger(__name__)
+        self.limit = float(min(INITIAL_IN_FLIGHT, p_max_in_flight))
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._last_decrease = 0.0
+        self.num_requests = 0
+        self.num_retries = 0
+        self.num_throttled = 0
+
+    def configure(self, p_rate:float = None, p_burst:int = None, p_max_in_flight:int = None):
+        """Change the rate OR the limits, e.g. for a Drive project with a larger quota."""
+        if p_rate or p_burst:
+            self.bucket = TokenBucket(p_rate or self.bucket.rate, p_burst or self.bucket.capacity)
+        if p_max_in_flight:
+            with self._cond:
+                self.max_in_flight = p_max_in_flight
+                self.limit = min(self.limit, float(p_max_in_flight))
+
+    def _enter(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            self.num_requests += 1
+
+    def _leave(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self.limit = min(float(self.max_in_flight), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def on_throttle(self):
+        """Drive is overloaded: cut the number of requests in flight, once per interval."""
+        with self._cond:
+            self.num_throttled += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= DECREASE_INTERVAL:
+                self._last_decrease = now
+                self.limit = max(float(MIN_IN_FLIGHT), self.limit * DECREASE_FACTOR)
+                self.lgr.debug(f"Throttled: in-flight limit is now {int(self.limit)}.")
+
+    def execute(self, p_request, p_cost:int = 1, p_retries:int = None):
+        """Execute a Drive request, OR a batch request, when the rate and in-flight limits allow it.
+        :param p_request: anything with an execute() method, e.g. files().list(...)
+        :param p_cost:    number of quota units used, e.g. the number of requests in a batch
+        :param p_retries: max number of times to send the request again after a retriable error; DEFAULT = self.retries
+        :return the response from the request
+        """
+        return self.call(p_request.execute, p_cost, p_retries)
+
+    def call(self, p_fxn, p_cost:int = 1, p_retries:int = None):
+        """Same as execute() for any callable that sends ONE Drive request, e.g. the next_chunk() of a resumable upload."""
+        retries = self.retries if p_retries is None else p_retries
+        label = request_label(p_fxn)
+        attempt = 0
+        while True:
+            wait_start = time.perf_counter()
+            self.bucket.acquire(p_cost)
+            self._enter()
+            start = time.perf_counter()
+            progress = upload_progress(p_fxn)
+            try:
+                response = p_fxn()
+            except HttpError as she:
+                end = time.perf_counter()
+                retry = is_retriable(she) and attempt < retries
+                METRICS.record(label, end - start, she.resp.status, retry, start - wait_start,
+                               request_size(p_fxn), response_size(she.content), p_units = p_cost)
+                TRACER.add("scheduler.wait", WAIT_CAT, wait_start, start)
+                TRACER.add(label, REQUEST_CAT, start, end, attempt = attempt, status = she.resp.status, units = p_cost)
+                if not is_retriable(she):
+                    raise she
+                self.on_throttle()
+                if attempt >= retries:
+                    raise she
+                attempt += 1
+                with self._cond:
+                    self.num_retries += 1
+                delay = backoff_delay(attempt)
+                self.lgr.warning(f"Drive error {she.resp.status}: retry #{attempt} after {delay:.2f} seconds.")
+            else:
+                # next_chunk() returns (status, response) and sends the bytes between the upload progress before and after
+                sent = upload_progress(p_fxn) - progress if label.endswith(".chunk") else request_size(p_fxn)
+                result = response[1] if label.endswith(".chunk") and isinstance(response, tuple) else response
+                end = time.perf_counter()
+                METRICS.record(label, end - start, 200, False, start - wait_start, sent,
+                               response_size(result), response_items(result), p_cost)
+                TRACER.add("scheduler.wait", WAIT_CAT, wait_start, start)
+                TRACER.add(label, REQUEST_CAT, start, end, attempt = attempt, status = 200, units = p_cost)
+                self.on_success()
+                return response
+            finally:
+                self._leave()
+            with TRACER.span("backoff", WAIT_CAT, attempt = attempt):
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        return {"requests":self.num_requests, "retries":self.num_retries, "throttled":self.num_throttled,
+                "in_flight_limit":int(self.limit)}
+
+# shared by ALL the Drive requests in this process
+SCHEDULER = DriveScheduler()
+
+def add_rate_args(p_parser):
+    """Add the options for the request rate of the shared scheduler to a parser OR argument group."""
+    p_parser.add_argument('--rate', type = float, default = DEFAULT_RATE, metavar = "NUM",
+                          help = f"average number of Drive requests per second; DEFAULT = {DEFAULT_RATE}")
+    p_parser.add_argument('--burst', type = int, default = DEFAULT_BURST, metavar = "NUM",
+                          help = f"largest burst of Drive requests; DEFAULT = {DEFAULT_BURST}")
@@ -0,0 +1,182 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveSession.py
+#   -- keep a warm Google Drive service for reuse by every session in this process
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from driveMetrics import AUTH_OP, METRICS
+from driveTrace import SESSION_CAT, TRACER
+
+DRIVE_API = "drive"
+DRIVE_API_VERSION = "v3"
+
+@lru_cache(maxsize = None)
+def get_discovery_doc() -> str:
+    """The Drive discovery document bundled with the client library, read only ONCE per process."""
+    return get_static_doc(DRIVE_API, DRIVE_API_VERSION)
+
+def save_token(p_creds, p_path:str):
+    """Save the access & refresh tokens, replacing the token file in ONE step so a crash can NOT leave it half written."""
+    temp_path = p_path + ".tmp"
+    with open(temp_path, 'w') as token:
+        token.write( p_creds.to_json() )
+    os.replace(temp_path, p_path)
+
+class DriveServicePool:
+    """Build the Drive service ONCE per process and thread, and reuse it for every session,
+       refreshing the credentials in place ONLY when they expire.
+       n.b. httplib2 is NOT thread-safe, so each thread that begins a session gets its own service."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.creds = None
+        # callable(creds) returning a Drive service; None to build the real Drive service
+        self.factory = None
+        # seconds taken by each acquire(), and whether the service was already built
+        self.timings = []
+        # (creds, service) NOT in use by any thread, to lend to the next short-lived thread
+        self._idle = []
+
+    def install(self, p_factory, p_creds):
+        """Build ALL the Drive services with p_factory instead of the Google discovery document, e.g. to use a fake Drive.
+        :param p_factory: callable(creds) returning a Drive service
+        :param p_creds:   credentials to give to the factory in place of reading the token file
+        """
+        with self._lock:
+            self.factory = p_factory
+            self.creds = p_creds
+            self._idle = []
+        self.clear()
+
+    def uninstall(self):
+        """Go back to building the real Drive service."""
+        with self._lock:
+            self.factory = None
+            self.creds = None
+            self._idle = []
+        self.clear()
+
+    def build(self, p_creds):
+        """Build a NEW Drive service, for the current thread ONLY."""
+        factory = self.factory
+        with TRACER.span("discovery.build", SESSION_CAT):
+            if factory:
+                return factory(p_creds)
+            return build_from_document(get_discovery_doc(), credentials = p_creds)
+
+    def _get_creds(self, p_creds_fxn, p_lgr:logging.Logger, p_token_path:str = ""):
+        with self._lock:
+            if self.factory:
+                return self.creds
+            if self.creds is not None and self.creds.valid:
+                return self.creds
+            start = time.perf_counter()
+            if self.creds is None:
+                self.creds = p_creds_fxn()
+            elif self.creds.expired and self.creds.refresh_token:
+                p_lgr.info("Refresh the Drive credentials.")
+                self.creds.refresh( Request() )
+                if p_token_path:
+                    save_token(self.creds, p_token_path)
+            else:
+                self.creds = p_creds_fxn()
+            # reading the token file OR refreshing the credentials
+            METRICS.record(AUTH_OP, time.perf_counter() - start, 200, p_units = 0)
+            TRACER.add(AUTH_OP, SESSION_CAT, start, time.perf_counter())
+            return self.creds
+
+    def acquire(self, p_creds_fxn, p_lgr:logging.Logger, p_token_path:str = ""):
+        """Get the Drive service for this thread, building it if necessary.
+        :param p_creds_fxn:  callable returning valid credentials, e.g. read from the token file
+        :param p_lgr:        logger
+        :param p_token_path: token file to save the credentials to when they are refreshed, for the next run
+        :return the Drive service and the credentials it uses
+        """
+        start = time.perf_counter()
+        with TRACER.span("service.acquire", SESSION_CAT) as span:
+            creds = self._get_creds(p_creds_fxn, p_lgr, p_token_path)
+            drive = getattr(self._local, "drive", None)
+            warm = drive is not None and getattr(self._local, "creds", None) is creds
+            if not warm:
+                drive = self.build(creds)
+                self._local.drive = drive
+                self._local.creds = creds
+            if span is not None:
+                span["warm"] = warm
+        elapsed = time.perf_counter() - start
+        self.timings.append((elapsed, warm))
+        p_lgr.info(f"Drive service ready in {elapsed * 1000:.1f} ms ({'warm' if warm else 'cold'}).")
+        return drive, creds
+
+    @contextmanager
+    def lease(self, p_creds):
+        """Lend a Drive service to a short-lived thread, e.g. the one that prefetches a listing, and keep it for the next one,
+           so a NEW service is built ONLY when ALL the others are in use OR the credentials have changed.
+        :param p_creds: credentials of the session
+        """
+        drive = None
+        with self._lock:
+            while self._idle and drive is None:
+                creds, idle = self._idle.pop()
+                if creds is p_creds:
+                    drive = idle
+        if drive is None:
+            drive = self.build(p_creds)
+        try:
+            yield drive
+        finally:
+            with self._lock:
+                self._idle.append((p_creds, drive))
+
+    def clear(self):
+        """Drop the service for this thread, e.g. after the credentials were revoked."""
+        self._local.drive = None
+        self._local.creds = None
+
+# shared by ALL the Drive access classes in this process
+SERVICE_POOL = DriveServicePool()
+
+def benchmark(p_creds_fxn, p_lgr:logging.Logger, p_rounds:int = 10) -> dict:
+    """Compare the startup latency of building a new service for each operation with reusing the pooled service.
+    :return mean milliseconds for each method
+    """
+    from googleapiclient.discovery import build
+    start = time.perf_counter()
+    for _ in range(p_rounds):
+        build(DRIVE_API, DRIVE_API_VERSION, credentials = p_creds_fxn())
+    cold_ms = (time.perf_counter() - start) * 1000 / p_rounds
+
+    pool = DriveServicePool()
+    start = time.perf_counter()
+    for _ in range(p_rounds):
+        pool.acquire(p_creds_fxn, p_lgr)
+    warm_ms = (time.perf_counter() - start) * 1000 / p_rounds
+
+    p_lgr.info(f"Mean startup per operation over {p_rounds} rounds: build each time = {cold_ms:.1f} ms; pooled = {warm_ms:.1f} ms")
+    return {"build":cold_ms, "pooled":warm_ms}
+
+
+if __name__ == "__main__":
+    from sys import argv
+    from driveFunctions import get_credentials
+    logging.basicConfig(level = logging.INFO)
+    bench_lgr = logging.getLogger(__name__)
+    benchmark(lambda: get_credentials(bench_lgr), bench_lgr, int(argv[1]) if len(argv) > 1 and argv[1].isnumeric() else 10)
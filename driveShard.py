@@ -0,0 +1,167 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveShard.py
+#   -- list a large Google Drive query as concurrent, disjoint modifiedTime windows instead of one sequential page chain
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime as dt, timedelta, timezone
+from drivePaging import MAX_PAGE_SIZE
+from driveScheduler import SCHEDULER
+from driveTrace import STAGE_CAT, TRACER
+
+DEFAULT_SHARDS = 4
+MAX_SHARDS = 64
+# a shard that still has more pages after this many is too dense, and the rest of its window is split in two
+DENSE_PAGES = 3
+# windows are NOT split below this width, e.g. for many items with the same modifiedTime
+MIN_WINDOW = timedelta(milliseconds = 1)
+DRIVE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+def parse_drive_time(p_time:str) -> dt:
+    """A Drive RFC 3339 time, e.g. '2026-10-17T14:03:27.512Z', as a UTC datetime."""
+    return dt.strptime(p_time if '.' in p_time else p_time.replace('Z', ".0Z"), DRIVE_TIME_FORMAT).replace(tzinfo = timezone.utc)
+
+def format_drive_time(p_time:dt) -> str:
+    return p_time.strftime(DRIVE_TIME_FORMAT)[:-4] + 'Z'
+
+def split_window(p_start:dt, p_end:dt, p_num:int) -> list:
+    """Divide the time window [p_start, p_end) into p_num disjoint windows of the same width."""
+    width = (p_end - p_start) / max(1, p_num)
+    if width < MIN_WINDOW:
+        return [(p_start, p_end)]
+    bounds = [p_start + width * num for num in range(p_num)] + [p_end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def window_query(p_query:str, p_start:dt, p_end:dt) -> str:
+    window = f"modifiedTime >= '{format_drive_time(p_start)}' and modifiedTime < '{format_drive_time(p_end)}'"
+    return f"({p_query}) and {window}" if p_query else window
+
+
+class ShardedLister:
+    """List the items matching a Drive query in concurrent modifiedTime windows, each with its own thread and Drive service,
+       then merge the shards and remove duplicates. A shard that turns out to be too dense is split as it is listed."""
+    def __init__(self, p_service_factory, p_shards:int = DEFAULT_SHARDS, p_lgr:logging.Logger = None, p_level:int = logging.INFO,
+                 p_dense_pages:int = DENSE_PAGES):
+        """
+        :param p_service_factory: callable returning a NEW Drive service; called once in each worker thread
+        :param p_shards:      number of windows to start with, and of shards to list at the same time
+        :param p_lgr:         logger
+        :param p_level:       level to log the progress messages at
+        :param p_dense_pages: number of pages after which a shard is split
+        """
+        self._factory = p_service_factory
+        self.shards = max(1, min(p_shards, MAX_SHARDS))
+        self.lgr = p_lgr or logging.getLogger(__name__)
+        self.lev = p_level
+        self.dense_pages = max(1, p_dense_pages)
+        self._local = threading.local()
+        self.num_calls = 0
+        self.num_splits = 0
+        self._count_lock = threading.Lock()
+        self._trace_parent = 0
+        # set once the limit of a listing is reached, to stop the shards still listing
+        self._stop = threading.Event()
+
+    def _files(self):
+        """The 'files' resource for the current worker thread."""
+        files = getattr(self._local, "files", None)
+        if files is None:
+            files = self._factory().files()
+            self._local.files = files
+        return files
+
+    def _list(self, p_query:str, p_fields:str, p_page_size:int, p_order:str, p_token:str = None) -> dict:
+        with self._count_lock:
+            self.num_calls += 1
+        return SCHEDULER.execute( self._files().list(q = p_query, spaces = "drive", pageSize = p_page_size, orderBy = p_order,
+                                                     fields = f"nextPageToken, files({p_fields})", pageToken = p_token) )
+
+    def _bounds(self, p_query:str) -> tuple:
+        """The earliest and latest modifiedTime of the items matching the query, OR None if there are none."""
+        first = self._list(p_query, "modifiedTime", 1, "modifiedTime").get("files", [])
+        if not first:
+            return None
+        last = self._list(p_query, "modifiedTime", 1, "modifiedTime desc")["files"]
+        return parse_drive_time(first[0]["modifiedTime"]), parse_drive_time(last[0]["modifiedTime"])
+
+    def _shard(self, p_query:str, p_fields:str, p_page_size:int, p_start:dt, p_end:dt) -> tuple:
+        """List the items of ONE window in modifiedTime order.
+        :return the items listed AND the windows still to list, if the shard was too dense
+        """
+        with TRACER.span("shard", STAGE_CAT, self._trace_parent, start = format_drive_time(p_start), end = format_drive_time(p_end)):
+            query = window_query(p_query, p_start, p_end)
+            items, token, pages = [], None, 0
+            while True:
+                results = self._list(query, p_fields, p_page_size, "modifiedTime", token)
+                items.extend(results.get("files", []))
+                token = results.get("nextPageToken")
+                pages += 1
+                if not token or self._stop.is_set():
+                    return items, []
+                # splitting ONLY helps when there are other threads to list the rest of the window
+                if self.shards > 1 and pages >= self.dense_pages:
+                    # the items so far cover the window up to the last modifiedTime, so only the REST of the window is split;
+                    # the items at exactly that time are listed again and removed as duplicates
+                    last = parse_drive_time(items[-1]["modifiedTime"])
+                    rest = split_window(last, p_end, 2)
+                    if last > p_start and len(rest) > 1:
+                        with self._count_lock:
+                            self.num_splits += 1
+                        return items, rest
+
+    def list_items(self, p_query:str, p_fields:str, p_page_size:int = MAX_PAGE_SIZE, p_limit:int = 0) -> list:
+        """All the items matching a Drive query, in modifiedTime order.
+        :param p_query:     Drive query string, WITHOUT an orderBy
+        :param p_fields:    fields to obtain for each item; 'id' and 'modifiedTime' are always included
+        :param p_page_size: number of items to request per page
+        :param p_limit:     stop listing once this many items are merged; 0 for NO limit
+                            n.b. the shards list in parallel, so the items are NOT the EARLIEST p_limit items
+        """
+        fields = ", ".join(dict.fromkeys(["id", "modifiedTime"] + [fld.strip() for fld in p_fields.split(',') if fld.strip()]))
+        page_size = max(1, min(p_page_size, MAX_PAGE_SIZE))
+        start_time = time.perf_counter()
+        self.num_calls = self.num_splits = 0
+        self._stop.clear()
+        bounds = self._bounds(p_query)
+        if not bounds:
+            return []
+        # the shards in the worker threads are nested in the span of the caller
+        self._trace_parent = TRACER.current()
+        # the window includes the latest item
+        windows = split_window(bounds[0], bounds[1] + MIN_WINDOW, self.shards)
+        merged = {}
+        with ThreadPoolExecutor(max_workers = self.shards, thread_name_prefix = "drive-shard") as pool:
+            pending = {pool.submit(self._shard, p_query, fields, page_size, start, end) for start, end in windows}
+            while pending:
+                finished, pending = wait(pending, return_when = FIRST_COMPLETED)
+                for future in finished:
+                    items, rest = future.result()
+                    for item in items:
+                        if p_limit and len(merged) >= p_limit:
+                            break
+                        merged[item["id"]] = item
+                    if p_limit and len(merged) >= p_limit:
+                        # the shards that are listing stop after their current page, the others do NOT start
+                        self._stop.set()
+                        for future in pending:
+                            future.cancel()
+                        pending = {future for future in pending if not future.cancelled()}
+                        continue
+                    pending |= {pool.submit(self._shard, p_query, fields, page_size, start, end) for start, end in rest}
+        elapsed = time.perf_counter() - start_time
+        self.lgr.log(self.lev, f"Listed {len(merged)} items in {len(windows)} shards with {self.num_splits} splits: "
+                               f"{self.num_calls} calls in {elapsed:.2f} seconds.")
+        return sorted(merged.values(), key = lambda item: item["modifiedTime"])
@@ -0,0 +1,106 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveSync.py
+#   -- find which local files are new or changed compared to the files already in a Google Drive folder
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import hashlib
+import json
+import logging
+import os
+import os.path as osp
+from typing import Iterable
+from driveQuery import compile_query
+
+HASH_CACHE_FILENAME = "hash_cache.json"
+SYNC_FIELDS = "id, name, size, md5Checksum"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def sync_query(p_pid:str) -> str:
+    """Query for ALL the items in a Drive folder, to compare with the local files."""
+    return f"{compile_query(p_pid = p_pid)} and trashed = false"
+
+def file_md5(p_path:str) -> str:
+    md5 = hashlib.md5()
+    with open(p_path, "rb") as fp:
+        for block in iter(lambda: fp.read(HASH_BLOCK_SIZE), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+class HashCache:
+    """The md5 of each local file, kept in a JSON file and ONLY recalculated when the size or modified time changes."""
+    def __init__(self, p_path:str):
+        self.path = p_path
+        self.entries = {}
+        self.num_hashed = 0
+        self._dirty = False
+        if osp.isfile(p_path):
+            try:
+                with open(p_path) as fp:
+                    self.entries = json.load(fp)
+            except (OSError, ValueError):
+                # a damaged cache just means hashing the files again
+                self.entries = {}
+
+    def md5(self, p_path:str) -> str:
+        key = osp.abspath(p_path)
+        stat = os.stat(key)
+        entry = self.entries.get(key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        digest = file_md5(key)
+        self.entries[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        self.num_hashed += 1
+        self._dirty = True
+        return digest
+
+    def save(self):
+        if self._dirty:
+            with open(self.path, 'w') as fp:
+                json.dump(self.entries, fp)
+            self._dirty = False
+
+def plan_sync(p_files:list, p_remote:Iterable[dict], p_cache:HashCache) -> tuple:
+    """Compare local files with the items in the Drive folder they are sent to, matching by name.
+    :param p_files:  list of (local path, mimeType)
+    :param p_remote: the items in the Drive folder, with the SYNC_FIELDS
+    :param p_cache:  local md5 cache
+    :return lists of the new files (path, mimeType), the changed files (path, mimeType, Drive id) and the unchanged paths
+    """
+    remote = {}
+    for item in p_remote:
+        # Drive allows more than one item with the same name: compare with the first one
+        remote.setdefault(item["name"], item)
+    new, changed, unchanged = [], [], []
+    for path, mime_type in p_files:
+        item = remote.get(osp.basename(path))
+        # Google Docs, Sheets, etc do NOT have an md5 and must NOT be overwritten with a local file
+        if item is None or "md5Checksum" not in item:
+            new.append((path, mime_type))
+        # check the size first so that a file with a different size is never hashed
+        elif int(item.get("size", -1)) == osp.getsize(path) and item["md5Checksum"] == p_cache.md5(path):
+            unchanged.append(path)
+        else:
+            changed.append((path, mime_type, item["id"]))
+    return new, changed, unchanged
+
+def files_to_sync(p_files:list, p_remote:Iterable[dict], p_cache_path:str, p_lgr:logging.Logger, p_level:int = logging.INFO) -> list:
+    """Find the files that must be sent to bring a Drive folder up to date.
+    :return list of (path, mimeType) for the new files AND (path, mimeType, Drive id) for the changed files
+    """
+    cache = HashCache(p_cache_path)
+    new, changed, unchanged = plan_sync(p_files, p_remote, cache)
+    cache.save()
+    p_lgr.log(p_level, f"Sync: {len(new)} new, {len(changed)} changed and {len(unchanged)} unchanged files; "
+                       f"hashed {cache.num_hashed} files.")
+    return new + changed
@@ -0,0 +1,118 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveTrace.py
+#   -- optional timeline of every Drive request and local stage of a run, saved as a Chrome trace-event JSON file
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# categories of the spans, to filter on in the trace viewer
+SESSION_CAT = "session"
+REQUEST_CAT = "request"
+WAIT_CAT    = "wait"
+STAGE_CAT   = "stage"
+
+
+class Tracer:
+    """Record a span, with start and end times and the span it is nested in, for each Drive request and local stage.
+       Nothing is recorded until start() is called, so the spans cost almost nothing in a normal run.
+       The saved file opens in chrome://tracing OR https://ui.perfetto.dev, with one row for each thread."""
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._events = []
+        self._threads = {}
+        self._origin = time.perf_counter()
+
+    def start(self):
+        """Begin recording a NEW trace."""
+        with self._lock:
+            self._events = []
+            self._threads = {}
+            self._origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def __len__(self):
+        return len(self._events)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def current(self) -> int:
+        """Id of the innermost open span of this thread, to give as the parent of spans in worker threads; 0 for NONE."""
+        stack = self._stack() if self.enabled else None
+        return stack[-1] if stack else 0
+
+    def add(self, p_name:str, p_cat:str, p_start:float, p_end:float, p_parent:int = None, **p_args):
+        """Record a span that has already ended.
+        :param p_name:   e.g. 'files.list'
+        :param p_cat:    category of the span
+        :param p_start:  time.perf_counter() when the span started
+        :param p_end:    time.perf_counter() when the span ended
+        :param p_parent: id of the span this one is nested in; DEFAULT = the innermost open span of this thread
+        :param p_args:   details to show for the span, e.g. the HTTP status
+        """
+        if not self.enabled:
+            return
+        self._record(p_name, p_cat, p_start, p_end, next(self._ids), self.current() if p_parent is None else p_parent, p_args)
+
+    @contextmanager
+    def span(self, p_name:str, p_cat:str = STAGE_CAT, p_parent:int = None, **p_args):
+        """Record a span around the body of a with statement; any spans started in the body, in this thread, are nested in it.
+        :return the dict of details of the span, to add to in the body, OR None if NOT recording
+        """
+        if not self.enabled:
+            yield None
+            return
+        stack = self._stack()
+        sid = next(self._ids)
+        parent = (stack[-1] if stack else 0) if p_parent is None else p_parent
+        stack.append(sid)
+        start = time.perf_counter()
+        try:
+            yield p_args
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            self._record(p_name, p_cat, start, end, sid, parent, p_args)
+
+    def _record(self, p_name:str, p_cat:str, p_start:float, p_end:float, p_id:int, p_parent:int, p_args:dict):
+        thread = threading.current_thread()
+        event = {"name":p_name, "cat":p_cat, "ph":"X", "ts":round((p_start - self._origin) * 1e6, 1),
+                 "dur":round((p_end - p_start) * 1e6, 1), "pid":os.getpid(), "tid":thread.ident,
+                 "args":{"id":p_id, "parent":p_parent, **p_args}}
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    def as_dict(self) -> dict:
+        """The trace in the Chrome trace-event format."""
+        with self._lock:
+            names = [{"name":"thread_name", "ph":"M", "pid":os.getpid(), "tid":tid, "args":{"name":name}}
+                     for tid, name in self._threads.items()]
+            return {"traceEvents": names + sorted(self._events, key = lambda ev: ev["ts"]), "displayTimeUnit":"ms"}
+
+# shared by ALL the threads in this process
+TRACER = Tracer()
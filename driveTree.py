@@ -0,0 +1,139 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveTree.py
+#   -- crawl the folder hierarchy of my Google Drive into an in-memory tree index
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import json
+import logging
+import os.path as osp
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from drivePaging import iter_page_items
+from driveQuery import compile_query
+
+TREE_FILENAME = "drive_tree.json"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+DEFAULT_CRAWL_WORKERS = 8
+ROOT_LABEL = "root"
+PATH_SEP   = '/'
+
+class FolderTree:
+    """Index of the folders on my Drive: id >> name, id >> parent id, id >> child ids."""
+    def __init__(self, p_root_id:str = ROOT_LABEL):
+        self.root_id = p_root_id
+        self.names = {p_root_id: ""}
+        self.parent = {}
+        self.children = {p_root_id: []}
+
+    def __len__(self):
+        """Number of folders, NOT including the root."""
+        return len(self.parent)
+
+    def add(self, p_id:str, p_name:str, p_parent_id:str):
+        self.names[p_id] = p_name
+        self.parent[p_id] = p_parent_id
+        self.children.setdefault(p_id, [])
+        self.children.setdefault(p_parent_id, []).append(p_id)
+
+    def resolve(self, p_path:str) -> str:
+        """Find the id of a folder from its path, e.g. 'Finance/2025/Q3'.
+        :return the folder id OR an empty string if there is NO folder at that path
+        """
+        fid = self.root_id
+        for name in [part for part in p_path.split(PATH_SEP) if part]:
+            fid = next((cid for cid in self.children.get(fid, []) if self.names[cid] == name), "")
+            if not fid:
+                break
+        return fid
+
+    def path_of(self, p_id:str) -> str:
+        """The path of a folder from the root, e.g. 'Finance/2025/Q3'."""
+        parts = []
+        fid = p_id
+        while fid in self.parent:
+            parts.append(self.names[fid])
+            fid = self.parent[fid]
+        return PATH_SEP.join(reversed(parts))
+
+    def subtree(self, p_id:str) -> Iterator[str]:
+        """Yield the ids of a folder and ALL the folders under it, breadth-first."""
+        queue = deque([p_id])
+        while queue:
+            fid = queue.popleft()
+            yield fid
+            queue.extend(self.children.get(fid, []))
+
+    def save(self, p_path:str):
+        """Write the tree to a JSON file."""
+        with open(p_path, 'w') as fp:
+            json.dump({"root":self.root_id, "folders":{fid:[self.names[fid], pid] for fid, pid in self.parent.items()}}, fp)
+
+    @classmethod
+    def load(cls, p_path:str):
+        """Read a tree from a JSON file written by save()."""
+        with open(p_path) as fp:
+            data = json.load(fp)
+        tree = cls(data["root"])
+        for fid, (name, pid) in data["folders"].items():
+            tree.add(fid, name, pid)
+        return tree
+
+    @classmethod
+    def crawl(cls, p_service_factory, p_lgr:logging.Logger, p_root_id:str = ROOT_LABEL, p_workers:int = DEFAULT_CRAWL_WORKERS):
+        """Walk the folder hierarchy breadth-first, listing ALL the folders at the same level concurrently.
+        :param p_service_factory: callable returning a NEW Drive service; called once in each worker thread
+        :param p_lgr:       logger
+        :param p_root_id:   id of the folder to start from
+        :param p_workers:   number of folders to list at the same time
+        """
+        local = threading.local()
+
+        def list_children(p_pid:str) -> list:
+            files = getattr(local, "files", None)
+            if files is None:
+                files = p_service_factory().files()
+                local.files = files
+            query = f"{compile_query(p_mimetype = FOLDER_MIME_TYPE, p_pid = p_pid)} and trashed = false"
+            return list( iter_page_items(files, query, "id, name") )
+
+        start = time.perf_counter()
+        tree = cls(p_root_id)
+        visited = {p_root_id}
+        frontier = [p_root_id]
+        level = 0
+        with ThreadPoolExecutor(max_workers = max(1, p_workers), thread_name_prefix = "drive-crawl") as pool:
+            while frontier:
+                next_frontier = []
+                for pid, folders in zip(frontier, pool.map(list_children, frontier)):
+                    for folder in folders:
+                        # a folder may have more than one parent
+                        if folder["id"] not in visited:
+                            visited.add(folder["id"])
+                            tree.add(folder["id"], folder["name"], pid)
+                            next_frontier.append(folder["id"])
+                level += 1
+                p_lgr.debug(f"level {level}: {len(next_frontier)} folders.")
+                frontier = next_frontier
+        p_lgr.info(f"Crawled {len(tree)} folders in {level} levels in {time.perf_counter() - start:.2f} seconds.")
+        return tree
+
+def load_or_crawl(p_path:str, p_service_factory, p_lgr:logging.Logger, p_recrawl:bool = False) -> FolderTree:
+    """Reload the saved folder tree OR crawl my Drive and save the new tree."""
+    if not p_recrawl and osp.isfile(p_path):
+        return FolderTree.load(p_path)
+    tree = FolderTree.crawl(p_service_factory, p_lgr)
+    tree.save(p_path)
+    return tree
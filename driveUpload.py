@@ -0,0 +1,313 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# driveUpload.py
+#   -- upload engine for sending many local files to my Google Drive
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import json
+import logging
+import os
+import os.path as osp
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, build_http
+from drivePaging import iter_page_items
+from driveScheduler import SCHEDULER
+from driveTrace import STAGE_CAT, TRACER
+from driveSession import SERVICE_POOL, get_discovery_doc
+from driveSync import SYNC_FIELDS, HashCache, plan_sync, sync_query
+from driveTree import FOLDER_MIME_TYPE
+
+DEFAULT_WORKERS = 1
+MAX_WORKERS     = 16
+BYTES_PER_MB    = 1024 * 1024
+# files SMALLER than this are sent in ONE multipart request, larger files in chunks of a resumable upload
+MULTIPART_THRESHOLD = 5 * BYTES_PER_MB
+# the chunk size of a resumable upload MUST be a multiple of 256 KB
+CHUNK_UNIT = 256 * 1024
+DEFAULT_CHUNK_SIZE = 32 * CHUNK_UNIT
+MULTIPART = "multipart"
+RESUMABLE = "resumable"
+
+class UploadTimings:
+    """Number of files, bytes and seconds taken for each upload strategy."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = {}
+
+    def add(self, p_strategy:str, p_bytes:int, p_seconds:float):
+        with self._lock:
+            count, nbytes, seconds = self.totals.get(p_strategy, (0, 0, 0.0))
+            self.totals[p_strategy] = (count + 1, nbytes + p_bytes, seconds + p_seconds)
+
+    def summary(self) -> str:
+        with self._lock:
+            return "; ".join(f"{strategy}: {count} files, {nbytes / BYTES_PER_MB:.2f} MB in {seconds:.2f} s"
+                             f" = {count / max(seconds, 1e-6):.2f} files/s, {nbytes / BYTES_PER_MB / max(seconds, 1e-6):.2f} MB/s"
+                             for strategy, (count, nbytes, seconds) in sorted(self.totals.items()))
+
+# shared by ALL the uploads in this process
+UPLOAD_TIMINGS = UploadTimings()
+
+def upload_file(p_files, p_path:str, p_mime_type:str, p_pid:str = "", p_file_id:str = "", p_lgr:logging.Logger = None,
+                p_level:int = logging.DEBUG, p_threshold:int = MULTIPART_THRESHOLD, p_chunk_size:int = DEFAULT_CHUNK_SIZE,
+                p_progress = None, p_resume_uri:str = "", p_session = None) -> str:
+    """Send a local file to my Drive, in ONE multipart request if it is small, otherwise in chunks of a resumable upload.
+    :param p_files:      the Drive 'files' resource to use
+    :param p_path:       path of the local file
+    :param p_mime_type:  mimeType to send the file with
+    :param p_pid:        id of the Drive folder to create the file in
+    :param p_file_id:    id of an existing Drive file to replace the content of, instead of creating a new file
+    :param p_lgr:        optional logger for the timing of the upload
+    :param p_level:      level to log the timing at
+    :param p_threshold:  size in bytes at which to switch from a multipart to a resumable upload
+    :param p_chunk_size: size in bytes of each chunk of a resumable upload, rounded down to a multiple of 256 KB
+    :param p_progress:   optional callable(bytes sent, file size), called after each chunk of a resumable upload
+    :param p_resume_uri: session URI of a resumable upload of this file that was interrupted
+    :param p_session:    optional callable(session URI, bytes Drive has received), called after each chunk of a resumable upload
+    :return the Google id of the file
+    """
+    size = osp.getsize(p_path)
+    strategy = RESUMABLE if size >= p_threshold else MULTIPART
+    chunk_size = max(CHUNK_UNIT, p_chunk_size - p_chunk_size % CHUNK_UNIT)
+    media = MediaFileUpload(p_path, mimetype = p_mime_type, chunksize = chunk_size, resumable = (strategy == RESUMABLE))
+    if p_file_id:
+        request = p_files.update(fileId = p_file_id, media_body = media, fields = "id")
+    else:
+        request = p_files.create(body = {"name":osp.basename(p_path), "parents":[p_pid]}, media_body = media, fields = "id")
+    start = time.perf_counter()
+    try:
+        if strategy == MULTIPART:
+            response = SCHEDULER.execute(request)
+        else:
+            response = None
+            if p_resume_uri:
+                def query_upload():
+                    return query_resumable(request, p_resume_uri, size)
+                received, response = SCHEDULER.call(query_upload)
+                # continue from the first byte that Drive does NOT have; an expired session starts again
+                if received >= 0:
+                    request.resumable_uri = p_resume_uri
+                    request.resumable_progress = received
+            while response is None:
+                try:
+                    status, response = SCHEDULER.call(request.next_chunk)
+                except HttpError as ufe:
+                    # the session has expired, so start the upload again
+                    if not request.resumable_uri or ufe.resp.status not in (404, 410):
+                        raise ufe
+                    request.resumable_uri = None
+                    request.resumable_progress = 0
+                    continue
+                if status and p_session:
+                    p_session(request.resumable_uri, status.resumable_progress)
+                if status and p_progress:
+                    p_progress(status.resumable_progress, size)
+            if p_progress:
+                p_progress(size, size)
+    finally:
+        # MediaFileUpload opens the file but NEVER closes it
+        media.stream().close()
+    elapsed = time.perf_counter() - start
+    UPLOAD_TIMINGS.add(strategy, size, elapsed)
+    if p_lgr:
+        p_lgr.log(p_level, f"{strategy} upload of '{p_path}' ({size} bytes) in {elapsed * 1000:.1f} ms.")
+    return response.get("id")
+
+def query_resumable(p_request, p_uri:str, p_size:int) -> tuple:
+    """Ask Drive how many bytes of an interrupted resumable upload it has, with an EMPTY PUT to the session URI.
+    :param p_request: the upload request, to send the query with its authorized http
+    :param p_uri:     session URI of the upload
+    :param p_size:    size of the file
+    :return (bytes received, the file metadata if the upload had completed), with -1 bytes if the session has expired
+    """
+    resp, content = p_request.http.request(p_uri, method = "PUT", body = b"",
+                                           headers = {"Content-Length":"0", "Content-Range":f"bytes */{p_size}"})
+    status = int(resp.status)
+    if status in (200, 201):
+        return p_size, json.loads(content)
+    if status == 308:
+        # e.g. 'bytes=0-1048575'; NO Range header means Drive has NO bytes yet
+        received = resp.get("range", "")
+        return (int(received.split('-')[-1]) + 1 if received else 0), None
+    if status in (404, 410):
+        return -1, None
+    raise HttpError(resp, content, uri = p_uri)
+
+def build_thread_service(p_creds):
+    """Build a Drive service with its OWN authorized http transport, as httplib2 is NOT thread-safe.
+       n.b. build_http() does NOT follow a 308, which is how Drive answers each chunk of a resumable upload."""
+    if SERVICE_POOL.factory:
+        return SERVICE_POOL.build(p_creds)
+    return build_from_document(get_discovery_doc(), http = AuthorizedHttp(p_creds, http = build_http()))
+
+class ParallelUploader:
+    """Send files to my Google drive using a bounded pool of worker threads, each with its own Drive service."""
+    def __init__(self, p_service_factory, p_workers:int, p_lgr:logging.Logger, p_level:int = logging.INFO,
+                 p_threshold:int = MULTIPART_THRESHOLD, p_chunk_size:int = DEFAULT_CHUNK_SIZE):
+        """
+        :param p_service_factory: callable returning a NEW Drive service; called once in each worker thread
+        :param p_workers: number of worker threads
+        :param p_lgr:     logger
+        :param p_level:   level to log the progress messages at
+        :param p_threshold:  size in bytes at which to switch from a multipart to a resumable upload
+        :param p_chunk_size: size in bytes of each chunk of a resumable upload
+        """
+        self.threshold = p_threshold
+        self.chunk_size = p_chunk_size
+        self._factory = p_service_factory
+        self.workers = max(1, min(p_workers, MAX_WORKERS))
+        self.lgr = p_lgr
+        self.lev = p_level
+        self._local = threading.local()
+        self._progress = None
+        self._cancel = None
+        self._journal = None
+        self._trace_parent = 0
+
+    def _files(self):
+        """The 'files' resource for the current worker thread."""
+        files = getattr(self._local, "files", None)
+        if files is None:
+            files = self._factory().files()
+            self._local.files = files
+        return files
+
+    def _send(self, p_path:str, p_mime_type:str, p_pid:str, p_file_id:str = "") -> str:
+        if self._cancel and self._cancel.is_set():
+            return ""
+        with TRACER.span("upload", STAGE_CAT, self._trace_parent, path = p_path):
+            journal = self._journal
+            resume_uri = journal.started(p_path)[0] if journal else ""
+            # with a Drive id, replace the content of the existing Drive file instead of creating a duplicate
+            response = upload_file( self._files(), p_path, p_mime_type, p_pid, p_file_id, self.lgr, logging.DEBUG,
+                                    self.threshold, self.chunk_size, p_resume_uri = resume_uri,
+                                    p_session = (lambda uri, offset: journal.progress(p_path, uri, offset)) if journal else None )
+            if journal:
+                journal.done(p_path, response)
+            self.lgr.log(self.lev, f"{'Updated' if p_file_id else 'Sent'} '{p_path}' >> Google Id = {response}")
+            if self._progress:
+                with self._progress_lock:
+                    self._num_sent += 1
+                    self._bytes_sent += osp.getsize(p_path)
+                    self._progress(self._num_sent, self._bytes_sent)
+            return response
+
+    def send_files(self, p_files:list, p_pid:str, p_parent:str, p_progress = None, p_cancel:threading.Event = None,
+                   p_journal = None) -> list:
+        """Send the files concurrently.
+        :param p_files:    list of (local path, mimeType) for each file to send,
+                           OR (local path, mimeType, Drive id) to update an existing Drive file
+        :param p_pid:      id of the Drive folder to send the files to
+        :param p_parent:   name of the Drive folder
+        :param p_progress: optional callable(files sent, bytes sent), called from the worker threads
+        :param p_cancel:   optional event to set to stop sending the files that have not been started yet
+        :param p_journal:  optional driveJournal.UploadJournal to record the state of each file in
+        :return list of the Google ids of the sent files, in the same order as p_files, with "" for any cancelled files
+        """
+        self.lgr.log(self.lev, f"Sending {len(p_files)} files to Drive://{p_parent}/ with {self.workers} workers.")
+        self._begin(p_progress, p_cancel, p_journal)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = "drive-upload") as pool:
+            ids = list( pool.map(lambda pf: self._send(pf[0], pf[1], p_pid, pf[2] if len(pf) > 2 else ""), p_files) )
+        self._log_rate([pf[0] for pf, fid in zip(p_files, ids) if fid], start)
+        return ids
+
+    def _begin(self, p_progress, p_cancel:threading.Event, p_journal = None):
+        # the uploads in the worker threads are nested in the span of the caller
+        self._trace_parent = TRACER.current()
+        self._journal = p_journal
+        self._progress = p_progress
+        self._cancel = p_cancel
+        self._progress_lock = threading.Lock()
+        self._num_sent = 0
+        self._bytes_sent = 0
+
+    def _log_rate(self, p_sent:list, p_start:float):
+        elapsed = max(time.perf_counter() - p_start, 1e-6)
+        megabytes = sum(osp.getsize(path) for path in p_sent) / BYTES_PER_MB
+        self.lgr.log(self.lev, f"Sent {len(p_sent)} files ({megabytes:.2f} MB) in {elapsed:.2f} seconds: "
+                               f"{len(p_sent) / elapsed:.2f} files/s, {megabytes / elapsed:.2f} MB/s")
+        self.lgr.log(self.lev, f"Upload strategies: {UPLOAD_TIMINGS.summary()}")
+
+    def _create_folder(self, p_name:str, p_pid:str) -> str:
+        if self._cancel and self._cancel.is_set():
+            return ""
+        body = {"name":p_name, "mimeType":FOLDER_MIME_TYPE, "parents":[p_pid]}
+        fid = SCHEDULER.execute( self._files().create(body = body, fields = "id") ).get("id")
+        self.lgr.log(self.lev, f"Created folder '{p_name}' >> Google Id = {fid}")
+        return fid
+
+    def _list_folder(self, p_pid:str) -> list:
+        return list( iter_page_items(self._files(), sync_query(p_pid), f"{SYNC_FIELDS}, mimeType") )
+
+    def send_tree(self, p_path:str, p_root_id:str, p_mime_fxn, p_progress = None, p_cancel:threading.Event = None,
+                  p_cache_path:str = "") -> dict:
+        """Mirror a local directory tree on my Drive: create the Drive folders one level at a time, with ALL the folders
+           of a level created concurrently, while the files of the folders already created are being sent.
+        :param p_path:       path to the local folder to send
+        :param p_root_id:    id of the Drive folder to send the contents of p_path to
+        :param p_mime_fxn:   callable(local path) returning the mimeType to send a file with
+        :param p_progress:   optional callable(files sent, bytes sent), called from the worker threads
+        :param p_cancel:     optional event to set to stop creating folders and sending files
+        :param p_cache_path: to SYNC: path of the local md5 cache; existing Drive folders are reused
+                             and ONLY the new or changed files are sent
+        :return local path >> Google id of each file sent
+        """
+        self.lgr.log(self.lev, f"Sending the folder tree '{p_path}' with {self.workers} workers.")
+        self._begin(p_progress, p_cancel)
+        cache = HashCache(p_cache_path) if p_cache_path else None
+        start = time.perf_counter()
+        folder_ids = {p_path: p_root_id}
+        uploads = []
+        level = [p_path]
+        # a separate pool for the folders so that creating the next level does NOT wait behind the uploads
+        with ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = "drive-upload") as upload_pool, \
+             ThreadPoolExecutor(max_workers = self.workers, thread_name_prefix = "drive-folder") as folder_pool:
+            while level:
+                listings = dict( zip(level, folder_pool.map(lambda lf: self._list_folder(folder_ids[lf]), level)) ) if cache else {}
+                next_level = []
+                creates = []
+                for folder in level:
+                    entries = sorted(os.scandir(folder), key = lambda de: de.name)
+                    existing = listings.get(folder, [])
+                    files = [(de.path, p_mime_fxn(de.path)) for de in entries if de.is_file()]
+                    if cache:
+                        new, changed, _ = plan_sync(files, [item for item in existing if item["mimeType"] != FOLDER_MIME_TYPE], cache)
+                        files = new + changed
+                    for send in files:
+                        uploads.append( (send[0], upload_pool.submit(self._send, send[0], send[1], folder_ids[folder],
+                                                                     send[2] if len(send) > 2 else "")) )
+                    drive_folders = {item["name"]:item["id"] for item in existing if item["mimeType"] == FOLDER_MIME_TYPE}
+                    for de in entries:
+                        # do NOT follow a symlink to a folder, which could lead back up the tree
+                        if de.is_dir(follow_symlinks = False):
+                            next_level.append(de.path)
+                            if de.name in drive_folders:
+                                folder_ids[de.path] = drive_folders[de.name]
+                            else:
+                                creates.append( (de.path, folder_pool.submit(self._create_folder, de.name, folder_ids[folder])) )
+                for path, future in creates:
+                    folder_ids[path] = future.result()
+                # do NOT go below a folder that was NOT created, e.g. after a cancel
+                level = [path for path in next_level if folder_ids[path]]
+            sent = {path: future.result() for path, future in uploads}
+        if cache:
+            cache.save()
+        sent = {path: fid for path, fid in sent.items() if fid}
+        self.lgr.log(self.lev, f"Mirrored {len(folder_ids) - 1} folders.")
+        self._log_rate(list(sent.keys()), start)
+        return sent
@@ -0,0 +1,691 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# fakeDrive.py
+#   -- in-process stand-in for the Google Drive v3 service, to measure and test the Drive code WITHOUT my real Drive
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__google_api_python_client_version__ = "2.154.0"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime as dt, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+import httplib2
+from googleapiclient.errors import BatchError, HttpError
+from googleapiclient.http import MediaInMemoryUpload, MediaUploadProgress
+from driveBatch import MAX_BATCH_SIZE
+from drivePaging import MAX_PAGE_SIZE
+from driveSession import SERVICE_POOL
+
+FAKE_ROOT_ID   = "fake-root"
+ROOT_LABEL     = "root"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+DRIVE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+DEFAULT_PAGE_SIZE = 100
+# the operations that are timed
+LIST_OP   = "list"
+GET_OP    = "get"
+CREATE_OP = "create"
+UPDATE_OP = "update"
+DELETE_OP = "delete"
+BATCH_OP  = "batch"
+CHANGES_OP = "changes"
+CHUNK_OP   = "chunk"
+MEDIA_OP   = "media"
+
+def drive_time(p_time:float = None) -> str:
+    """A time in the Drive RFC 3339 format, e.g. '2026-10-17T14:03:27.512Z'."""
+    stamp = dt.fromtimestamp(time.time() if p_time is None else p_time, tz = timezone.utc)
+    return stamp.strftime(DRIVE_TIME_FORMAT)[:-4] + 'Z'
+
+def make_http_error(p_status:int, p_reason:str, p_message:str = "") -> HttpError:
+    """An HttpError with the same form as returned by Drive."""
+    resp = httplib2.Response({"status": p_status})
+    resp.reason = p_reason
+    content = {"error": {"code": p_status, "message": p_message or p_reason,
+                         "errors": [{"reason": p_reason, "message": p_message or p_reason}]}}
+    return HttpError(resp, json.dumps(content).encode("utf-8"), uri = "fake://drive/v3")
+
+
+class FakeCredentials:
+    """Credentials that never expire, for the fake Drive."""
+    valid = True
+    expired = False
+    refresh_token = None
+    token = "fake-token"
+
+
+class QueryParser:
+    """Compile a Drive query string, e.g. "mimeType = 'text/csv' and 'xyz' in parents", into a function of an item."""
+    TOKEN_RE = re.compile(r"\s*(?:(?P<str>'(?:[^'\\]|\\.)*')|(?P<op>!=|<=|>=|=|<|>)|(?P<paren>[()])|(?P<word>[A-Za-z_]+))")
+    WORD_SPLIT = re.compile(r"[^0-9A-Za-z]+")
+
+    def __init__(self, p_query:str, p_root_id:str = FAKE_ROOT_ID):
+        self.root_id = p_root_id
+        self.tokens = self._tokenize(p_query)
+        self.pos = 0
+
+    def _tokenize(self, p_query:str) -> list:
+        tokens = []
+        pos = 0
+        query = p_query.strip()
+        while pos < len(query):
+            match = self.TOKEN_RE.match(query, pos)
+            if not match:
+                raise make_http_error(400, "invalid", f"Invalid query at position {pos}: '{p_query}'")
+            pos = match.end()
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "str":
+                value = re.sub(r"\\(.)", r"\1", value[1:-1])
+            tokens.append((kind, value))
+        return tokens
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise make_http_error(400, "invalid", "Unexpected end of query.")
+        self.pos += 1
+        return token
+
+    def _is_word(self, p_word:str) -> bool:
+        kind, value = self._peek()
+        return kind == "word" and value.lower() == p_word
+
+    def compile(self):
+        if not self.tokens:
+            return lambda item: True
+        predicate = self._or()
+        if self.pos != len(self.tokens):
+            raise make_http_error(400, "invalid", f"Unexpected '{self._peek()[1]}' in query.")
+        return predicate
+
+    def _or(self):
+        terms = [self._and()]
+        while self._is_word("or"):
+            self.pos += 1
+            terms.append(self._and())
+        return terms[0] if len(terms) == 1 else lambda item: any(term(item) for term in terms)
+
+    def _and(self):
+        factors = [self._factor()]
+        while self._is_word("and"):
+            self.pos += 1
+            factors.append(self._factor())
+        return factors[0] if len(factors) == 1 else lambda item: all(factor(item) for factor in factors)
+
+    def _factor(self):
+        if self._is_word("not"):
+            self.pos += 1
+            inner = self._factor()
+            return lambda item: not inner(item)
+        kind, value = self._peek()
+        if kind == "paren" and value == '(':
+            self.pos += 1
+            inner = self._or()
+            if self._next() != ("paren", ')'):
+                raise make_http_error(400, "invalid", "Missing ')' in query.")
+            return inner
+        if kind == "str":
+            # 'xyz' in parents
+            self.pos += 1
+            if not self._is_word("in"):
+                raise make_http_error(400, "invalid", f"Expected 'in' after '{value}'.")
+            self.pos += 1
+            _, field = self._next()
+            pid = self.root_id if value == ROOT_LABEL else value
+            return lambda item: pid in item.get(field, [])
+        return self._comparison()
+
+    def _comparison(self):
+        _, field = self._next()
+        if self._is_word("contains"):
+            self.pos += 1
+            kind, value = self._next()
+            target = value.lower()
+            if field == "name":
+                # Drive matches the START of the name or of any word in the name
+                return lambda item: item["name"].lower().startswith(target) or \
+                                    any(word.startswith(target) for word in self.WORD_SPLIT.split(item["name"].lower()))
+            return lambda item: target in str(item.get(field, "")).lower()
+        kind, op = self._next()
+        if kind != "op":
+            raise make_http_error(400, "invalid", f"Expected an operator after '{field}'.")
+        kind, value = self._next()
+        if kind == "word":
+            value = value.lower() == "true"
+        compare = {"=": lambda a, b: a == b, "!=": lambda a, b: a != b, "<": lambda a, b: a < b,
+                   "<=": lambda a, b: a <= b, ">": lambda a, b: a > b, ">=": lambda a, b: a >= b}[op]
+        default = False if isinstance(value, bool) else ""
+        return lambda item: compare(item.get(field, default), value)
+
+
+class FakeRequest:
+    """A Drive request that is only carried out when execute() is called, like googleapiclient.http.HttpRequest."""
+    def __init__(self, p_drive, p_op:str, p_fxn, p_media = None):
+        self.drive = p_drive
+        self.op = p_op
+        self.fxn = p_fxn
+        self.media = p_media
+        self.headers = {}
+        self.http = FakeUploadHttp(p_drive)
+        self.resumable_uri = None
+        self.resumable_progress = 0
+
+    def execute(self, num_retries:int = 0):
+        return self.drive.call(self.op, self.fxn)
+
+    def next_chunk(self, num_retries:int = 0):
+        """Send the next chunk of a resumable upload: each chunk is a request, and the last one creates the file."""
+        size = self.media.size()
+        if self.resumable_uri is None:
+            self.resumable_uri = self.drive.call(CHUNK_OP, self.drive.new_session)
+            self.resumable_progress = 0
+        uri = self.resumable_uri
+        if self.resumable_progress + self.media.chunksize() < size:
+            offset = self.resumable_progress + self.media.chunksize()
+            self.drive.call(CHUNK_OP, lambda: self.drive.receive(uri, offset))
+            self.resumable_progress = offset
+            return MediaUploadProgress(self.resumable_progress, size), None
+        response = self.drive.call(self.op, lambda: (self.drive.session_progress(uri), self.fxn())[1])
+        self.drive.sessions.pop(uri, None)
+        self.resumable_progress = size
+        return None, response
+
+
+class FakeResponse(dict):
+    """The headers and status of a fake HTTP response, like httplib2.Response."""
+    def __init__(self, p_status:int, p_headers:dict):
+        super().__init__(p_headers)
+        self.status = p_status
+        self.reason = "OK"
+
+
+class FakeUploadHttp:
+    """Answer the EMPTY PUT that asks how many bytes of an interrupted resumable upload Drive has received."""
+    def __init__(self, p_drive):
+        self.drive = p_drive
+
+    def request(self, uri:str, method:str = "PUT", body = None, headers:dict = None, **kwargs):
+        try:
+            received = self.drive.call(CHUNK_OP, lambda: self.drive.session_progress(uri))
+        except HttpError as fhe:
+            return FakeResponse(fhe.resp.status, {}), fhe.content
+        return FakeResponse(308, {"range":f"bytes=0-{received - 1}"} if received else {}), b""
+
+
+class FakeHttp:
+    """Answer the GETs that googleapiclient.http.MediaIoBaseDownload sends for an export: like Drive, ignore the Range
+       and send the WHOLE export with status 200."""
+    def __init__(self, p_drive, p_id:str, p_mime_type:str):
+        self.drive = p_drive
+        self.id = p_id
+        self.mime_type = p_mime_type
+
+    def request(self, uri:str, method:str = "GET", body = None, headers:dict = None, **kwargs):
+        data = self.drive.call(MEDIA_OP, lambda: self.drive.export_content(self.id, self.mime_type))
+        return FakeResponse(200, {"content-length":str(len(data))}), data
+
+
+class FakeBatch:
+    """Send up to 100 fake requests at once, like googleapiclient.http.BatchHttpRequest."""
+    def __init__(self, p_drive, p_callback = None):
+        self.drive = p_drive
+        self.callback = p_callback
+        self.requests = []
+
+    def add(self, p_request:FakeRequest, callback = None, request_id:str = None):
+        if len(self.requests) >= MAX_BATCH_SIZE:
+            raise BatchError(f"Exceeded maximum calls({MAX_BATCH_SIZE}) in a single batch request.")
+        self.requests.append((str(len(self.requests) + 1) if request_id is None else request_id, p_request, callback))
+
+    def execute(self):
+        def run_all():
+            outcomes = []
+            for request_id, request, callback in self.requests:
+                try:
+                    outcomes.append( (request_id, self.drive.call(request.op, request.fxn, p_in_batch = True), None, callback) )
+                except HttpError as bhe:
+                    outcomes.append((request_id, None, bhe, callback))
+            return outcomes
+        for request_id, response, error, callback in self.drive.call(BATCH_OP, run_all):
+            fxn = callback or self.callback
+            if fxn:
+                fxn(request_id, response, error)
+
+
+class FakeFiles:
+    """The 'files' resource of the fake Drive."""
+    def __init__(self, p_drive):
+        self.drive = p_drive
+
+    def list(self, q:str = "", spaces:str = "drive", pageSize:int = DEFAULT_PAGE_SIZE, fields:str = "",
+             pageToken:str = None, orderBy:str = None, **kwargs):
+        return FakeRequest(self.drive, LIST_OP, lambda: self.drive.list_items(q, pageSize, pageToken, orderBy))
+
+    def get(self, fileId:str, fields:str = "", **kwargs):
+        return FakeRequest(self.drive, GET_OP, lambda: self.drive.get_item(fileId))
+
+    def create(self, body:dict = None, media_body = None, fields:str = "", **kwargs):
+        return FakeRequest(self.drive, CREATE_OP, lambda: self.drive.create_item(body or {}, media_body), media_body)
+
+    def get_media(self, fileId:str, **kwargs):
+        request = FakeRequest(self.drive, MEDIA_OP, None)
+        request.fxn = lambda: self.drive.get_content(fileId, request.headers.get("Range", ""))
+        return request
+
+    def export_media(self, fileId:str, mimeType:str, **kwargs):
+        request = FakeRequest(self.drive, MEDIA_OP, lambda: self.drive.export_content(fileId, mimeType))
+        request.uri = f"fake://export/{fileId}?mimeType={mimeType}"
+        request.http = FakeHttp(self.drive, fileId, mimeType)
+        return request
+
+    def update(self, fileId:str, body:dict = None, media_body = None, fields:str = "", **kwargs):
+        return FakeRequest(self.drive, UPDATE_OP, lambda: self.drive.update_item(fileId, body or {}, media_body), media_body)
+
+    def delete(self, fileId:str, **kwargs):
+        return FakeRequest(self.drive, DELETE_OP, lambda: self.drive.delete_item(fileId))
+
+
+class FakeChanges:
+    """The 'changes' resource of the fake Drive."""
+    def __init__(self, p_drive):
+        self.drive = p_drive
+
+    def getStartPageToken(self, **kwargs):
+        return FakeRequest(self.drive, CHANGES_OP, lambda: {"startPageToken": str(len(self.drive.change_log))})
+
+    def list(self, pageToken:str, pageSize:int = DEFAULT_PAGE_SIZE, **kwargs):
+        return FakeRequest(self.drive, CHANGES_OP, lambda: self.drive.list_changes(pageToken, pageSize))
+
+
+class FakeService:
+    """Has the same methods as the service returned by googleapiclient.discovery.build('drive', 'v3')."""
+    def __init__(self, p_drive):
+        self.drive = p_drive
+
+    def files(self):
+        return FakeFiles(self.drive)
+
+    def changes(self):
+        return FakeChanges(self.drive)
+
+    def new_batch_http_request(self, callback = None):
+        return FakeBatch(self.drive, callback)
+
+
+class FakeDrive:
+    """The items of a fake Drive, shared by all the fake services and threads, with knobs for latency, errors and quota."""
+    def __init__(self, p_latency:float = 0.0, p_jitter:float = 0.0, p_error_rate:float = 0.0, p_quota:int = 0,
+                 p_seed:int = None):
+        """
+        :param p_latency:    seconds added to each request; a batch request costs the same as ONE request
+        :param p_jitter:     max random seconds added to the latency
+        :param p_error_rate: fraction of requests that fail with a 503 backendError
+        :param p_quota:      max requests per second, counting each request in a batch; 0 for NO limit.
+                             Requests over the quota fail with a 403 userRateLimitExceeded
+        :param p_seed:       seed for the random errors and jitter
+        """
+        self.latency = p_latency
+        self.jitter = p_jitter
+        self.error_rate = p_error_rate
+        self.quota = p_quota
+        self._random = random.Random(p_seed)
+        self._lock = threading.RLock()
+        self._window = deque()
+        self._next_id = 0
+        self._cursors = {}
+        self.items = {FAKE_ROOT_ID: {"id":FAKE_ROOT_ID, "name":"My Drive", "mimeType":FOLDER_MIME_TYPE,
+                                     "modifiedTime":drive_time()}}
+        self.contents = {}
+        self.change_log = []
+        # resumable upload session URI >> bytes received
+        self.sessions = {}
+        # seconds taken by each request, by operation
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def service(self, p_creds = None) -> FakeService:
+        return FakeService(self)
+
+    def install(self):
+        """Make ALL the Drive access classes use this fake Drive in place of my real Drive."""
+        SERVICE_POOL.install(self.service, FakeCredentials())
+
+    @staticmethod
+    def uninstall():
+        SERVICE_POOL.uninstall()
+
+    def reset_stats(self):
+        with self._lock:
+            self.latencies.clear()
+            self.errors.clear()
+
+    def _check_quota(self):
+        if not self.quota:
+            return
+        now = time.monotonic()
+        with self._lock:
+            while self._window and now - self._window[0] >= 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.quota:
+                raise make_http_error(403, "userRateLimitExceeded", "User Rate Limit Exceeded.")
+            self._window.append(now)
+
+    def call(self, p_op:str, p_fxn, p_in_batch:bool = False):
+        """Carry out a request: apply the knobs, then run it and record how long it took."""
+        start = time.perf_counter()
+        try:
+            if p_op != BATCH_OP:
+                self._check_quota()
+                if self.error_rate and self._random.random() < self.error_rate:
+                    raise make_http_error(503, "backendError", "Backend Error")
+            if not p_in_batch and (self.latency or self.jitter):
+                time.sleep(self.latency + self._random.uniform(0, self.jitter))
+            with self._lock:
+                return p_fxn()
+        except HttpError as che:
+            with self._lock:
+                self.errors[che.resp.status] += 1
+            raise che
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[p_op].append(elapsed)
+
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return f"fake{self._next_id:09d}"
+
+    def _record_change(self, p_id:str, p_removed:bool):
+        self.change_log.append((p_id, p_removed))
+
+    def _resolve(self, p_id:str) -> str:
+        return FAKE_ROOT_ID if p_id == ROOT_LABEL else p_id
+
+    def _not_found(self, p_id:str) -> HttpError:
+        return make_http_error(404, "notFound", f"File not found: {p_id}.")
+
+    def populate(self, p_num:int, p_parent:str = FAKE_ROOT_ID, p_prefix:str = "file", p_extension:str = "txt",
+                 p_mimetype:str = "text/plain", p_size:int = 1024, p_start:float = None) -> list:
+        """Add synthetic files directly, WITHOUT any requests, one minute apart in modifiedTime.
+        :return ids of the new files
+        """
+        start = time.time() - p_num * 60 if p_start is None else p_start
+        ids = []
+        # the content of a synthetic file is p_size zero bytes
+        md5 = hashlib.md5(bytes(p_size)).hexdigest()
+        with self._lock:
+            for num in range(p_num):
+                fid = self._new_id()
+                self.items[fid] = {"id":fid, "name":f"{p_prefix}{num:07d}.{p_extension}", "mimeType":p_mimetype,
+                                   "parents":[self._resolve(p_parent)], "modifiedTime":drive_time(start + num * 60),
+                                   "size":str(p_size), "md5Checksum":md5, "trashed":False}
+                self._record_change(fid, False)
+                ids.append(fid)
+        return ids
+
+    def new_session(self) -> str:
+        """Start a resumable upload session."""
+        uri = f"fake://upload/{self._new_id()}"
+        self.sessions[uri] = 0
+        return uri
+
+    def session_progress(self, p_uri:str) -> int:
+        if p_uri not in self.sessions:
+            raise make_http_error(404, "notFound", f"Upload session NOT found: {p_uri}.")
+        return self.sessions[p_uri]
+
+    def receive(self, p_uri:str, p_offset:int):
+        self.session_progress(p_uri)
+        self.sessions[p_uri] = p_offset
+
+    def list_items(self, p_query:str, p_page_size:int, p_page_token:str, p_order_by:str = None) -> dict:
+        page_size = max(1, min(p_page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+        if p_page_token:
+            if p_page_token not in self._cursors:
+                raise make_http_error(400, "invalid", f"Invalid page token: {p_page_token}.")
+            # the matching ids are found ONCE, on the first page, like a Drive cursor
+            ids, offset = self._cursors.pop(p_page_token)
+        else:
+            predicate = QueryParser(p_query or "").compile()
+            ids = [fid for fid, item in self.items.items() if fid != FAKE_ROOT_ID and predicate(item)]
+            # ONE sort key, e.g. 'modifiedTime' OR 'modifiedTime desc'
+            if p_order_by:
+                key, *desc = p_order_by.split()
+                ids.sort(key = lambda fid: self.items[fid].get(key, ""), reverse = bool(desc))
+            offset = 0
+        page = [dict(self.items[fid]) for fid in ids[offset:offset + page_size] if fid in self.items]
+        results = {"files": page}
+        if offset + page_size < len(ids):
+            token = f"page-{self._new_id()}"
+            self._cursors[token] = (ids, offset + page_size)
+            results["nextPageToken"] = token
+        return results
+
+    def get_item(self, p_id:str) -> dict:
+        fid = self._resolve(p_id)
+        if fid not in self.items:
+            raise self._not_found(p_id)
+        return dict(self.items[fid])
+
+    def get_content(self, p_id:str, p_range:str = "") -> bytes:
+        """The content of a file OR of the byte range in the form 'bytes=start-end'."""
+        if p_id not in self.items:
+            raise self._not_found(p_id)
+        data = self.contents.get(p_id)
+        if data is None:
+            data = bytes(int(self.items[p_id].get("size", 0)))
+        if p_range:
+            start, end = p_range.split('=')[1].split('-')
+            return data[int(start):int(end) + 1]
+        return data
+
+    def export_content(self, p_id:str, p_mime_type:str) -> bytes:
+        """The content of a Google file converted to p_mime_type: one line per export, to keep the fake simple."""
+        if p_id not in self.items:
+            raise self._not_found(p_id)
+        item = self.items[p_id]
+        data = self.contents.get(p_id)
+        if data is None:
+            data = f"{item['name']},{item.get('modifiedTime', '')},{p_mime_type}\n".encode() * int(item.get("size", 1) or 1)
+        return data
+
+    def _read_media(self, p_item:dict, p_media):
+        size = p_media.size()
+        data = p_media.getbytes(0, size) if size else b""
+        self.contents[p_item["id"]] = data
+        p_item["size"] = str(len(data))
+        p_item["md5Checksum"] = hashlib.md5(data).hexdigest()
+        if "mimeType" not in p_item:
+            p_item["mimeType"] = p_media.mimetype()
+
+    def create_item(self, p_body:dict, p_media) -> dict:
+        fid = self._new_id()
+        item = {"id":fid, "name":p_body.get("name", "Untitled"), "parents":[self._resolve(pid) for pid in p_body.get("parents", [FAKE_ROOT_ID])],
+                "modifiedTime":drive_time(), "trashed":False}
+        if "mimeType" in p_body:
+            item["mimeType"] = p_body["mimeType"]
+        if p_media is not None:
+            self._read_media(item, p_media)
+        item.setdefault("mimeType", "application/octet-stream")
+        self.items[fid] = item
+        self._record_change(fid, False)
+        return {"id":fid, "name":item["name"]}
+
+    def update_item(self, p_id:str, p_body:dict, p_media) -> dict:
+        if p_id not in self.items:
+            raise self._not_found(p_id)
+        item = self.items[p_id]
+        item.update({key:value for key, value in p_body.items() if key != "id"})
+        if p_media is not None:
+            self._read_media(item, p_media)
+        item["modifiedTime"] = drive_time()
+        self._record_change(p_id, False)
+        return {"id":p_id, "name":item["name"]}
+
+    def delete_item(self, p_id:str) -> str:
+        if p_id not in self.items or p_id == FAKE_ROOT_ID:
+            raise self._not_found(p_id)
+        del self.items[p_id]
+        self.contents.pop(p_id, None)
+        self._record_change(p_id, True)
+        # Drive returns an empty body for a successful delete
+        return ""
+
+    def list_changes(self, p_page_token:str, p_page_size:int) -> dict:
+        start = int(p_page_token)
+        end = min(start + max(1, p_page_size), len(self.change_log))
+        changes = []
+        for fid, removed in self.change_log[start:end]:
+            change = {"fileId":fid, "removed":removed or fid not in self.items}
+            if not change["removed"]:
+                change["file"] = dict(self.items[fid])
+            changes.append(change)
+        results = {"changes": changes}
+        if end < len(self.change_log):
+            results["nextPageToken"] = str(end)
+        else:
+            results["newStartPageToken"] = str(end)
+        return results
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    """Answer the Drive v3 REST requests of an HTTP client from the fake Drive of the server."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, p_format:str, *args):
+        pass
+
+    def _reply(self, p_status:int, p_body = None, p_headers:dict = None):
+        data = p_body if isinstance(p_body, bytes) else (json.dumps(p_body).encode("utf-8") if p_body is not None else b"")
+        self.send_response(p_status)
+        for key, value in (p_headers or {}).items():
+            self.send_header(key, value)
+        if p_body is not None and not isinstance(p_body, bytes):
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _route(self, p_method:str):
+        drive = self.server.drive
+        url = urlparse(self.path)
+        params = {key:values[0] for key, values in parse_qs(url.query).items()}
+        parts = url.path.rstrip('/').split('/')
+        try:
+            if self.headers.get("Authorization", "") != f"Bearer {FakeCredentials.token}":
+                raise make_http_error(401, "authError", "Invalid Credentials")
+            if url.path.startswith("/upload/"):
+                return self._upload(p_method, params)
+            file_id = parts[-1] if parts[-1] != "files" else ""
+            if p_method == "GET" and not file_id:
+                results = drive.call(LIST_OP, lambda: drive.list_items(params.get("q", ""), int(params.get("pageSize", DEFAULT_PAGE_SIZE)),
+                                                                       params.get("pageToken"), params.get("orderBy")))
+                return self._reply(200, results)
+            if p_method == "GET" and params.get("alt") == "media":
+                return self._reply(200, drive.call(MEDIA_OP, lambda: drive.get_content(file_id, self.headers.get("Range", ""))))
+            if p_method == "GET":
+                return self._reply(200, drive.call(GET_OP, lambda: drive.get_item(file_id)))
+            if p_method == "DELETE":
+                drive.call(DELETE_OP, lambda: drive.delete_item(file_id))
+                return self._reply(204)
+            if p_method == "POST" and not file_id:
+                body = json.loads(self._body() or b"{}")
+                return self._reply(200, drive.call(CREATE_OP, lambda: drive.create_item(body, None)))
+            raise make_http_error(404, "notFound", f"No route for {p_method} {url.path}")
+        except HttpError as she:
+            self._reply(she.resp.status, she.content, {"Content-Type": "application/json"})
+
+    def _upload(self, p_method:str, p_params:dict):
+        """Multipart uploads, and resumable uploads: one POST to start the session, then a PUT for each chunk."""
+        drive = self.server.drive
+        if p_params.get("uploadType") == "multipart":
+            message = BytesParser(policy = HTTP).parsebytes(b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + self._body())
+            meta_part, media_part = list(message.iter_parts())
+            body = json.loads(meta_part.get_content())
+            media = MediaInMemoryUpload(media_part.get_payload(decode = True), mimetype = media_part.get_content_type())
+            return self._reply(200, drive.call(CREATE_OP, lambda: drive.create_item(body, media)))
+        if p_method == "POST":
+            body = json.loads(self._body() or b"{}")
+            uri = drive.call(CHUNK_OP, drive.new_session)
+            self.server.uploads[uri] = (body, self.headers.get("X-Upload-Content-Type", "application/octet-stream"), bytearray())
+            host, port = self.server.server_address[:2]
+            return self._reply(200, None, {"Location": f"http://{host}:{port}/upload/drive/v3/files?uploadType=resumable&upload_id={quote(uri, safe='')}"})
+        uri = p_params.get("upload_id", "")
+        if uri not in self.server.uploads:
+            raise make_http_error(404, "notFound", f"Upload session NOT found: {uri}")
+        body, mime_type, data = self.server.uploads[uri]
+        chunk = self._body()
+        # 'bytes start-end/total'
+        span, total = self.headers["Content-Range"].split()[1].split('/')
+        start = int(span.split('-')[0]) if span != '*' else len(data)
+        del data[start:]
+        data.extend(chunk)
+        drive.call(CHUNK_OP, lambda: drive.receive(uri, len(data)))
+        if total != '*' and len(data) >= int(total):
+            del self.server.uploads[uri]
+            drive.sessions.pop(uri, None)
+            return self._reply(200, drive.call(CREATE_OP, lambda: drive.create_item(body, MediaInMemoryUpload(bytes(data), mimetype = mime_type))))
+        return self._reply(308, None, {"Range": f"bytes=0-{len(data) - 1}"} if data else {})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+
+class FakeDriveServer:
+    """Serve a fake Drive over HTTP on localhost, to test an HTTP client of the Drive v3 REST API."""
+    def __init__(self, p_drive:FakeDrive, p_port:int = 0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", p_port), FakeDriveHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.drive = p_drive
+        # resumable upload session >> (metadata, mimeType, bytes received)
+        self.httpd.uploads = {}
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in a background thread.
+        :return the base URL of the server
+        """
+        self._thread = threading.Thread(target = self.httpd.serve_forever, name = "fake-drive-server", daemon = True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -11,15 +11,20 @@ __author_email__   = "epistemik@gmail.com"
 __python_version__ = "3.9+"
 __pyQt_version__   = "6.8+"
 __created__ = "2024-10-11"
-__updated__ = "2025-08-03"
+__updated__ = "2026-10-17"
 
 from sys import argv
+import threading
+from contextlib import nullcontext
 from enum import IntEnum, auto
 from PySide6.QtWidgets import (QApplication, QComboBox, QVBoxLayout, QGroupBox, QDialog, QFileDialog, QLabel, QCheckBox,
-                               QPushButton, QFormLayout, QDialogButtonBox, QTextEdit, QInputDialog, QMessageBox, QDateEdit)
-from PySide6.QtCore import Qt, QDate
+                               QPushButton, QFormLayout, QDialogButtonBox, QTextEdit, QInputDialog, QMessageBox, QDateEdit,
+                               QProgressBar, QHBoxLayout)
+from PySide6.QtCore import Qt, QDate, QObject, QRunnable, QThreadPool, Signal
 from googleapiclient.errors import HttpError
 from uiFunctions import *
+from driveProfile import RunProfiler
+from driveLogging import start_queue_logging
 
 BLANK_LABEL:str        = " "
 FROM_FOLDER_LABEL:str  = "from Drive folder:"
@@ -34,12 +39,20 @@ DEFAULT_DATE   = "2027-11-13"
 DEFAULT_QDATE  = QDate(2027,11,13)
 MIN_QDATE      = QDate(1970,1,1)
 MAX_QDATE      = QDate(2099,12,31)
+SEND_WORKERS   = 4
+# Drive functions that can run at the same time
+MAX_JOBS       = 4
+# ONLY one profiler can be active in the process
+PROFILE_LOCK   = threading.Lock()
 
 DRIVE_FUNCTIONS = ("Send local folder", "Send local file", "Get item metadata", "List Drive items")
 
 def ui_hide(widgets:list):
     for item in widgets:
         item.hide()
+def ui_show(widgets:list):
+    for item in widgets:
+        item.show()
 # can't hide both the widget and the label or that row disappears
 def ui_blank(labels:list):
     for lbl in labels:
@@ -71,6 +84,46 @@ def deletion_confirm_box():
     confirm_box.setDefaultButton(cancel_button)
     return confirm_box, proceed_button, report_button, cancel_button
 
+class JobSignals(QObject):
+    """Signals from a DriveJob worker thread to the UI thread."""
+    progress = Signal(str, int, int)
+    page     = Signal(list)
+    result   = Signal(list, bool, int)
+    error    = Signal(str)
+    finished = Signal(object)
+
+class DriveJob(QRunnable):
+    """Run a UiDriveAccess function in a Drive session on a QThreadPool worker thread, optionally profiled."""
+    def __init__(self, p_title:str, p_uida:UiDriveAccess, p_fxn, p_profile:bool = False):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.title = p_title
+        self.uida = p_uida
+        self.fxn = p_fxn
+        self.profile = p_profile
+        self.signals = JobSignals()
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            self.uida.monitor(self.signals.progress.emit, self.cancel_event, self.signals.page.emit)
+            self.uida.begin_session()
+            # profile in THIS worker thread, as cProfile ONLY sees the thread that enabled it,
+            # and ONE job at a time, as ONLY one profiler can be active
+            profiler = RunProfiler(DEFAULT_LOG_FOLDER, "Pyside6-DriveUI", self.uida.lgr) if self.profile else nullcontext()
+            with PROFILE_LOCK if self.profile else nullcontext(), profiler:
+                reply = self.fxn()
+            self.signals.result.emit(reply if reply else [], self.uida.save, self.uida.num_shown)
+        except Exception as jex:
+            self.uida.lgr.exception(jex)
+            self.signals.error.emit(repr(jex))
+        finally:
+            self.uida.end_session()
+            self.signals.finished.emit(self)
+
 # noinspection PyAttributeOutsideInit
 class DriveFunctionsUI(QDialog):
     """UI for choosing and running my Google Drive functions."""
@@ -99,6 +152,23 @@ class DriveFunctionsUI(QDialog):
         response_label = QLabel("Responses:")
         response_label.setStyleSheet("QLabel {font-weight: bold; color: purple}")
 
+        # the Drive functions run on worker threads so the UI stays responsive, and the next one can start while the results
+        # of the last one are still arriving: each run has its own UiDriveAccess, and the shared local files are locked
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(MAX_JOBS)
+        self.jobs = []
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setFormat("Idle")
+        self.progress_bar.setValue(0)
+        self.pb_cancel = QPushButton("Cancel")
+        self.pb_cancel.setStyleSheet("QPushButton {font-weight: bold; color: red}")
+        self.pb_cancel.setEnabled(False)
+        self.pb_cancel.clicked.connect(self.cancel_jobs)
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.pb_cancel)
+
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
@@ -107,6 +177,7 @@ class DriveFunctionsUI(QDialog):
         qvb_layout.addWidget(grpbox)
         qvb_layout.addWidget(response_label)
         qvb_layout.addWidget(self.response_box)
+        qvb_layout.addLayout(progress_layout)
         qvb_layout.addWidget(button_box, alignment = Qt.AlignmentFlag.AlignAbsolute)
         self.setLayout(qvb_layout)
 
@@ -140,7 +211,9 @@ class DriveFunctionsUI(QDialog):
         self.from_folder_keys = list(FOLDER_IDS.keys())
         self.to_folder_keys = self.from_folder_keys[1:]
         self.combox_drive_folder = QComboBox()
-        self.combox_drive_folder.currentIndexChanged.connect(self.drive_change)
+        # can also type the path of any Drive folder, e.g. 'Finance/2025/Q3'
+        self.combox_drive_folder.setEditable(True)
+        self.combox_drive_folder.currentTextChanged.connect(self.drive_change)
         self.lbl_drive_folder = QLabel()
         gblayout.addRow(self.lbl_drive_folder, self.combox_drive_folder)
 
@@ -184,6 +257,18 @@ class DriveFunctionsUI(QDialog):
         self.chbx_delete.setStyleSheet("QCheckBox {font-weight: bold; color: red}")
         gblayout.addRow(self.chbx_delete)
 
+        # bypass the local index option
+        self.chbx_fresh = QCheckBox("Fresh listing (bypass the local index)?")
+        gblayout.addRow(self.chbx_fresh)
+
+        # only send the new or changed files option
+        self.chbx_sync = QCheckBox("Sync (ONLY send new or changed files)?")
+        gblayout.addRow(self.chbx_sync)
+
+        # send the subfolders too option
+        self.chbx_recursive = QCheckBox("Include ALL subfolders?")
+        gblayout.addRow(self.chbx_recursive)
+
         # get the metadata of a Drive item
         self.meta_keys = list(FILE_IDS.keys())
         self.meta_end = len(self.meta_keys) - 1
@@ -197,6 +282,14 @@ class DriveFunctionsUI(QDialog):
         self.chbx_save = QCheckBox("Save function response to JSON file?")
         gblayout.addRow(self.chbx_save)
 
+        # summary-only logging option
+        self.chbx_summary = QCheckBox("Log ONLY the counts (NO line for each item)?")
+        gblayout.addRow(self.chbx_summary)
+
+        # profile option
+        self.chbx_profile = QCheckBox("Profile the function (cProfile and tracemalloc reports to the log folder)?")
+        gblayout.addRow(self.chbx_profile)
+
         # logging level to pass to the selected function
         self.fxn_log_level = DEFAULT_LOG_LEVEL
         self.pb_logging = QPushButton("Change the logging level?")
@@ -229,8 +322,13 @@ class DriveFunctionsUI(QDialog):
             self.combox_drive_folder.clear()
             self.combox_drive_folder.addItems(self.to_folder_keys)
             self.lbl_drive_folder.setText(TO_FOLDER_LABEL)
+            if sf == self.fxn_keys[Fxns.SEND_FOLDER]:
+                ui_show([self.chbx_sync, self.chbx_recursive])
+            else:
+                ui_hide([self.chbx_sync, self.chbx_recursive])
             # OFF
-            ui_hide([self.combox_meta_file, self.combox_mime_type, self.pb_numitems, self.pb_search, self.de_date, self.chbx_delete])
+            ui_hide([self.combox_meta_file, self.combox_mime_type, self.pb_numitems, self.pb_search, self.de_date, self.chbx_delete,
+                     self.chbx_fresh])
             ui_blank([self.lbl_meta, self.lbl_mime, self.lbl_numitems, self.lbl_search, self.lbl_date])
 
         elif sf == self.fxn_keys[Fxns.GET_METADATA]:
@@ -240,7 +338,8 @@ class DriveFunctionsUI(QDialog):
             self.lbl_meta.setText("Metadata file:")
             # OFF
             ui_hide([self.combox_drive_folder, self.pb_fsend, self.combox_mime_type, self.pb_numitems,
-                     self.pb_search, self.de_date, self.chbx_delete])
+                     self.pb_search, self.de_date, self.chbx_delete, self.chbx_fresh, self.chbx_sync,
+                     self.chbx_recursive])
             ui_blank([self.lbl_drive_folder, self.lbl_mime, self.lbl_date, self.lbl_numitems, self.lbl_search, self.lbl_fsend])
 
         elif sf == self.fxn_keys[Fxns.LIST_ITEMS]: # option: DELETE the items found
@@ -261,8 +360,9 @@ class DriveFunctionsUI(QDialog):
             self.de_date.show()
             self.lbl_date.setText("Items older than:")
             self.chbx_delete.show()
+            self.chbx_fresh.show()
             # OFF
-            ui_hide([self.combox_meta_file, self.pb_fsend])
+            ui_hide([self.combox_meta_file, self.pb_fsend, self.chbx_sync, self.chbx_recursive])
             ui_blank([self.lbl_meta, self.lbl_fsend])
         else:
             raise Exception(f"?? INVALID function choice '{sf}' ??!!")
@@ -282,7 +382,8 @@ class DriveFunctionsUI(QDialog):
 
     def drive_change(self):
         self.drive_folder = self.combox_drive_folder.currentText()
-        self.lgr.info(f"Selected Drive folder changed to '{self.drive_folder}'")
+        # called for EACH key typed in the editable box
+        self.lgr.debug(f"Selected Drive folder changed to '{self.drive_folder}'")
 
     def meta_change(self):
         self.meta_filename = self.combox_meta_file.currentText()
@@ -331,78 +432,131 @@ class DriveFunctionsUI(QDialog):
             self.pb_logging.setText(f"Current logging level = {lnum}")
 
     def run_function(self):
-        """Prepare the parameters and call the selected function of uiFunctions.UiDriveAccess."""
+        """Prepare the parameters and run the selected function of uiFunctions.UiDriveAccess on a worker thread."""
         sf = self.selected_function
         self.lgr.info(f">> Run function '{sf}' <<")
         saving = self.chbx_save.isChecked()
         deleting = self.chbx_delete.isChecked()
-        self.lgr.info(f"saving = {saving}; deleting = {deleting}")
-        uida = None
-        try:
-            uida = UiDriveAccess(saving, deleting, log_control, self.fxn_log_level)
-            uida.begin_session()
-            self.lgr.debug(repr(uida))
-            parent_id = FOLDER_IDS[self.drive_folder]
+        fresh = self.chbx_fresh.isChecked()
+        profiling = self.chbx_profile.isChecked()
+        summary = self.chbx_summary.isChecked()
+        self.lgr.info(f"saving = {saving}; deleting = {deleting}; fresh = {fresh}; profiling = {profiling}; summary = {summary}")
+        uida = UiDriveAccess(saving, deleting, log_control, self.fxn_log_level, fresh, summary)
+        self.lgr.debug(repr(uida))
+        # capture the current selections, which may be changed while the function is running
+        drive_folder = self.drive_folder
+        local_path = self.forf_selected
+
+        if sf == self.fxn_keys[Fxns.SEND_FOLDER]:
+            if local_path is None:
+                warning_box = create_warning_box(">> MUST select a Drive folder!")
+                warning_box.exec()
+                return
+            syncing = self.chbx_sync.isChecked()
+            recursive = self.chbx_recursive.isChecked()
+            self.lgr.info(f"Local folder = {local_path}; parent Drive folder = {drive_folder}; sync = {syncing}; "
+                          f"recursive = {recursive}")
+            job_fxn = lambda: uida.send_folder(local_path, uida.folder_id(drive_folder), drive_folder, SEND_WORKERS, syncing,
+                                               recursive)
+
+        elif sf == self.fxn_keys[Fxns.SEND_FILE]:
+            if local_path is None:
+                warning_box = create_warning_box(">> MUST select a Drive file!")
+                warning_box.exec()
+                return
+            self.lgr.info(f"Local file = {local_path}; parent Drive folder = {drive_folder}")
+            job_fxn = lambda: uida.send_file(local_path, uida.folder_id(drive_folder), drive_folder)
 
-            if sf == self.fxn_keys[Fxns.SEND_FOLDER]:
-                if self.forf_selected is None:
-                    warning_box = create_warning_box(">> MUST select a Drive folder!")
+        elif sf == self.fxn_keys[Fxns.GET_METADATA]:
+            meta_id = FILE_IDS[self.meta_filename]
+            if self.meta_filename == self.meta_keys[self.meta_end]: # Other
+                if not self.search_selected:
+                    warning_box = create_warning_box(">> MUST specify a Drive Id!")
                     warning_box.exec()
                     return
-                self.lgr.info(f"Local folder = {self.forf_selected}; parent Drive folder = {self.drive_folder}")
-                reply = UiDriveAccess.send_folder(uida, self.forf_selected, parent_id, self.drive_folder)
-
-            elif sf == self.fxn_keys[Fxns.SEND_FILE]:
-                if self.forf_selected is None:
-                    warning_box = create_warning_box(">> MUST select a Drive file!")
-                    warning_box.exec()
+                meta_id = self.search_selected
+            self.lgr.info(f"meta file = {self.meta_filename}; meta file Id = {meta_id}")
+            job_fxn = lambda: uida.get_item_metadata(meta_id)
+
+        elif sf == self.fxn_keys[Fxns.LIST_ITEMS]:
+            self.lgr.info(f"Drive folder = {drive_folder}; mimeType = {self.mime_type}; search name = {self.search_selected}; "
+                          f"date = {self.dt_selected}; p_numitems = {self.num_items}")
+            if deleting:
+                confirm_box, proceed_button, report_button, cancel_button = deletion_confirm_box()
+                confirm_box.exec()
+                if confirm_box.clickedButton() == proceed_button:
+                    self.lgr.info("pressed Proceed")
+                elif confirm_box.clickedButton() == report_button:
+                    uida.delete = False
+                    self.lgr.info("pressed Report")
+                elif confirm_box.clickedButton() == cancel_button:
+                    self.lgr.info("pressed Cancel")
                     return
-                self.lgr.info(f"Local file = {self.forf_selected}; parent Drive folder = {self.drive_folder}")
-                reply = UiDriveAccess.send_file(uida, self.forf_selected, parent_id, self.drive_folder)
-
-            elif sf == self.fxn_keys[Fxns.GET_METADATA]:
-                meta_id = FILE_IDS[self.meta_filename]
-                if self.meta_filename == self.meta_keys[self.meta_end]: # Other
-                    if not self.search_selected:
-                        warning_box = create_warning_box(">> MUST specify a Drive Id!")
-                        warning_box.exec()
-                        return
-                    meta_id = self.search_selected
-                self.lgr.info(f"meta file = {self.meta_filename}; meta file Id = {meta_id}")
-                reply = UiDriveAccess.get_item_metadata(uida, meta_id)
-
-            elif sf == self.fxn_keys[Fxns.LIST_ITEMS]:
-                self.lgr.info(f"Drive folder = {self.drive_folder}; mimeType = {self.mime_type}; search name = {self.search_selected}; "
-                              f"date = {self.dt_selected}; p_numitems = {self.num_items}")
-                if deleting:
-                    confirm_box, proceed_button, report_button, cancel_button = deletion_confirm_box()
-                    confirm_box.exec()
-                    if confirm_box.clickedButton() == proceed_button:
-                        self.lgr.info("pressed Proceed")
-                    elif confirm_box.clickedButton() == report_button:
-                        uida.delete = False
-                        self.lgr.info("pressed Report")
-                    elif confirm_box.clickedButton() == cancel_button:
-                        self.lgr.info("pressed Cancel")
-                        return
-                reply = UiDriveAccess.list_item_info(uida, self.drive_folder, self.mime_type, self.dt_selected,
-                                                     self.search_selected, self.num_items)
+            mime_type, fdate, search, num_items = self.mime_type, self.dt_selected, self.search_selected, self.num_items
+            job_fxn = lambda: uida.list_item_info(drive_folder, mime_type, fdate, search, num_items)
+        else:
+            raise Exception("?? INVALID Function Choice??!!")
+
+        job = DriveJob(sf, uida, job_fxn, profiling)
+        job.signals.progress.connect(self.show_progress)
+        job.signals.page.connect(self.show_page)
+        job.signals.result.connect(self.show_reply)
+        job.signals.error.connect(self.show_error)
+        job.signals.finished.connect(self.job_finished)
+        self.jobs.append(job)
+        self.pb_cancel.setEnabled(True)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setFormat(f"Running '{sf}'...")
+        self.thread_pool.start(job)
+
+    def show_progress(self, p_msg:str, p_done:int, p_total:int):
+        # a total of zero shows a 'busy' bar
+        self.progress_bar.setRange(0, p_total)
+        self.progress_bar.setValue(p_done)
+        self.progress_bar.setFormat(p_msg)
+
+    def show_page(self, p_items:list):
+        self.response_box.append(json.dumps(p_items, indent = 4))
+
+    def show_reply(self, p_reply:list, p_save:bool, p_shown:int):
+        """Show the reply of a function, except the items already shown a page at a time, and save ALL of it if requested."""
+        if p_reply:
+            for r in p_reply:
+                self.lgr.debug(r)
+            response = {"response":p_reply}
+            if p_save:
+                self.lgr.info(f"Saved results to '{save_to_json(basename, response)}'.")
+            if p_shown:
+                if len(p_reply) > p_shown:
+                    self.response_box.append(json.dumps(p_reply[p_shown:], indent = 4))
             else:
-                raise Exception("?? INVALID Function Choice??!!")
-            if reply:
-                for r in reply:
-                    self.lgr.debug(r)
-                response = {"response":reply}
-                if uida.save:
-                    self.lgr.info(f"Saved results to '{save_to_json(basename, response)}'.")
                 self.response_box.append(json.dumps(response, indent = 4))
-        except Exception as rfe:
-            self.response_box.append(f"\nEXCEPTION:\n{repr(rfe)}\n")
-            raise rfe
-        finally:
-            if uida:
-                uida.end_session()
-            self.lgr.info("END run_function()")
+
+    def show_error(self, p_error:str):
+        self.response_box.append(f"\nEXCEPTION:\n{p_error}\n")
+
+    def job_finished(self, p_job:DriveJob):
+        if p_job in self.jobs:
+            self.jobs.remove(p_job)
+        self.lgr.info(f"END '{p_job.title}'")
+        if not self.jobs:
+            self.pb_cancel.setEnabled(False)
+            if self.progress_bar.maximum() == 0:
+                self.progress_bar.setRange(0, 1)
+                self.progress_bar.setValue(1)
+            self.progress_bar.setFormat("Done")
+
+    def cancel_jobs(self):
+        """Ask ALL the running functions to stop at the next page, file or delete batch."""
+        self.lgr.warning(f"Cancel {len(self.jobs)} running function(s).")
+        for job in self.jobs:
+            job.cancel()
+
+    def reject(self):
+        # let any running functions finish their current request before closing
+        self.cancel_jobs()
+        self.thread_pool.waitForDone()
+        super().reject()
 # END class DriveFunctionsUI
 
 
@@ -410,6 +564,8 @@ if __name__ == "__main__":
     basename = get_base_filename(argv[0])
     log_level = argv[1] if len(argv) > 1 and argv[1].isnumeric() else DEFAULT_LOG_LEVEL
     log_control = MhsLogger("Pyside6-DriveUI", con_level = int(log_level))
+    # the console and log file are written by a background thread, NOT the UI OR the Drive job threads
+    start_queue_logging( log_control.get_logger() )
     log_control.logl(int(log_level), f"Start {basename} with console logging level = '{log_level}'.")
     dialog = None
     app = None
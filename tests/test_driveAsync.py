@@ -0,0 +1,81 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveAsync.py
+#   -- run the asyncio Drive client against a fake Drive served over HTTP
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import asyncio
+import os
+import pytest
+from googleapiclient.errors import HttpError
+
+pytest.importorskip("aiohttp")
+from driveAsync import AsyncDriveAccess
+from fakeDrive import FAKE_ROOT_ID, FakeCredentials, FakeDrive, FakeDriveServer
+
+THRESHOLD  = 64 * 1024
+CHUNK_SIZE = 256 * 1024
+
+@pytest.fixture
+def served():
+    fake = FakeDrive(p_seed = 3)
+    server = FakeDriveServer(fake)
+    url = server.start()
+    yield fake, url
+    server.stop()
+
+def run_client(p_url:str, p_fxn):
+    """Run p_fxn(client) in a NEW event loop with a client of the fake Drive at p_url."""
+    async def main():
+        async with AsyncDriveAccess(FakeCredentials(), 20, p_base_url = p_url, p_threshold = THRESHOLD,
+                                    p_chunk_size = CHUNK_SIZE) as client:
+            return await p_fxn(client)
+    return asyncio.run(main())
+
+def test_find_get_and_delete(served):
+    fake, url = served
+    ids = fake.populate(1200, FAKE_ROOT_ID, p_extension = "gcm")
+
+    async def work(client):
+        found = await client.find_items(p_pid = FAKE_ROOT_ID)
+        got = await client.get_many(ids[:100], "id, name")
+        deleted = await client.delete_many([{"id":fid, "name":fid} for fid in ids[:300]])
+        return found, got, deleted
+
+    found, got, deleted = run_client(url, work)
+    # more than ONE page of results
+    assert {item["id"] for item in found} == set(ids)
+    assert [item["id"] for _, item, error in got if error is None] == ids[:100]
+    assert all(error is None for _, _, error in deleted)
+    assert not set(ids[:300]) & set(fake.items)
+    assert len(set(ids) & set(fake.items)) == 900
+
+def test_send_folder_multipart_and_resumable(served, tmp_path):
+    fake, url = served
+    small = tmp_path / "small.txt"
+    small.write_bytes(os.urandom(1000))
+    # several chunks, and a last chunk that is NOT full
+    large = tmp_path / "large.bin"
+    large.write_bytes(os.urandom(3 * CHUNK_SIZE + 17))
+
+    sent = run_client(url, lambda client: client.send_folder(str(tmp_path), FAKE_ROOT_ID))
+    assert all(error is None for _, _, error in sent)
+    ids = {os.path.basename(path):fid for path, fid, _ in sent}
+    assert set(ids) == {"small.txt", "large.bin"}
+    for name, path in (("small.txt", small), ("large.bin", large)):
+        assert fake.items[ids[name]]["name"] == name
+        assert fake.contents[ids[name]] == path.read_bytes()
+
+def test_missing_file_raises_http_error(served):
+    _, url = served
+    with pytest.raises(HttpError) as info:
+        run_client(url, lambda client: client.get_metadata("NO-such-id"))
+    assert info.value.resp.status == 404
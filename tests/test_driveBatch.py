@@ -0,0 +1,72 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveBatch.py
+#   -- send batches of deletes to a fake Drive that fails some of the sub-requests or whole batches
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import pytest
+import driveBatch
+from driveBatch import batch_delete
+from fakeDrive import BATCH_OP, DELETE_OP, FAKE_ROOT_ID, FakeDrive, make_http_error
+
+@pytest.fixture(autouse = True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(driveBatch.time, "sleep", lambda secs: None)
+
+def fail_batches(p_fake, p_numbers:set, p_status:int):
+    """The whole batch request fails for each batch number in p_numbers, counting from 1."""
+    call = p_fake.call
+    sent = []
+
+    def failing(p_op:str, p_fxn, p_in_batch:bool = False):
+        if p_op == BATCH_OP:
+            sent.append(p_op)
+            if len(sent) in p_numbers:
+                raise make_http_error(p_status, "batchFailed")
+        return call(p_op, p_fxn, p_in_batch)
+    p_fake.call = failing
+
+def test_split_into_batches_of_the_max_size():
+    fake = FakeDrive(p_seed = 2)
+    items = [{"id":fid} for fid in fake.populate(250)]
+    outcomes = batch_delete(fake.service(), items, p_batch_size = 500)
+    assert [item for item, _, _ in outcomes] == items
+    assert all(error is None for _, _, error in outcomes)
+    assert len(fake.latencies[BATCH_OP]) == 3
+    assert len(fake.items) == 1
+
+def test_retry_ONLY_the_failed_sub_requests():
+    fake = FakeDrive(p_error_rate = 0.3, p_seed = 3)
+    items = [{"id":fid} for fid in fake.populate(120)]
+    outcomes = batch_delete(fake.service(), items, p_batch_size = 50, p_retries = 10)
+    assert fake.errors[503] > 0
+    assert all(error is None for _, _, error in outcomes)
+    # each item is deleted ONCE: a retried delete does NOT find its item already gone
+    assert len(fake.latencies[DELETE_OP]) == 120 + fake.errors[503]
+    assert fake.errors[404] == 0
+
+def test_retry_a_whole_batch_after_a_server_error():
+    fake = FakeDrive(p_seed = 4)
+    items = [{"id":fid} for fid in fake.populate(30)]
+    fail_batches(fake, {2}, 503)
+    outcomes = batch_delete(fake.service(), items, p_batch_size = 10)
+    assert len(outcomes) == 30 and all(error is None for _, _, error in outcomes)
+    assert len(fake.items) == 1
+
+def test_keep_the_other_outcomes_when_a_whole_batch_fails():
+    fake = FakeDrive(p_seed = 6)
+    items = [{"id":fid} for fid in fake.populate(30)]
+    fail_batches(fake, {2}, 400)
+    outcomes = batch_delete(fake.service(), items, p_batch_size = 10)
+    assert [item for item, _, _ in outcomes] == items
+    assert [error is None for _, _, error in outcomes] == [True] * 10 + [False] * 10 + [True] * 10
+    assert all(error.resp.status == 400 for _, _, error in outcomes[10:20])
+    assert set(fake.items) - {FAKE_ROOT_ID} == {item["id"] for item in items[10:20]}
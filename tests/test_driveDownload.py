@@ -0,0 +1,53 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveDownload.py
+#   -- fetch files from a fake Drive, the large ones in byte ranges
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import os
+import pytest
+from googleapiclient.http import MediaInMemoryUpload
+from driveDownload import DownloadError, ParallelDownloader
+from fakeDrive import FAKE_ROOT_ID, MEDIA_OP, FakeDrive
+
+RANGE_SIZE = 64 * 1024
+
+@pytest.fixture
+def drive():
+    fake = FakeDrive(p_seed = 15)
+    contents = {"small.bin":os.urandom(1000), "large.bin":os.urandom(5 * RANGE_SIZE + 123), "empty.bin":b""}
+    items = [fake.create_item({"name":name, "parents":[FAKE_ROOT_ID]}, MediaInMemoryUpload(data)) for name, data in contents.items()]
+    return fake, [fake.items[item["id"]] for item in items], contents
+
+def downloader(p_fake) -> ParallelDownloader:
+    return ParallelDownloader(p_fake.service, 4, logging.getLogger(__name__), p_range_threshold = 2 * RANGE_SIZE,
+                              p_range_size = RANGE_SIZE)
+
+def test_fetch_the_large_files_in_ranges(drive, tmp_path):
+    fake, items, contents = drive
+    paths = downloader(fake).download_items(items, str(tmp_path))
+    for path in paths:
+        assert open(path, "rb").read() == contents[os.path.basename(path)]
+    # the small file in ONE request, the large file in 6 ranges, and NO request for the empty file
+    assert len(fake.latencies[MEDIA_OP]) == 1 + 6
+
+def test_remove_a_file_with_the_wrong_md5(drive, tmp_path):
+    fake, items, contents = drive
+    small = dict(items[0], md5Checksum = "0" * 32)
+    with pytest.raises(DownloadError):
+        downloader(fake).download_items([small], str(tmp_path))
+    assert not os.path.exists(tmp_path / "small.bin")
+
+def test_skip_the_google_files(drive, tmp_path):
+    fake, items, contents = drive
+    sheet = {"id":"sheet", "name":"budget", "mimeType":"application/vnd.google-apps.spreadsheet"}
+    assert downloader(fake).download_items([sheet, items[0]], str(tmp_path)) == [str(tmp_path / "small.bin")]
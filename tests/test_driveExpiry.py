@@ -0,0 +1,118 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveExpiry.py
+#   -- run cycles of the cleanup daemon against a fake Drive
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.11+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import json
+import logging
+import time
+from datetime import datetime as dt, timedelta, timezone
+import pytest
+from driveBatch import batch_delete
+from driveExpiry import CleanupDaemon
+from drivePaging import iter_page_items
+from drivePolicy import POLICY_FIELDS, RetentionRule
+from driveQuery import compile_query
+from driveShard import format_drive_time
+from fakeDrive import FakeDrive, make_http_error
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+DAY = 24 * 3600
+
+@pytest.fixture
+def drive():
+    fake = FakeDrive(p_seed = 5)
+    folder = fake.create_item({"name":"Test", "mimeType":FOLDER_MIME_TYPE}, None)["id"]
+    # 3 files older than the 30 days of the rule, and 5 newer ones
+    old = fake.populate(3, folder, p_extension = "gcm", p_start = time.time() - 40 * DAY)
+    new = fake.populate(5, folder, p_extension = "gcm", p_start = time.time() - 5 * DAY)
+    return fake, folder, old, new
+
+def make_daemon(p_fake, p_folder:str, p_state_path:str, p_test:bool = False, p_retry_delay:float = 0.0) -> CleanupDaemon:
+    service = p_fake.service()
+
+    def list_folder(p_fid:str):
+        return iter_page_items(service.files(), f"{compile_query(p_pid = p_fid)} and trashed = false", POLICY_FIELDS)
+
+    def delete(p_items:list) -> list:
+        # NO retries inside the batch, so a failed delete is left to the daemon
+        return batch_delete(service, p_items, p_retries = 0)
+
+    return CleanupDaemon(service, [RetentionRule({"folder":"Test", "extension":"gcm", "max_age_days":30})], lambda name: p_folder,
+                         list_folder, delete, p_state_path, "policy", logging.getLogger(__name__), p_interval = 0,
+                         p_test = p_test, p_retry_delay = p_retry_delay)
+
+def fail_once(p_fake, p_id:str, p_status:int = 503):
+    """The NEXT delete of p_id fails."""
+    delete_item = p_fake.delete_item
+    failed = []
+
+    def flaky(p_fid:str):
+        if p_fid == p_id and not failed:
+            failed.append(p_fid)
+            raise make_http_error(p_status, "backendError", "Backend Error")
+        return delete_item(p_fid)
+    p_fake.delete_item = flaky
+
+def test_cycle_deletes_the_expired_files(drive, tmp_path):
+    fake, folder, old, new = drive
+    daemon = make_daemon(fake, folder, str(tmp_path / "state.json"))
+    daemon.bootstrap()
+    results = daemon.cycle()
+    assert sorted(item["id"] for item, _, error in results if error is None) == sorted(old)
+    assert not set(old) & set(fake.items)
+    assert set(new) <= set(fake.items)
+    assert len(daemon.queue) == 5
+    # nothing more is due
+    assert daemon.cycle() == []
+
+def test_failed_delete_is_retried_in_the_next_cycle(drive, tmp_path):
+    fake, folder, old, _ = drive
+    daemon = make_daemon(fake, folder, str(tmp_path / "state.json"))
+    daemon.bootstrap()
+    fail_once(fake, old[1])
+    first = daemon.cycle()
+    assert [item["id"] for item, _, error in first if error is not None] == [old[1]]
+    assert old[1] in fake.items
+    # still tracked AND due again, although NO other file of the rule has changed
+    assert any(old[1] in items for items in daemon.queue.tracked)
+    second = daemon.cycle()
+    assert [(item["id"], error) for item, _, error in second] == [(old[1], None)]
+    assert old[1] not in fake.items
+
+def test_failed_delete_waits_for_the_retry_delay(drive, tmp_path):
+    fake, folder, old, _ = drive
+    daemon = make_daemon(fake, folder, str(tmp_path / "state.json"), p_retry_delay = 3600)
+    daemon.bootstrap()
+    fail_once(fake, old[0])
+    daemon.cycle()
+    assert daemon.cycle() == []
+    assert old[0] in fake.items
+    assert daemon.queue.next_expiry() > format_drive_time(dt.now(timezone.utc) + timedelta(minutes = 59))
+
+def test_testing_mode_deletes_nothing_and_keeps_the_state(drive, tmp_path, monkeypatch):
+    fake, folder, old, _ = drive
+    # do NOT take over the Ctrl-C of the test run
+    monkeypatch.setattr("driveExpiry.signal.signal", lambda *_: None)
+    state_path = tmp_path / "state.json"
+    daemon = make_daemon(fake, folder, str(state_path))
+    daemon.bootstrap()
+    daemon.save_state()
+    saved = state_path.read_text()
+
+    tester = make_daemon(fake, folder, str(state_path), p_test = True)
+    assert tester.run(p_max_cycles = 1) == []
+    assert set(old) <= set(fake.items)
+    assert state_path.read_text() == saved
+    # a real run after the test still deletes the files
+    assert len(make_daemon(fake, folder, str(state_path)).run(p_max_cycles = 1)) == 3
+    assert json.loads(state_path.read_text())["policy"] == "policy"
@@ -0,0 +1,42 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveExport.py
+#   -- export Google files from a fake Drive, which like Drive sends the WHOLE export in one response
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import os
+from driveExport import ExportCache, export_file
+from fakeDrive import MEDIA_OP, FakeDrive
+
+SHEET_MIME_TYPE = "application/vnd.google-apps.spreadsheet"
+
+def test_export_ONCE_per_version(tmp_path):
+    fake = FakeDrive(p_seed = 7)
+    fid = fake.populate(1, p_prefix = "budget", p_extension = "gsheet", p_mimetype = SHEET_MIME_TYPE, p_size = 5000)[0]
+    files = fake.service().files()
+    cache = ExportCache(str(tmp_path / "cache"))
+    lgr = logging.getLogger(__name__)
+    expected = fake.export_content(fid, "text/csv")
+
+    # a chunk size much smaller than the export: still ONE request, as Drive ignores the Range
+    path = export_file(files, fake.items[fid], "csv", str(tmp_path / "out"), cache, lgr, p_chunk_size = 1024)
+    assert open(path, "rb").read() == expected
+    assert len(fake.latencies[MEDIA_OP]) == 1
+
+    export_file(files, fake.items[fid], "csv", str(tmp_path / "out"), cache, lgr)
+    assert len(fake.latencies[MEDIA_OP]) == 1
+
+    # a new version is exported again and the copy of the old one is removed
+    fake.items[fid]["modifiedTime"] = "2026-10-17T12:00:00.000Z"
+    export_file(files, fake.items[fid], "csv", str(tmp_path / "out"), cache, lgr)
+    assert len(fake.latencies[MEDIA_OP]) == 2
+    assert os.listdir(cache.folder) == [os.path.basename(cache.path(fid, "2026-10-17T12:00:00.000Z", "csv"))]
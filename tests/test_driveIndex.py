@@ -0,0 +1,89 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveIndex.py
+#   -- keep the local index of Drive metadata in step with the changes feed of a fake Drive
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import pytest
+from driveIndex import DriveIndex
+from fakeDrive import FAKE_ROOT_ID, FakeDrive
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+@pytest.fixture
+def drive():
+    fake = FakeDrive(p_seed = 7)
+    folder = fake.create_item({"name":"Test", "mimeType":FOLDER_MIME_TYPE}, None)["id"]
+    fake.populate(250, folder, p_extension = "gcm")
+    fake.populate(50, FAKE_ROOT_ID, p_prefix = "top", p_extension = "txt")
+    return fake, folder
+
+@pytest.fixture
+def index(tmp_path):
+    idx = DriveIndex(str(tmp_path / "drive_index.sqlite"), logging.getLogger(__name__))
+    yield idx
+    idx.close()
+
+def names(p_items) -> set:
+    return {item["name"] for item in p_items}
+
+def test_first_refresh_crawls_and_warns(drive, index, caplog):
+    fake, folder = drive
+    assert not index.is_built()
+    with caplog.at_level(logging.WARNING):
+        count = index.refresh(fake.service())
+    assert count == len(fake.items) - 1
+    assert index.is_built()
+    assert any("crawl of ALL the items" in rec.getMessage() for rec in caplog.records)
+    assert len(list(index.find(p_pid = folder))) == 250
+    assert len(list(index.find(p_pid = "root", p_extension = "txt"))) == 50
+
+def test_sync_applies_the_changes_feed(drive, index, caplog):
+    fake, folder = drive
+    service = fake.service()
+    index.refresh(service)
+    listed = sorted(index.find(p_pid = folder), key = lambda item: item["name"])
+    deleted, trashed, renamed = listed[0], listed[1], listed[2]
+
+    files = service.files()
+    files.delete(fileId = deleted["id"]).execute()
+    files.update(fileId = trashed["id"], body = {"trashed":True}).execute()
+    files.update(fileId = renamed["id"], body = {"name":"renamed.gcm"}).execute()
+    created = files.create(body = {"name":"new.gcm", "parents":[folder]}).execute()["id"]
+    moved = fake.populate(1, FAKE_ROOT_ID, p_prefix = "moved", p_extension = "gcm")[0]
+    files.update(fileId = moved, body = {"parents":[folder]}).execute()
+
+    # a later sync does NOT crawl again
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        assert index.refresh(service) == 6
+    assert not caplog.records
+
+    found = {item["id"]:item for item in index.find(p_pid = folder)}
+    assert deleted["id"] not in found
+    assert trashed["id"] not in found
+    assert found[renamed["id"]]["name"] == "renamed.gcm"
+    assert created in found and moved in found
+    assert len(found) == 250 - 2 + 2
+    assert "renamed.gcm" in names(index.find(p_extension = "gcm"))
+    # nothing changed since the last sync
+    assert index.sync(service) == 0
+
+def test_sync_follows_the_pages_of_the_feed(drive, index):
+    fake, folder = drive
+    service = fake.service()
+    index.refresh(service)
+    # more changes than fit on ONE page of the feed
+    ids = fake.populate(2500, folder, p_prefix = "many", p_extension = "gcm")
+    assert index.sync(service) == 2500
+    assert len(list(index.find(p_pid = folder))) == 2750
+    assert {item["id"] for item in index.find(p_pid = folder)} >= set(ids)
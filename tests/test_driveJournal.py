@@ -0,0 +1,54 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveJournal.py
+#   -- settle the files of an interrupted folder upload against the items of a fake Drive
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import pytest
+from googleapiclient.http import MediaInMemoryUpload
+from driveJournal import DONE, IN_PROGRESS, UploadJournal, job_key, settle_interrupted
+from drivePaging import iter_page_items
+from driveSync import SYNC_FIELDS, sync_query
+from fakeDrive import FakeDrive
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+@pytest.fixture
+def journal(tmp_path):
+    jnl = UploadJournal(str(tmp_path / "journal.sqlite"), job_key(str(tmp_path), "folder"), logging.getLogger(__name__))
+    yield jnl
+    jnl.close()
+
+def states(p_journal:UploadJournal) -> dict:
+    with p_journal._lock:
+        return dict( p_journal._conn.execute("SELECT path, state FROM uploads WHERE job = ?", (p_journal.job,)) )
+
+def test_settle_ONLY_the_files_drive_has_with_the_same_content(tmp_path, journal):
+    fake = FakeDrive(p_seed = 1)
+    folder = fake.create_item({"name":"Test", "mimeType":FOLDER_MIME_TYPE}, None)["id"]
+    created, changed, missing, updated = (tmp_path / name for name in ("created.txt", "changed.txt", "missing.txt", "updated.txt"))
+    for path in (created, changed, missing, updated):
+        path.write_bytes(b"local content " + path.name.encode())
+    # on Drive: the SAME content, different content of the SAME size, and the OLD copy of a file being updated
+    fake.create_item({"name":created.name, "parents":[folder]}, MediaInMemoryUpload(created.read_bytes()))
+    fake.create_item({"name":changed.name, "parents":[folder]}, MediaInMemoryUpload(b"remote content changed.txt"))
+    update_id = fake.create_item({"name":updated.name, "parents":[folder]}, MediaInMemoryUpload(updated.read_bytes()))["id"]
+
+    journal.start([(str(created), "text/plain"), (str(changed), "text/plain"), (str(missing), "text/plain"),
+                   (str(updated), "text/plain", update_id)])
+    for path in (created, changed, missing, updated):
+        journal.started(str(path))
+    settle_interrupted(journal, iter_page_items(fake.service().files(), sync_query(folder), SYNC_FIELDS))
+
+    assert states(journal) == {str(created):DONE, str(changed):IN_PROGRESS, str(missing):IN_PROGRESS, str(updated):IN_PROGRESS}
+    assert sorted(path for path, *_ in journal.remaining()) == sorted(str(path) for path in (changed, missing, updated))
+    assert (str(updated), "text/plain", update_id) in journal.remaining()
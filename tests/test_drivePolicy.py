@@ -0,0 +1,73 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_drivePolicy.py
+#   -- plan the deletions of a retention policy for the folders of a fake Drive
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.11+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import json
+import logging
+import time
+from datetime import datetime as dt, timezone
+import pytest
+from drivePaging import iter_page_items
+from drivePolicy import POLICY_FIELDS, RetentionRule, load_policy, plan_deletions
+from driveQuery import compile_query
+from fakeDrive import LIST_OP, FakeDrive
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+DAY = 24 * 3600
+
+@pytest.fixture
+def drive():
+    fake = FakeDrive(p_seed = 14)
+    folder = fake.create_item({"name":"Test", "mimeType":FOLDER_MIME_TYPE}, None)["id"]
+    # 10 backups of 1 KB, one day apart, from 9.5 to 0.5 days old, and 3 logs of 40 days old
+    backups = [fake.populate(1, folder, p_prefix = f"backup{num}", p_extension = "gcm",
+                             p_start = time.time() - (9.5 - num) * DAY)[0]
+               for num in range(10)]
+    logs = fake.populate(3, folder, p_extension = "log", p_start = time.time() - 40 * DAY)
+    return fake, folder, backups, logs
+
+def plan(p_fake, p_folder:str, p_rules:list) -> list:
+    service = p_fake.service()
+
+    def list_folder(p_fid:str):
+        return iter_page_items(service.files(), f"{compile_query(p_pid = p_fid)} and trashed = false", POLICY_FIELDS)
+
+    return [item["id"] for item in plan_deletions(p_rules, lambda name: p_folder, list_folder, logging.getLogger(__name__),
+                                                  dt.now(timezone.utc))]
+
+def test_age_and_keep_newest(drive):
+    fake, folder, backups, logs = drive
+    assert plan(fake, folder, [RetentionRule({"folder":"Test", "extension":"gcm", "max_age_days":7})]) == backups[:3]
+    rule = RetentionRule({"folder":"Test", "extension":"gcm", "max_age_days":1, "keep_newest":8})
+    assert plan(fake, folder, [rule]) == backups[:2]
+
+def test_max_total_size_counts_from_the_newest(drive):
+    fake, folder, backups, logs = drive
+    assert plan(fake, folder, [RetentionRule({"folder":"Test", "extension":"gcm", "max_total_size":"4KB"})]) == backups[:6]
+
+def test_list_each_folder_ONCE_and_delete_each_file_ONCE(drive):
+    fake, folder, backups, logs = drive
+    rules = [RetentionRule({"folder":"Test", "extension":"gcm", "max_age_days":7}),
+             RetentionRule({"folder":"Test", "extension":"gcm", "max_total_size":"8KB"}),
+             RetentionRule({"folder":"Test", "extension":"log", "max_age_days":30})]
+    planned = plan(fake, folder, rules)
+    assert len(fake.latencies[LIST_OP]) == 1
+    assert sorted(planned) == sorted(logs + backups[:3])
+
+def test_load_a_policy_file(tmp_path):
+    path = tmp_path / "policy.json"
+    path.write_text( json.dumps({"rules":[{"folder":"Test", "max_total_size":"2 MB"}]}) )
+    assert load_policy(str(path))[0].max_total_size == 2 * 1024 * 1024
+    path.write_text( json.dumps({"rules":[{"folder":"Test", "max_size":"2 MB"}]}) )
+    with pytest.raises(ValueError):
+        load_policy(str(path))
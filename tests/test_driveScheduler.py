@@ -0,0 +1,76 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveScheduler.py
+#   -- retry and throttle the requests to a fake Drive that fails some of them
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import time
+import pytest
+from googleapiclient.errors import HttpError
+import driveScheduler
+from driveScheduler import INITIAL_IN_FLIGHT, MIN_IN_FLIGHT, DriveScheduler, TokenBucket
+from fakeDrive import GET_OP, FakeDrive
+
+@pytest.fixture(autouse = True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(driveScheduler, "backoff_delay", lambda p_attempt: 0.0)
+
+@pytest.fixture
+def drive():
+    fake = FakeDrive(p_seed = 12)
+    return fake, fake.populate(1)[0]
+
+def test_retry_the_server_errors(drive):
+    fake, fid = drive
+    fake.error_rate = 0.5
+    scheduler = DriveScheduler(p_retries = 20)
+    for _ in range(20):
+        assert scheduler.execute( fake.service().files().get(fileId = fid) )["id"] == fid
+    assert scheduler.num_retries == fake.errors[503] > 0
+    assert len(fake.latencies[GET_OP]) == 20 + fake.errors[503]
+
+def test_do_NOT_retry_a_missing_file(drive):
+    fake, _ = drive
+    scheduler = DriveScheduler()
+    with pytest.raises(HttpError) as missing:
+        scheduler.execute( fake.service().files().get(fileId = "nothing") )
+    assert missing.value.resp.status == 404
+    assert scheduler.num_retries == 0 and len(fake.latencies[GET_OP]) == 1
+
+def test_give_up_after_the_retries(drive):
+    fake, fid = drive
+    fake.error_rate = 1.0
+    scheduler = DriveScheduler(p_retries = 3)
+    with pytest.raises(HttpError):
+        scheduler.execute( fake.service().files().get(fileId = fid) )
+    assert len(fake.latencies[GET_OP]) == 1 + 3
+
+def test_halve_the_limit_when_throttled_and_grow_it_after_successes(drive):
+    fake, fid = drive
+    scheduler = DriveScheduler()
+    # the errors of ONE round of requests cut the limit ONCE
+    scheduler.on_throttle()
+    scheduler.on_throttle()
+    assert int(scheduler.limit) == INITIAL_IN_FLIGHT // 2
+    for _ in range(10):
+        scheduler._last_decrease = 0.0
+        scheduler.on_throttle()
+    assert scheduler.limit == MIN_IN_FLIGHT
+    for _ in range(50):
+        scheduler.execute( fake.service().files().get(fileId = fid) )
+    assert scheduler.limit > INITIAL_IN_FLIGHT
+
+def test_bucket_charges_a_large_cost_in_full():
+    bucket = TokenBucket(p_rate = 100.0, p_capacity = 10)
+    start = time.monotonic()
+    # 10 tokens at once, then 20 more at 100 per second
+    bucket.acquire(30)
+    assert time.monotonic() - start >= 0.18
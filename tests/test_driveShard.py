@@ -0,0 +1,53 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveShard.py
+#   -- list the items of a fake Drive in modifiedTime shards
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import time
+import pytest
+from driveShard import ShardedLister
+from fakeDrive import FakeDrive
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+NUM_FILES = 600
+
+@pytest.fixture
+def drive():
+    fake = FakeDrive(p_seed = 13)
+    folder = fake.create_item({"name":"Test", "mimeType":FOLDER_MIME_TYPE}, None)["id"]
+    # most of the files in the LAST hour, so the last shard is dense
+    fake.populate(100, folder, p_prefix = "old", p_start = time.time() - 30 * 24 * 3600)
+    fake.populate(NUM_FILES - 100, folder, p_prefix = "new", p_start = time.time() - 3600)
+    return fake, f"'{folder}' in parents"
+
+def lister(p_fake, p_shards:int) -> ShardedLister:
+    return ShardedLister(p_fake.service, p_shards, logging.getLogger(__name__), p_dense_pages = 2)
+
+def test_one_shard_lists_everything_in_order(drive):
+    fake, query = drive
+    items = lister(fake, 1).list_items(query, "name", p_page_size = 100)
+    assert len(items) == NUM_FILES
+    assert [item["modifiedTime"] for item in items] == sorted(item["modifiedTime"] for item in items)
+
+def test_split_the_dense_shards_and_remove_duplicates(drive):
+    fake, query = drive
+    sharded = lister(fake, 4)
+    items = sharded.list_items(query, "name", p_page_size = 50)
+    assert sharded.num_splits > 0
+    assert len(items) == len({item["id"] for item in items}) == NUM_FILES
+
+def test_stop_at_the_limit(drive):
+    fake, query = drive
+    sharded = lister(fake, 4)
+    assert len( sharded.list_items(query, "name", p_page_size = 50, p_limit = 120) ) == 120
+    assert sharded.num_calls < len( lister(fake, 4).list_items(query, "name", p_page_size = 50) ) // 50
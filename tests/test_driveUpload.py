@@ -0,0 +1,96 @@
+##############################################################################################################################
+# coding=utf-8
+#
+# test_driveUpload.py
+#   -- send local files and folder trees to a fake Drive, and resume an interrupted resumable upload
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author__         = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import logging
+import os
+import pytest
+import driveUpload
+from driveUpload import CHUNK_UNIT, ParallelUploader, upload_file
+from fakeDrive import CHUNK_OP, CREATE_OP, FAKE_ROOT_ID, FakeDrive
+
+FILE_SIZE = 4 * CHUNK_UNIT + 1000
+
+class Interrupted(Exception):
+    pass
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Keep each MediaFileUpload that upload_file creates."""
+    media = []
+
+    class KeptMediaFileUpload(driveUpload.MediaFileUpload):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            media.append(self)
+    monkeypatch.setattr(driveUpload, "MediaFileUpload", KeptMediaFileUpload)
+    return media
+
+@pytest.fixture
+def local_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(os.urandom(FILE_SIZE))
+    return path
+
+def test_multipart_or_resumable_by_size(local_file, opened):
+    fake = FakeDrive(p_seed = 8)
+    small = upload_file(fake.service().files(), str(local_file), "application/octet-stream", FAKE_ROOT_ID)
+    assert not fake.latencies[CHUNK_OP]
+    big = upload_file(fake.service().files(), str(local_file), "application/octet-stream", FAKE_ROOT_ID,
+                      p_threshold = CHUNK_UNIT, p_chunk_size = CHUNK_UNIT)
+    # a request to start the session, then one for each chunk except the last, which creates the file
+    assert len(fake.latencies[CHUNK_OP]) == 1 + 4
+    for fid in (small, big):
+        assert fake.contents[fid] == local_file.read_bytes()
+    assert len(opened) == 2 and all(media.stream().closed for media in opened)
+
+def test_resume_from_the_bytes_drive_has(local_file, opened):
+    fake = FakeDrive(p_seed = 9)
+    sessions = []
+
+    def interrupt(p_sent:int, p_size:int):
+        if p_sent >= 2 * CHUNK_UNIT:
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        upload_file(fake.service().files(), str(local_file), "application/octet-stream", FAKE_ROOT_ID,
+                    p_threshold = CHUNK_UNIT, p_chunk_size = CHUNK_UNIT, p_progress = interrupt,
+                    p_session = lambda uri, received: sessions.append((uri, received)))
+    assert sessions[-1][1] == 2 * CHUNK_UNIT
+    assert opened[0].stream().closed
+    fake.reset_stats()
+
+    fid = upload_file(fake.service().files(), str(local_file), "application/octet-stream", FAKE_ROOT_ID,
+                      p_threshold = CHUNK_UNIT, p_chunk_size = CHUNK_UNIT, p_resume_uri = sessions[-1][0])
+    assert fake.contents[fid] == local_file.read_bytes()
+    # the query of the session, then ONLY the 2 full chunks Drive did NOT have, and the last one with the create
+    assert len(fake.latencies[CHUNK_OP]) == 1 + 2
+    assert len(fake.latencies[CREATE_OP]) == 1
+
+def test_restart_an_expired_session(local_file):
+    fake = FakeDrive(p_seed = 10)
+    fid = upload_file(fake.service().files(), str(local_file), "application/octet-stream", FAKE_ROOT_ID,
+                      p_threshold = CHUNK_UNIT, p_chunk_size = CHUNK_UNIT, p_resume_uri = "fake://upload/expired")
+    assert fake.contents[fid] == local_file.read_bytes()
+
+def test_send_tree_does_NOT_follow_a_symlink_loop(tmp_path):
+    root = tmp_path / "tree"
+    (root / "sub").mkdir(parents = True)
+    (root / "top.txt").write_text("top")
+    (root / "sub" / "low.txt").write_text("low")
+    (root / "sub" / "loop").symlink_to(root, target_is_directory = True)
+    fake = FakeDrive(p_seed = 11)
+    uploader = ParallelUploader(fake.service, 2, logging.getLogger(__name__))
+    sent = uploader.send_tree(str(root), FAKE_ROOT_ID, lambda path: "text/plain")
+    assert sorted(sent) == [str(root / "sub" / "low.txt"), str(root / "top.txt")]
+    assert sorted(item["name"] for item in fake.items.values() if item["id"] != FAKE_ROOT_ID) == ["low.txt", "sub", "top.txt"]
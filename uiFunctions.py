@@ -13,23 +13,34 @@ __author_email__   = "epistemik@gmail.com"
 __python_version__ = "3.9+"
 __google_api_python_client_version__ = "2.153.0"
 __created__ = "2021-05-14"
-__updated__ = "2025-07-31"
+__updated__ = "2026-10-17"
 
 from sys import path
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 import os
 import glob
 import threading
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
 path.append("/home/marksa/git/Python/utils")
 from mhsLogging import *
 from mhsUtils import *
 SECRETS_DIR:str = osp.join(BASE_PYTHON_FOLDER, f"google{osp.sep}drive{osp.sep}secrets")
 path.append(SECRETS_DIR)
 from folder_ids import *
+from drivePaging import MAX_PAGE_SIZE, prefetch_page_items
+from driveBatch import batch_delete
+from driveSession import SERVICE_POOL
+from driveTrace import SESSION_CAT, TRACER, WAIT_CAT
+from driveLogging import ItemLog
+from driveUpload import BYTES_PER_MB, DEFAULT_WORKERS, ParallelUploader, build_thread_service, upload_file
+from driveIndex import DriveIndex, INDEX_FILENAME
+from driveQuery import compile_query
+from driveScheduler import SCHEDULER
+from driveTree import TREE_FILENAME, load_or_crawl
+from driveSync import HASH_CACHE_FILENAME, SYNC_FIELDS, files_to_sync, sync_query
 
 # see https://github.com/googleapis/google-api-python-client/issues/299
 lg.getLogger("googleapiclient.discovery_cache").setLevel(lg.ERROR)
@@ -38,12 +49,21 @@ JSON_TOKEN = "token.json"
 CREDENTIALS_FILE:str    = osp.join(SECRETS_DIR, "credentials.json")
 DRIVE_TOKEN_PATH:str    = osp.join(SECRETS_DIR, JSON_TOKEN)
 DRIVE_ACCESS_SCOPE:list = ["https://www.googleapis.com/auth/drive"]
+DRIVE_INDEX_PATH:str    = osp.join(SECRETS_DIR, INDEX_FILENAME)
+DRIVE_TREE_PATH:str     = osp.join(SECRETS_DIR, TREE_FILENAME)
+HASH_CACHE_PATH:str     = osp.join(SECRETS_DIR, HASH_CACHE_FILENAME)
 
 NO_SESSION_MSG     = "No Session!"
 NO_RESULTS_MSG     = "No items found."
+CANCELLED_MSG      = ">> CANCELLED before finishing!"
+PROGRESS_STEP      = 50
 MAX_FILES_DELETE   = 500
 DEFAULT_NUM_ITEMS  = 800
 MAX_NUM_ITEMS      = 3000
+ITEM_FIELDS        = "id, name, mimeType, modifiedTime, size, parents"
+
+# the local index, folder tree and hash cache files are shared by ALL the instances, i.e. by the jobs running at the same time
+LOCAL_FILES_LOCK = threading.Lock()
 
 def get_creds(p_lgr:lg.Logger):
     """Get the proper credentials needed to access my Google drive."""
@@ -72,30 +92,114 @@ def get_creds(p_lgr:lg.Logger):
 
 class UiDriveAccess:
     """Start a locked session, read/write to my google drive, end the session."""
-    def __init__(self, p_save:bool, p_delete:bool, p_lgctrl:MhsLogger, p_level:int = DEFAULT_LOG_LEVEL):
+    def __init__(self, p_save:bool, p_delete:bool, p_lgctrl:MhsLogger, p_level:int = DEFAULT_LOG_LEVEL, p_fresh:bool = False,
+                 p_summary:bool = False):
         self.save = p_save
         self.delete = p_delete
         self.lgr = p_lgctrl.get_logger()
         self.lev = p_level
-        # prevent different instances/threads from writing at the same time
-        self._lock = threading.Lock()
+        self.fresh = p_fresh
+        # log ONLY the counts instead of a line for each item
+        self.summary = p_summary
         self.lgr.info(f"Launch '{self.__class__.__name__}' instance at: {get_current_time()}")
         self.service = None
+        self.drive = None
+        self.creds = None
+        # answer queries from the local index unless FRESH results are requested
+        self.index = None if p_fresh else DriveIndex(DRIVE_INDEX_PATH, self.lgr)
+        self._index_synced = False
+        self.tree = None
+        self._tree_crawled = False
+        self._progress = None
+        self._cancel = None
+        self._page = None
+        # number of the items of the reply already sent to the page callable
+        self.num_shown = 0
+
+    def monitor(self, p_progress = None, p_cancel:threading.Event = None, p_page = None):
+        """Report the progress of long operations and stop them early on request.
+        :param p_progress: callable(message, number done, total number OR 0 if unknown); may be called from a worker thread
+        :param p_cancel:   event that is checked between pages, files and delete batches
+        :param p_page:     callable(list of NEW items) to show the items found as the listing goes on, before the full reply
+        """
+        self._progress = p_progress
+        self._cancel = p_cancel
+        self._page = p_page
+        self.num_shown = 0
+
+    def _show_page(self, p_items:list):
+        if self._page and len(p_items) > self.num_shown:
+            self._page(p_items[self.num_shown:])
+            self.num_shown = len(p_items)
+
+    def _report(self, p_msg:str, p_done:int, p_total:int = 0):
+        if self._progress:
+            self._progress(p_msg, p_done, p_total)
+
+    def _report_bytes(self, p_sent:int, p_size:int):
+        # in KB so that the numbers fit in the progress bar
+        self._report(f"Sent {p_sent / BYTES_PER_MB:.2f}/{p_size / BYTES_PER_MB:.2f} MB", p_sent // 1024, p_size // 1024)
+
+    def _cancelled(self) -> bool:
+        if self._cancel and self._cancel.is_set():
+            self.lgr.warning(CANCELLED_MSG)
+            return True
+        return False
 
     def begin_session(self):
-        """Activate a UNIQUE session to the drive."""
-        self._lock.acquire()
-        self.lgr.debug(f"acquired Drive lock at: {get_current_time()}")
-        creds = get_creds(self.lgr)
-        service = build("drive", "v3", credentials = creds)
-        self.service = service.files()
+        """Activate a session to the drive, reusing the Drive service already built in this thread.
+           Sessions in different threads run at the same time: ONLY the shared local files are locked."""
+        with TRACER.span("session.begin", SESSION_CAT):
+            self.drive, self.creds = SERVICE_POOL.acquire(lambda: get_creds(self.lgr), self.lgr, DRIVE_TOKEN_PATH)
+            self.service = self.drive.files()
+
+    def _synced_index(self):
+        """The local index, brought up to date once per session, OR None if fresh results were requested."""
+        if self.index and not self._index_synced:
+            with self._local_files():
+                self.index.refresh(self.drive)
+            self._index_synced = True
+        return self.index
+
+    def folder_id(self, p_name:str) -> str:
+        """Find the id of a Drive folder from its name in FOLDER_IDS OR its path from my root folder, e.g. 'Finance/2025/Q3'."""
+        if p_name in FOLDER_IDS.keys():
+            return FOLDER_IDS[p_name]
+        with self._local_files():
+            return self._resolve_folder(p_name)
+
+    def _resolve_folder(self, p_name:str) -> str:
+        if not self.tree:
+            self.tree = load_or_crawl(DRIVE_TREE_PATH, lambda: build_thread_service(self.creds), self.lgr, self.fresh)
+            self._tree_crawled = self.fresh
+        fid = self.tree.resolve(p_name)
+        # the saved folder tree may be out of date, so crawl again before giving up
+        if not fid and not self._tree_crawled:
+            self.tree = load_or_crawl(DRIVE_TREE_PATH, lambda: build_thread_service(self.creds), self.lgr, True)
+            self._tree_crawled = True
+            fid = self.tree.resolve(p_name)
+        if fid:
+            return fid
+        raise Exception(f"Drive folder '{p_name}' NOT found!")
 
     def end_session(self):
         """RELEASE this drive session."""
+        self._index_synced = False
         self.service = None
-        if self._lock and self._lock.locked():
-            self._lock.release()
-            self.lgr.debug(f"released Drive lock at: {get_current_time()}")
+        self.drive = None
+
+    @contextmanager
+    def _local_files(self):
+        """Hold the lock on the local files shared with the other jobs."""
+        # time spent queued behind another job
+        with TRACER.span("session.lock", WAIT_CAT):
+            LOCAL_FILES_LOCK.acquire()
+        self.lgr.debug(f"acquired local files lock at: {get_current_time()}")
+        try:
+            yield
+        finally:
+            LOCAL_FILES_LOCK.release()
+            self.lgr.debug(f"released local files lock at: {get_current_time()}")
 
     def _delete_items(self, p_items:list) -> list:
         """DELETE the submitted items *including folders* from my Google Drive
@@ -107,57 +211,58 @@ class UiDriveAccess:
         if p_items:
             results = []
             items = p_items if len(p_items) <= MAX_FILES_DELETE else p_items[:MAX_FILES_DELETE]
-            for item in items:
-                response = self.service.delete(fileId = item['id']).execute()
-                result = f"Delete '{item['name']}' with date: {item['modifiedTime']}  >>  Response = '{response}'"
-                self.lgr.log(self.lev, result)
+            outcomes = batch_delete(self.drive, items, p_lgr = self.lgr, p_cancel = self._cancel,
+                                    p_progress = lambda num: self._report(f"Deleted {num}/{len(items)} items", num, len(items)))
+            item_log = ItemLog(self.lgr, self.lev, self.summary)
+            for item, response, error in outcomes:
+                result = f"Delete '{item['name']}' with date: {item['modifiedTime']}  >>  Response = '{repr(error) if error else response}'"
+                item_log.item("%s", result, p_kind = "error" if error else "deleted")
                 results.append(result)
+            item_log.summary("delete results")
+            if len(outcomes) < len(items):
+                results.append(CANCELLED_MSG)
             return results
         return [NO_RESULTS_MSG]
 
-    def _find_items(self, p_mimetype:str = "", p_date:str = "", p_pid:str = "", p_limit:int = 100) -> list:
-        """Find the specified items on my Google drive.
+    def _make_query(self, p_mimetype:str = "", p_date:str = "", p_pid:str = "", p_search:str = "") -> str:
+        """Build a Drive query string from the specified item properties.
         :param p_mimetype: mimeType of items to find
         :param p_date:     find items OLDER than this date
         :param p_pid:      id of the parent Drive folder to search in
-        :param p_limit:    number of items to find
-        :return  list of items found
+        :param p_search:   string to search for in the item names
+        :return  the query OR an empty string if NO properties were specified
         """
-        iquery = None
-        if p_mimetype:
-            iquery = f"mimeType='{p_mimetype}'"
-        if p_date:
-            iquery = f"{iquery} and modifiedTime < '{p_date}'" if iquery else f"modifiedTime < '{p_date}'"
-        if p_pid:
-            iquery = f"{iquery} and '{p_pid}' in parents" if iquery else f"'{p_pid}' in parents"
+        iquery = compile_query(p_mimetype, p_date, p_pid, p_search)
         if not iquery:
             self.lgr.warning("No Query parameters!")
-            return []
+        return iquery
 
-        limit = p_limit if 1 <= p_limit <= MAX_NUM_ITEMS else DEFAULT_NUM_ITEMS
-        self.lgr.log(self.lev, f"query = '{iquery}'; limit = '{limit}'")
-        try:
-            page_token = None
-            all_items = []
-            while True:
-                results = self.service.list( q = iquery, spaces = "drive",
-                                             fields = "nextPageToken, files(id, name, mimeType, modifiedTime, size, parents)",
-                                             pageToken = page_token ).execute()
-                items = results.get("files", [])
-                all_items = all_items + items if all_items else items
-                page_token = results.get("nextPageToken", None)
-                if page_token is None or len(all_items) >= limit:
-                    break
-            self.lgr.debug(f">> Found {len(all_items)} items.\n")
-        except Exception as ffex:
-            raise ffex
-        return all_items
-
-    def send_folder(self, p_path:str, p_pid:str, p_parent:str) -> list:
+    def iter_items(self, p_query:str, p_fields:str = ITEM_FIELDS, p_page_size:int = MAX_PAGE_SIZE, p_limit:int = 0):
+        """Yield the items matching a Drive query as each page arrives; paging stops when the caller stops iterating.
+        :param p_query:     Drive query string
+        :param p_fields:    fields to obtain for each item
+        :param p_page_size: number of items to request per page
+        :param p_limit:     stop requesting pages once this many items are fetched; 0 for NO limit
+        """
+        self.lgr.log(self.lev, f"query = '{p_query}'; page size = '{p_page_size}'")
+        # the next page is requested while the caller is still working on the current one
+        return prefetch_page_items(lambda: SERVICE_POOL.lease(self.creds), p_query, p_fields, p_page_size,
+                                   p_limit = p_limit)
+
+    def _existing_folder(self, p_name:str, p_pid:str) -> str:
+        """The id of the Drive folder with this name in the parent folder OR an empty string if there is none."""
+        iquery = f"{compile_query(FILE_MIME_TYPES['google folder'], p_pid = p_pid, p_name_contains = p_name)} and trashed = false"
+        return next((item["id"] for item in self.iter_items(iquery, "id, name") if item["name"] == p_name), "")
+
+    def send_folder(self, p_path:str, p_pid:str, p_parent:str, p_workers:int = DEFAULT_WORKERS, p_sync:bool = False,
+                    p_recursive:bool = False) -> list:
         """Create a NEW folder in the specified parent and send ALL the files in the local folder there
-        :param p_path:   path to the local folder to send files from
-        :param p_pid:    id of the parent folder on the drive to send the files to
-        :param p_parent: name of the parent folder on the drive
+        :param p_path:    path to the local folder to send files from
+        :param p_pid:     id of the parent folder on the drive to send the files to
+        :param p_parent:  name of the parent folder on the drive
+        :param p_workers: number of files to send concurrently
+        :param p_sync:    reuse the Drive folder with the same name, if there is one, and ONLY send the new or changed files
+        :param p_recursive: ALSO send the subfolders, creating the same folder tree in the new Drive folder
         :return  list of items sent OR the 'no results' message
         """
         if not self.service:
@@ -171,23 +276,81 @@ class UiDriveAccess:
                 "mimeType" : FILE_MIME_TYPES["google folder"],
                 "parents"  : [p_pid]
             }
-            create_reply = self.service.create(body = folder_metadata, fields = "id").execute()
-            new_fldr_id = create_reply.get('id')
-            self.lgr.log(self.lev, f"New folder ID = '{new_fldr_id}'")
+            new_fldr_id = self._existing_folder(new_folder_name, p_pid) if p_sync else ""
+            if new_fldr_id:
+                self.lgr.log(self.lev, f"Sync to existing folder ID = '{new_fldr_id}'")
+            else:
+                create_reply = SCHEDULER.execute( self.service.create(body = folder_metadata, fields = "id") )
+                new_fldr_id = create_reply.get('id')
+                self.lgr.log(self.lev, f"New folder ID = '{new_fldr_id}'")
+
+            if p_recursive:
+                return self._send_tree(p_path, new_fldr_id, p_workers, p_sync)
 
             # send each file to the new Drive folder
             responses = []
             self.lgr.log(self.lev, f"Sending files in local folder '{p_path}' to Drive://{p_parent}/{new_folder_name}/")
-            sfg = glob.glob(p_path + osp.sep + '*')
-            for item in sfg:
-                if osp.isfile(item):
+            sfg = [item for item in glob.glob(p_path + osp.sep + '*') if osp.isfile(item)]
+            to_send = [(item, self._get_mime_type(item)) for item in sfg]
+            if p_sync:
+                with self._local_files():
+                    to_send = files_to_sync(to_send, self.iter_items(sync_query(new_fldr_id), SYNC_FIELDS), HASH_CACHE_PATH,
+                                            self.lgr, self.lev)
+                sfg = [send[0] for send in to_send]
+            num_files = len(sfg)
+            total_mb = sum(osp.getsize(item) for item in sfg) / BYTES_PER_MB
+
+            def report_sent(p_num:int, p_bytes:int):
+                self._report(f"Sent {p_num}/{num_files} files, {p_bytes / BYTES_PER_MB:.2f}/{total_mb:.2f} MB", p_num, num_files)
+
+            if p_workers > 1 or p_sync:
+                uploader = ParallelUploader(lambda: build_thread_service(self.creds), p_workers, self.lgr, self.lev)
+                ids = uploader.send_files(to_send, new_fldr_id,
+                                          f"{p_parent}/{new_folder_name}/", report_sent, self._cancel)
+                responses = [[fid] for fid in ids if fid]
+            else:
+                bytes_sent = 0
+                for item in sfg:
+                    if self._cancelled():
+                        break
                     send_reply = self.send_file(item, new_fldr_id, f"{p_parent}/{new_folder_name}/")
                     if send_reply:
                         responses.append(send_reply)
+                    bytes_sent += osp.getsize(item)
+                    report_sent(len(responses), bytes_sent)
+            if len(responses) < num_files and self._cancel and self._cancel.is_set():
+                responses.append(CANCELLED_MSG)
         except Exception as sdex:
             raise sdex
         return responses if responses else [NO_RESULTS_MSG]
 
+    def _send_tree(self, p_path:str, p_fid:str, p_workers:int, p_sync:bool) -> list:
+        """Send ALL the files and subfolders of a local folder to a Drive folder."""
+        # n.b. with p_sync, the unchanged files are counted but NOT sent
+        num_files = sum(len(files) for _, _, files in os.walk(p_path))
+
+        def report_sent(p_num:int, p_bytes:int):
+            self._report(f"Sent {p_num}/{num_files} files, {p_bytes / BYTES_PER_MB:.2f} MB", p_num, num_files)
+
+        uploader = ParallelUploader(lambda: build_thread_service(self.creds), p_workers, self.lgr, self.lev)
+        # the hash cache is read at the start and saved at the end of the tree
+        with self._local_files() if p_sync else nullcontext():
+            sent = uploader.send_tree(p_path, p_fid, self._get_mime_type, report_sent, self._cancel,
+                                      HASH_CACHE_PATH if p_sync else "")
+        responses = [[fid] for fid in sent.values()]
+        if self._cancelled():
+            responses.append(CANCELLED_MSG)
+        return responses if responses else [NO_RESULTS_MSG]
+
+    @staticmethod
+    def _get_mime_type(p_path:str) -> str:
+        """Find the mimeType to send a local file with, according to the filename extension."""
+        mime_type = FILE_MIME_TYPES["text"]
+        f_type = get_filetype(p_path)
+        if f_type and f_type in FILE_EXTENSIONS.keys():
+            mime_type = FILE_EXTENSIONS[f_type]
+        return mime_type
+
     def send_file(self, p_path:str, p_pid:str, p_parent:str) -> list:
         """Send a local file to my Google drive.
         :param p_path:   path to the local folder to send file from
@@ -199,16 +362,10 @@ class UiDriveAccess:
             self.lgr.warning(NO_SESSION_MSG)
             return [NO_SESSION_MSG]
         try:
-            mime_type = FILE_MIME_TYPES["text"]
-            f_type = get_filetype(p_path)
-            if f_type and f_type in FILE_EXTENSIONS.keys():
-                mime_type = FILE_EXTENSIONS[f_type]
-
-            file_metadata = {"name":get_filename(p_path), "parents":[p_pid]}
-            media = MediaFileUpload(p_path, mimetype = mime_type, resumable = True)
             self.lgr.log(self.lev, f"Sending file '{p_path}' to Drive://{p_parent}/")
-            file = self.service.create(body = file_metadata, media_body = media, fields = "id").execute()
-            response = file.get("id")
+            # the upload strategy is chosen by the size of the file
+            response = upload_file(self.service, p_path, self._get_mime_type(p_path), p_pid, p_lgr = self.lgr, p_level = self.lev,
+                                   p_progress = self._report_bytes)
             self.lgr.log(self.lev, f"Success: Google Id = {response}")
         except Exception as sfex:
             raise sfex
@@ -220,7 +377,7 @@ class UiDriveAccess:
         if not self.service:
             self.lgr.warning(NO_SESSION_MSG)
             return [NO_SESSION_MSG]
-        file_metadata = self.service.get(fileId = p_item_id, fields = '*').execute()
+        file_metadata = SCHEDULER.execute( self.service.get(fileId = p_item_id, fields = '*') )
         self.lgr.log(self.lev, f"\n\t\t\t\t\t\t{file_metadata['name']} data:")
         for k, v in file_metadata.items():
             self.lgr.log(self.lev, f"{k}: '{v}'")
@@ -228,7 +385,7 @@ class UiDriveAccess:
 
     def list_item_info(self, p_target:str, p_mtype:str, p_date:str, p_search:str = "", p_numitems:int = 1) -> list:
         """Read info from my Google Drive.
-        :param p_target:   name of the target folder on the drive
+        :param p_target:   name OR path of the target folder on the drive
         :param p_mtype:    mimeType of item to find, including 'FOLDER'
         :param p_date:     find items OLDER than this date
         :param p_search:   string to search for in names of found items
@@ -241,26 +398,48 @@ class UiDriveAccess:
         self.lgr.log(self.lev, f"target = {p_target}; mtype = {p_mtype}; date = {p_date}; search = {p_search}; numitems = {p_numitems}")
         limit = p_numitems if 1 <= p_numitems <= MAX_NUM_ITEMS else DEFAULT_NUM_ITEMS
 
-        items = self._find_items(p_mimetype = FILE_MIME_TYPES[p_mtype], p_date = p_date, p_limit = limit, p_pid = FOLDER_IDS[p_target])
-        if not items:
-            self.lgr.warning(NO_RESULTS_MSG)
-            return [NO_RESULTS_MSG]
-        self.lgr.log(self.lev, f"{len(items)} items retrieved.\n\t\t\t\tName\t\t\t<type>\t\t(Id)\t\t+Size+\t\t|modTime|\t\t\t\t\t\t[parent id]")
+        mimetype = FILE_MIME_TYPES[p_mtype]
+        pid = self.folder_id(p_target)
+        if self._synced_index():
+            items = self.index.find(mimetype, p_date, pid, p_search)
+        else:
+            # Drive returns the CANDIDATES for the search string, which are then checked for an exact match
+            iquery = self._make_query(p_mimetype = mimetype, p_date = p_date, p_pid = pid, p_search = p_search)
+            if not iquery:
+                return [NO_RESULTS_MSG]
+            items = self.iter_items(iquery, p_page_size = limit)
+        item_log = ItemLog(self.lgr, self.lev, self.summary)
+        item_log.header("Items retrieved:\n\t\t\t\tName\t\t\t<type>\t\t(Id)\t\t+Size+\t\t|modTime|\t\t\t\t\t\t[parent id]")
         found_items = []
-        for item in items:
+        cancelled = False
+        for num_listed, item in enumerate(islice(items, MAX_NUM_ITEMS), start = 1):
+            # check between items, so paging stops before the next page is requested
+            if self._cancelled():
+                cancelled = True
+                break
+            if num_listed % PROGRESS_STEP == 0:
+                self._report(f"Listed {num_listed} items, found {len(found_items)}", len(found_items), limit)
+                # the items to delete are shown ONLY with the delete results
+                if not self.delete:
+                    self._show_page(found_items)
             try:
                 if p_search in item['name']:
                     found_items.append(item)
-                    self.lgr.log(self.lev, f"{item['name']}\t\t<{item['mimeType']}>\t\t({item['id']})\t\t+{item['size']}+"
-                                 f"\t\t|{item['modifiedTime']}|\t\t{item['parents']}")
+                    item_log.item("%s\t\t<%s>\t\t(%s)\t\t+%s+\t\t|%s|\t\t%s", item['name'], item['mimeType'], item['id'], item['size'],
+                                  item['modifiedTime'], item['parents'], p_kind = item['mimeType'])
             except KeyError as lke:
                 # e.g. items 'shared with me' are in my Drive but WITHOUT a parent,
                 # some Google types, like FOLDERS, do not report the size, etc
                 self.lgr.warning(f"{repr(lke)} for item '{item['name']}[{item['id']}]' with mimeType '{item['mimeType']}'")
-            if len(found_items) >= p_numitems:
+            if len(found_items) >= limit:
                 break
+        self._report(f"Found {len(found_items)} items", len(found_items), len(found_items))
+        item_log.summary("items logged")
         self.lgr.log(self.lev, f"Found {len(found_items)} '{p_mtype}' items with '{p_search}' in the name.")
 
+        # do NOT delete anything from an incomplete listing
+        if cancelled:
+            return found_items + [CANCELLED_MSG]
         if self.delete and found_items:
             return self._delete_items(found_items)
         return found_items if found_items else [f">> NO '{p_mtype}' '*{p_search}*' items found!\n"]